@@ -0,0 +1,246 @@
+"""
+Action Journal Module - Append-only JSONL log of executed actions.
+
+Entries are appended to ``path`` as one JSON object per line by a
+background thread, so executing an action never waits on disk. The writer
+takes whatever is queued as one batch and fsyncs at most every
+``fsync_interval`` seconds (and on close), so a crash loses at most that
+window; a batch that fails to write is logged and dropped. ``<path>.idx``
+holds the byte offset of every line as little-endian uint64, which lets
+``page`` read any slice of the journal without scanning it. The most
+recent ``ring_size`` entries are also kept in memory.
+
+One process writes a journal. On open, a line cut short by a crash is
+dropped and an index that lags the journal is rebuilt from its tail.
+"""
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+import itertools
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+_CLOSE = object()
+
+
+def _offsets_to_bytes(offsets: array) -> bytes:
+    if sys.byteorder != "little":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets.tobytes()
+
+
+class ActionJournal:
+    """Durable action history with a background writer and an offset index."""
+
+    def __init__(self, path: str, ring_size: int = 1000, fsync_interval: float = 1.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.index_path = path + ".idx"
+        self.fsync_interval = fsync_interval
+        self.recent: deque = deque(maxlen=max(1, ring_size))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._offsets, self._size = self._open_index()
+        self._count = len(self._offsets)
+        self._written = self._count
+        self._drops = 0
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._queue: "queue.Queue" = queue.Queue()
+        self._file = open(self.path, "ab")
+        self._index_file = open(self.index_path, "ab")
+
+        self._writer = threading.Thread(target=self._run, name="action-journal", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _open_index(self) -> Tuple[array, int]:
+        """Offsets of every complete line and the journal size they cover, repairing both files."""
+        offsets = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            offsets.frombytes(data[:len(data) - len(data) % offsets.itemsize])
+            if sys.byteorder != "little":
+                offsets.byteswap()
+
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        while offsets and offsets[-1] >= size:
+            offsets.pop()
+
+        with open(self.path, "a+b") as f:
+            # Re-scan from the last indexed line: its end and any unindexed lines follow it
+            start = offsets.pop() if offsets else 0
+            f.seek(start)
+            position = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                offsets.append(position)
+                position += len(line)
+            if position < size:
+                self.logger.warning(f"Dropping incomplete last line of action journal {self.path}")
+                f.truncate(position)
+
+        with open(self.index_path, "wb") as f:
+            f.write(_offsets_to_bytes(offsets))
+        return offsets, position
+
+    def append(self, entry: Dict[str, Any]) -> int:
+        """Queue ``entry`` for writing; returns its position in the journal."""
+        with self._cond:
+            position = self._count
+            self._count += 1
+            self.recent.append((position, entry))
+            self._queue.put((position, entry))
+        return position
+
+    def _run(self):
+        dirty = False
+        while True:
+            try:
+                item = self._queue.get(timeout=self.fsync_interval if dirty else None)
+            except queue.Empty:
+                self._sync()
+                dirty = False
+                continue
+
+            batch = [item]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = any(item is _CLOSE for item in batch)
+            entries = [item[1] for item in batch if item is not _CLOSE]
+            if entries:
+                try:
+                    self._write(entries)
+                    dirty = True
+                except Exception as e:
+                    self.logger.error(f"Error writing action journal, dropping {len(entries)} entries: {str(e)}")
+                    self._drop(len(entries))
+            if closing:
+                self._sync()
+                return
+
+    def _write(self, entries: List[Dict[str, Any]]):
+        lines = [(json.dumps(entry, default=str, ensure_ascii=False) + "\n").encode("utf-8") for entry in entries]
+        with self._io_lock:
+            offsets, size = array("Q"), self._size
+            for line in lines:
+                offsets.append(size)
+                size += len(line)
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            self._index_file.write(_offsets_to_bytes(offsets))
+            self._index_file.flush()
+            with self._cond:
+                # Readers only see lines once they are complete in the file
+                self._offsets.extend(offsets)
+                self._size = size
+                self._written += len(entries)
+                self._cond.notify_all()
+
+    def _drop(self, n: int):
+        """Forget the next ``n`` unwritten entries after a failed write, so waiters are not left hanging."""
+        with self._io_lock:
+            # The failed write may have left part of the batch on disk or in the file buffers
+            for f in (self._file, self._index_file):
+                try:
+                    f.close()
+                except (OSError, ValueError):
+                    pass
+            try:
+                os.truncate(self.path, self._size)
+                os.truncate(self.index_path, len(self._offsets) * self._offsets.itemsize)
+            except OSError as e:
+                self.logger.error(f"Error truncating action journal: {str(e)}")
+            self._file = open(self.path, "ab")
+            self._index_file = open(self.index_path, "ab")
+            with self._cond:
+                lost = self._written
+                self._count -= n
+                recent = [(position - n if position >= lost else position, entry)
+                          for position, entry in self.recent if not lost <= position < lost + n]
+                self.recent.clear()
+                self.recent.extend(recent)
+                self._drops += 1
+                self._cond.notify_all()
+
+    def _sync(self):
+        try:
+            os.fsync(self._file.fileno())
+            os.fsync(self._index_file.fileno())
+        except (OSError, ValueError) as e:
+            self.logger.error(f"Error syncing action journal: {str(e)}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every appended entry is written (not necessarily fsynced)."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written >= self._count, timeout)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries ``offset`` to ``offset + limit`` in append order."""
+        offset = max(0, offset)
+        with self._cond:
+            while True:
+                count, drops = self._count, self._drops
+                stop = count if limit is None else min(count, offset + limit)
+                if offset >= stop:
+                    return []
+                # The ring buffer holds the newest positions, including ones still queued
+                ring_start = count - len(self.recent)
+                split = min(stop, max(offset, ring_start))
+                first, last = max(0, split - ring_start), max(0, stop - ring_start)
+                recent = [entry for _, entry in itertools.islice(self.recent, first, last)]
+                if split <= self._written:
+                    break
+                # More entries are queued than the ring buffer holds; start over if a failed write drops some
+                self._cond.wait_for(lambda: self._written >= split or self._drops != drops)
+        return (list(self._read(offset, split)) if offset < split else []) + recent
+
+    def _read(self, start: int, stop: int) -> Iterator[Dict[str, Any]]:
+        with self._cond:
+            begin = self._offsets[start]
+            end = self._offsets[stop] if stop < len(self._offsets) else self._size
+        with open(self.path, "rb") as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        for line in data.splitlines():
+            yield json.loads(line)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """Every entry, read from disk in pages."""
+        self.flush()
+        for start in range(0, self._written, 1000):
+            yield from self._read(start, min(start + 1000, self._written))
+
+    def clear(self):
+        """Delete every entry from memory and disk."""
+        self.flush()
+        with self._io_lock, self._cond:
+            self._file.truncate(0)
+            self._index_file.truncate(0)
+            self._offsets = array("Q")
+            self._size = 0
+            self._count = self._written = 0
+            self.recent.clear()
+
+    def close(self):
+        if self._writer.is_alive():
+            self._queue.put(_CLOSE)
+            self._writer.join()
+            self._file.close()
+            self._index_file.close()
@@ -2,10 +2,15 @@
 Action Executor Module - Handles enterprise action execution
 """
 import logging
-from typing import Dict, Any, List
+import itertools
+import threading
+from collections import Counter, deque
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime
 from enum import Enum
 
+from action_journal import ActionJournal
+
 
 class ActionType(Enum):
     FILE_TICKET = "file_ticket"
@@ -18,9 +23,14 @@ class ActionType(Enum):
 
 class ActionExecutor:
     
-    def __init__(self):
+    def __init__(self, log_path: Optional[str] = None, history_size: int = 1000, fsync_interval: float = 1.0):
         self.logger = logging.getLogger(__name__)
-        self.action_log = []
+        self.journal = ActionJournal(log_path, history_size, fsync_interval) if log_path else None
+        # Without a journal only the most recent ``history_size`` actions are kept
+        self.action_log = deque(maxlen=history_size)
+        # Actions per type, kept up to date so statistics never re-read the journal
+        self._type_counts = Counter(action.get("action_type", "unknown") for action in self.iter_history())
+        self._counts_lock = threading.Lock()
     
     def execute_action(self, action_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         timestamp = datetime.now().isoformat()
@@ -49,7 +59,14 @@ class ActionExecutor:
                 "parameters": parameters,
                 "result": result
             }
-            self.action_log.append(log_entry)
+            with self._counts_lock:
+                if self.journal is not None:
+                    self.journal.append(log_entry)
+                else:
+                    if len(self.action_log) == self.action_log.maxlen:
+                        self._type_counts[self.action_log[0]["action_type"]] -= 1
+                    self.action_log.append(log_entry)
+                self._type_counts[action_type] += 1
             self.logger.info(f"Action executed: {action_type} - {action_id}")
             
             return {
@@ -149,11 +166,32 @@ class ActionExecutor:
             "message": f"Documentation update {update_id} queued for review"
         }
     
-    def get_action_history(self) -> List[Dict]:
-        return self.action_log
+    def get_action_history(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Actions ``offset`` to ``offset + limit``, oldest first."""
+        if self.journal is not None:
+            return self.journal.page(offset, limit)
+        stop = None if limit is None else offset + limit
+        return list(itertools.islice(self.action_log, offset, stop))
+    
+    def iter_history(self) -> Iterator[Dict]:
+        """Every action, oldest first, without loading the whole history."""
+        return iter(self.journal) if self.journal is not None else iter(list(self.action_log))
+    
+    def action_count(self) -> int:
+        return len(self.journal) if self.journal is not None else len(self.action_log)
+    
+    def action_counts(self) -> Dict[str, int]:
+        """Number of recorded actions of each type."""
+        with self._counts_lock:
+            return {action_type: n for action_type, n in self._type_counts.items() if n > 0}
     
     def clear_history(self):
-        self.action_log = []
+        with self._counts_lock:
+            if self.journal is not None:
+                self.journal.clear()
+            else:
+                self.action_log.clear()
+            self._type_counts.clear()
         self.logger.info("Action history cleared")
 
 
@@ -2,16 +2,24 @@
 # Main Agent Module 
 
 import json
+import time
+import asyncio
 import logging
 import sys
-from typing import Dict, Any, List
+from typing import AsyncIterator, Dict, Any, List, Optional
 from datetime import datetime
 
-from config import AgentConfig, LOG_FORMAT, LOG_DATE_FORMAT
+from config import AgentConfig, LOG_FORMAT, LOG_DATE_FORMAT, DEFAULT_RETRIEVAL_POLICY
 from intent_detector import IntentDetector
 from retriever import RAGRetriever
-from llm_handler import LLMHandler
+from llm_handler import LLMHandler, is_error_response
 from actions import ActionExecutor, extract_action_parameters
+from cache import SemanticAnswerCache
+from timing import stage_timer, timed_stage, record_stage
+
+
+# Context for actions that run without retrieval: (context, pages, confidence)
+NO_CONTEXT = ("", [], 0.0)
 
 
 class AgenticRAGAssistant:
@@ -24,7 +32,16 @@ class AgenticRAGAssistant:
         self.intent_detector = IntentDetector()
         self.retriever = RAGRetriever(config)
         self.llm_handler = LLMHandler(config)
-        self.action_executor = ActionExecutor() if config.enable_actions else None
+        self.action_executor = ActionExecutor(
+            config.action_log_path,
+            history_size=config.action_history_size,
+            fsync_interval=config.action_log_fsync_interval
+        ) if config.enable_actions else None
+        self.answer_cache = SemanticAnswerCache(
+            max_size=config.answer_cache_size,
+            ttl=config.answer_cache_ttl,
+            threshold=config.answer_cache_threshold
+        ) if config.answer_cache_enabled else None
         
         self.logger.info("Agentic RAG Assistant initialized")
     
@@ -64,62 +81,442 @@ class AgenticRAGAssistant:
     def process_query(self, query: str) -> Dict[str, Any]:
         """Main method to process user queries."""
         try:
-            self.logger.info("\n" + "="*60)
-            self.logger.info(f"Processing query: {query}")
-            self.logger.info("="*60)
+            with stage_timer() as timer:
+                self._log_query_start(query)
+                
+                # Step 1: Detect intent
+                intent = self._detect_intent(query)
+                
+                if self._is_action(intent):
+                    # Step 2: Execute the action, retrieving context only as its policy needs
+                    action_result, retrieved, policy = self._run_action(query, intent)
+                    context, pages, retrieval_confidence = retrieved
+                    result = self._base_result(query, intent, context, pages, retrieval_confidence, policy)
+                    
+                    # Step 3: Explain the action
+                    result.update(self._process_action_query(query, action_result, context, pages))
+                else:
+                    # Information queries may be answered from the semantic cache
+                    query_vector = None
+                    if self._uses_answer_cache(query, intent):
+                        self.retriever.refresh_if_changed()
+                        with timed_stage("answer_cache"):
+                            query_vector = self.retriever.embed_query(query)
+                            cached = self._lookup_answer(query, intent, query_vector)
+                        if cached is not None:
+                            cached["timings"] = timer.as_dict()
+                            return cached
+                    
+                    # Step 2: Retrieve context from vector store
+                    with timed_stage("retrieval"):
+                        context, pages, retrieval_confidence = self.retriever.retrieve_context(query)
+                    result = self._base_result(query, intent, context, pages, retrieval_confidence)
+                    
+                    # Step 3: Answer from the retrieved context
+                    result.update(self._process_information_query(query, context, pages))
+                    self._store_answer(query_vector, context, result)
+                
+                result["timings"] = timer.as_dict()
+                self._log_query_done()
+                return result
             
-            # Step 1: Detect intent
-            intent = self.intent_detector.detect_intent(query)
-            self.logger.info(f"Intent: {intent['intent_type']} (confidence: {intent['confidence']})")
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    async def aprocess_query(self, query: str) -> Dict[str, Any]:
+        """
+        Async variant of process_query. Embedding and FAISS search run on the
+        retriever's executor and LLM calls use the async provider clients, so
+        the event loop is free while a request waits on the network.
+        """
+        try:
+            with stage_timer() as timer:
+                self._log_query_start(query)
+                
+                intent = self._detect_intent(query)
+                
+                if self._is_action(intent):
+                    action_result, retrieved, policy = await self._arun_action(query, intent)
+                    context, pages, retrieval_confidence = retrieved
+                    result = self._base_result(query, intent, context, pages, retrieval_confidence, policy)
+                    result.update(await self._aprocess_action_query(query, action_result, context, pages))
+                else:
+                    query_vector = None
+                    if self._uses_answer_cache(query, intent):
+                        await self.retriever.arefresh_if_changed()
+                        with timed_stage("answer_cache"):
+                            query_vector = await self.retriever.aembed_query(query)
+                            cached = self._lookup_answer(query, intent, query_vector)
+                        if cached is not None:
+                            cached["timings"] = timer.as_dict()
+                            return cached
+                    
+                    with timed_stage("retrieval"):
+                        context, pages, retrieval_confidence = await self.retriever.aretrieve_context(query)
+                    result = self._base_result(query, intent, context, pages, retrieval_confidence)
+                    result.update(await self._aprocess_information_query(query, context, pages))
+                    self._store_answer(query_vector, context, result)
+                
+                result["timings"] = timer.as_dict()
+                self._log_query_done()
+                return result
+            
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    async def aprocess_batch(self, queries: List[str], concurrency: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process many queries. Answer-cache lookups and retrieval run in
+        vectorized windows of ``batch_retrieval_size`` queries and LLM calls
+        run with at most ``concurrency`` in flight. Results are yielded as they
+        complete, each tagged with its input ``index`` and ``latency_ms``
+        (measured from the start of its retrieval window, so queueing is included).
+        """
+        concurrency = concurrency or self.config.batch_concurrency
+        window = max(1, self.config.batch_retrieval_size)
+        semaphore = asyncio.Semaphore(concurrency)
+        completed = asyncio.Queue()
+        tasks = []
+        
+        async def finish(index: int, result: Dict[str, Any], started: float):
+            result["index"] = index
+            result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            await completed.put(result)
+        
+        async def complete(index: int, query: str, intent: Dict[str, Any], retrieved, query_vector, started: float):
+            try:
+                async with semaphore:
+                    with stage_timer() as timer:
+                        result = await self._acomplete_query(query, intent, retrieved, query_vector)
+                        result["timings"] = timer.as_dict()
+            except Exception as e:
+                result = self._error_result(query, e)
+            await finish(index, result, started)
+        
+        async def produce():
+            pending = set()
+            try:
+                for offset in range(0, len(queries), window):
+                    batch = queries[offset:offset + window]
+                    started = time.perf_counter()
+                    intents = [self._detect_intent(query) for query in batch]
+                    await self.retriever.arefresh_if_changed()
+                    
+                    # Answer-cache lookups share one embedding call, whose searches the retrieval below reuses
+                    vectors = [None] * len(batch)
+                    cached = [None] * len(batch)
+                    cacheable = [i for i, intent in enumerate(intents) if self._uses_answer_cache(batch[i], intent)]
+                    if cacheable:
+                        with stage_timer() as lookup_timer:
+                            with timed_stage("answer_cache"):
+                                embedded = await self.retriever.aembed_queries([batch[i] for i in cacheable])
+                                for i, vector in zip(cacheable, embedded):
+                                    vectors[i] = vector
+                                    cached[i] = self._lookup_answer(batch[i], intents[i], vector)
+                        for i in cacheable:
+                            if cached[i] is not None:
+                                cached[i]["timings"] = lookup_timer.as_dict()
+                                await finish(offset + i, cached[i], started)
+                    
+                    # Deferred actions retrieve on their own once the action succeeds; "skip" never does
+                    needed = [i for i, intent in enumerate(intents)
+                              if cached[i] is None and self._retrieval_policy(intent) in ("inline", "concurrent")]
+                    retrieved = [NO_CONTEXT] * len(batch)
+                    if needed:
+                        contexts = await self.retriever.aretrieve_context_batch([batch[i] for i in needed])
+                        for i, context in zip(needed, contexts):
+                            retrieved[i] = context
+                    
+                    for i, (query, intent, context) in enumerate(zip(batch, intents, retrieved)):
+                        if cached[i] is not None:
+                            continue
+                        task = asyncio.create_task(complete(offset + i, query, intent, context, vectors[i], started))
+                        tasks.append(task)
+                        pending.add(task)
+                    
+                    # Keep retrieval at most one window ahead of the LLM calls
+                    while len(pending) > max(window, concurrency):
+                        _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                
+                if pending:
+                    await asyncio.wait(pending)
+            finally:
+                # Also on failure, so the consumer stops waiting and re-raises the error below
+                await completed.put(None)
+        
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                result = await completed.get()
+                if result is None:
+                    break
+                yield result
+            await producer
+        finally:
+            # The client went away or the producer failed: stop the LLM calls still running
+            for task in [producer, *tasks]:
+                if not task.done():
+                    task.cancel()
+    
+    async def _acomplete_query(self, query: str, intent: Dict[str, Any], retrieved,
+                               query_vector=None) -> Dict[str, Any]:
+        """
+        Finish a batch query whose answer-cache lookup and context retrieval
+        have already run. Deferred actions retrieve here, once the action succeeded.
+        """
+        if self._is_action(intent):
+            policy = self._retrieval_policy(intent)
+            action_result = self._execute_action(query, intent)
+            if policy == "defer" and action_result.get("status") == "success":
+                with timed_stage("retrieval"):
+                    retrieved = await self.retriever.aretrieve_context(query)
+            context, pages, retrieval_confidence = retrieved
+            result = self._base_result(query, intent, context, pages, retrieval_confidence, policy)
+            result.update(await self._aprocess_action_query(query, action_result, context, pages))
+            return result
+        
+        context, pages, retrieval_confidence = retrieved
+        result = self._base_result(query, intent, context, pages, retrieval_confidence)
+        result.update(await self._aprocess_information_query(query, context, pages))
+        self._store_answer(query_vector, context, result)
+        return result
+    
+    async def astream_query(self, query: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of aprocess_query. Yields events:
+        ``metadata`` (intent, pages, confidence - as soon as retrieval is done),
+        then ``token`` events as the LLM produces text, then ``done``.
+        Failures are reported as a single ``error`` event instead of ``done``;
+        its ``truncated`` flag says whether part of the answer was already sent.
+        """
+        parts = []
+        try:
+            self._log_query_start(query)
             
-            # Step 2: Retrieve context from vector store
-            context, pages, retrieval_confidence = self.retriever.retrieve_context(query)
+            intent = self._detect_intent(query)
             
-            result = {
-                "query": query,
-                "intent": intent,
-                "retrieval": {
-                    "pages": pages,
-                    "confidence": retrieval_confidence,
-                    "context_length": len(context)
-                },
-                "timestamp": datetime.now().isoformat()
-            }
+            query_vector = None
+            if self._uses_answer_cache(query, intent):
+                await self.retriever.arefresh_if_changed()
+                query_vector = await self.retriever.aembed_query(query)
+                cached = self._lookup_answer(query, intent, query_vector)
+                if cached is not None:
+                    yield {"event": "metadata", "data": self._stream_metadata(cached)}
+                    yield {"event": "token", "data": {"text": cached["answer"]}}
+                    yield {"event": "done", "data": {"timestamp": cached["timestamp"]}}
+                    return
             
-            # Step 3: Process based on intent
-            if intent["intent_type"] == "action" and self.config.enable_actions:
-                result.update(self._process_action_query(query, intent, context, pages))
+            if self._is_action(intent):
+                action_result, retrieved, policy = await self._arun_action(query, intent)
+                context, pages, retrieval_confidence = retrieved
+                result = self._base_result(query, intent, context, pages, retrieval_confidence, policy)
+                result["response_type"] = "action"
+                result["action"] = action_result
+                stream = self.llm_handler.astream_with_actions(query, context, pages, action_result)
             else:
-                result.update(self._process_information_query(query, context, pages))
+                context, pages, retrieval_confidence = await self.retriever.aretrieve_context(query)
+                result = self._base_result(query, intent, context, pages, retrieval_confidence)
+                self.logger.info("Processing as information query...")
+                result["response_type"] = "information"
+                stream = self.llm_handler.astream_response(query, context, pages)
             
-            self.logger.info("Query processed successfully")
-            self.logger.info("="*60)
+            yield {"event": "metadata", "data": self._stream_metadata(result)}
             
-            return result
+            async for text in stream:
+                parts.append(text)
+                yield {"event": "token", "data": {"text": text}}
+            
+            answer = "".join(parts)
+            result["context_preview"] = self._preview(context)
+            if result["response_type"] == "action":
+                result["explanation"] = answer
+            else:
+                result["answer"] = answer
+                self._store_answer(query_vector, context, result)
+            
+            self._log_query_done()
+            yield {"event": "done", "data": {"timestamp": result["timestamp"]}}
             
         except Exception as e:
-            self.logger.error(f"Error processing query: {str(e)}")
-            return {
-                "query": query,
-                "error": str(e),
-                "timestamp": datetime.now().isoformat()
-            }
+            error = self._error_result(query, e)
+            yield {"event": "error", "data": {"error": error["error"], "truncated": bool(parts),
+                                              "timestamp": error["timestamp"]}}
+    
+    @staticmethod
+    def _stream_metadata(result: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = {
+            "query": result["query"],
+            "intent": result["intent"],
+            "response_type": result["response_type"],
+            "pages": result["retrieval"]["pages"],
+            "confidence": result["retrieval"]["confidence"],
+            "cached": result.get("cached", False)
+        }
+        if "action" in result:
+            metadata["action"] = result["action"]
+        return metadata
+    
+    def _log_query_start(self, query: str):
+        self.logger.info("\n" + "="*60)
+        self.logger.info(f"Processing query: {query}")
+        self.logger.info("="*60)
+    
+    def _log_query_done(self):
+        self.logger.info("Query processed successfully")
+        self.logger.info("="*60)
+    
+    def _detect_intent(self, query: str) -> Dict[str, Any]:
+        with timed_stage("intent"):
+            intent = self.intent_detector.detect_intent(query)
+        self.logger.info(f"Intent: {intent['intent_type']} (confidence: {intent['confidence']})")
+        return intent
+    
+    def _is_action(self, intent: Dict[str, Any]) -> bool:
+        return intent["intent_type"] == "action" and self.config.enable_actions
+    
+    def _retrieval_policy(self, intent: Dict[str, Any]) -> str:
+        """Retrieval policy for an intent; information queries always retrieve inline."""
+        if not self._is_action(intent):
+            return "inline"
+        return self.config.action_retrieval_policy.get(intent["action_type"], DEFAULT_RETRIEVAL_POLICY)
+    
+    def _timed_retrieval(self, query: str):
+        # Runs on the retriever's executor, outside the request's stage timer
+        start = time.perf_counter()
+        retrieved = self.retriever.retrieve_context(query)
+        return retrieved, (time.perf_counter() - start) * 1000
+    
+    def _run_action(self, query: str, intent: Dict[str, Any]):
+        """
+        Execute an action and fetch document context according to its
+        retrieval policy. Returns ``(action_result, (context, pages,
+        confidence), policy)``.
+        """
+        policy = self._retrieval_policy(intent)
+        future = None
+        if policy == "concurrent":
+            future = self.retriever.executor.submit(self._timed_retrieval, query)
+        
+        action_result = self._execute_action(query, intent)
+        
+        if future is not None:
+            with timed_stage("retrieval_wait"):
+                retrieved, elapsed_ms = future.result()
+            record_stage("retrieval", elapsed_ms)
+        elif policy == "defer" and action_result.get("status") == "success":
+            with timed_stage("retrieval"):
+                retrieved = self.retriever.retrieve_context(query)
+        else:
+            retrieved = NO_CONTEXT
+        
+        self.logger.info(f"Retrieval policy for {intent['action_type']}: {policy}")
+        return action_result, retrieved, policy
+    
+    async def _arun_action(self, query: str, intent: Dict[str, Any]):
+        policy = self._retrieval_policy(intent)
+        future = None
+        if policy == "concurrent":
+            # run_in_executor submits immediately, so the search overlaps the action
+            future = asyncio.get_running_loop().run_in_executor(self.retriever.executor, self._timed_retrieval, query)
+        
+        action_result = self._execute_action(query, intent)
+        
+        if future is not None:
+            with timed_stage("retrieval_wait"):
+                retrieved, elapsed_ms = await future
+            record_stage("retrieval", elapsed_ms)
+        elif policy == "defer" and action_result.get("status") == "success":
+            with timed_stage("retrieval"):
+                retrieved = await self.retriever.aretrieve_context(query)
+        else:
+            retrieved = NO_CONTEXT
+        
+        self.logger.info(f"Retrieval policy for {intent['action_type']}: {policy}")
+        return action_result, retrieved, policy
+    
+    def _uses_answer_cache(self, query: str, intent: Dict[str, Any]) -> bool:
+        # Action intents must always execute, so they never touch the cache. Identifier
+        # lookups skip it too: a lookup would embed the query, which BM25 alone avoids
+        return (self.answer_cache is not None and intent["intent_type"] == "information"
+                and not self.retriever.is_lexical_lookup(query))
+    
+    def _lookup_answer(self, query: str, intent: Dict[str, Any], query_vector) -> Dict[str, Any]:
+        cached = self.answer_cache.get(query_vector, self.retriever.fingerprint)
+        if cached is None:
+            return None
+        
+        self.logger.info(f"Answer served from cache (similarity: {cached['cache_similarity']})")
+        return {
+            "query": query,
+            "intent": intent,
+            **cached,
+            "cached": True,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _store_answer(self, query_vector, context: str, result: Dict[str, Any]):
+        if query_vector is None or not context or is_error_response(result["answer"]):
+            return
+        self.answer_cache.put(query_vector, {
+            "retrieval": result["retrieval"],
+            "response_type": result["response_type"],
+            "answer": result["answer"],
+            "context_preview": result["context_preview"]
+        }, self.retriever.fingerprint)
+    
+    def _base_result(self, query: str, intent: Dict[str, Any], context: str,
+                     pages: List[int], retrieval_confidence: float, policy: str = "inline") -> Dict[str, Any]:
+        return {
+            "query": query,
+            "intent": intent,
+            "retrieval": {
+                "pages": pages,
+                "confidence": retrieval_confidence,
+                "context_length": len(context),
+                "policy": policy
+            },
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _error_result(self, query: str, error: Exception) -> Dict[str, Any]:
+        self.logger.error(f"Error processing query: {str(error)}")
+        return {
+            "query": query,
+            "error": str(error),
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    @staticmethod
+    def _preview(context: str) -> str:
+        return context[:300] + "..." if len(context) > 300 else context
     
     def _process_information_query(self, query: str, context: str, pages: List[int]) -> Dict[str, Any]:
         """Process information retrieval query."""
         self.logger.info("Processing as information query...")
         
         # Generate LLM response
-        answer = self.llm_handler.generate_response(query, context, pages)
+        with timed_stage("llm"):
+            answer = self.llm_handler.generate_response(query, context, pages)
+        
+        return {
+            "response_type": "information",
+            "answer": answer,
+            "context_preview": self._preview(context)
+        }
+    
+    async def _aprocess_information_query(self, query: str, context: str, pages: List[int]) -> Dict[str, Any]:
+        self.logger.info("Processing as information query...")
+        
+        with timed_stage("llm"):
+            answer = await self.llm_handler.agenerate_response(query, context, pages)
         
         return {
             "response_type": "information",
             "answer": answer,
-            "context_preview": context[:300] + "..." if len(context) > 300 else context
+            "context_preview": self._preview(context)
         }
     
-    def _process_action_query(self, query: str, intent: Dict[str, Any], context: str, pages: List[int]) -> Dict[str, Any]:
-        """Process action execution query."""
+    def _execute_action(self, query: str, intent: Dict[str, Any]) -> Dict[str, Any]:
         self.logger.info(f"Processing as action query: {intent['action_type']}")
         
         # Extract parameters for the action
@@ -127,24 +524,42 @@ class AgenticRAGAssistant:
         self.logger.info(f"Extracted parameters: {parameters}")
         
         # Execute the action
-        action_result = self.action_executor.execute_action(intent["action_type"], parameters)
-        
+        with timed_stage("action"):
+            return self.action_executor.execute_action(intent["action_type"], parameters)
+    
+    def _process_action_query(self, query: str, action_result: Dict[str, Any], context: str, pages: List[int]) -> Dict[str, Any]:
+        """Explain an executed action, with document context when it was retrieved."""
         # Generate contextual response with action results
-        explanation = self.llm_handler.generate_with_actions(query, context, pages, action_result)
+        with timed_stage("llm"):
+            explanation = self.llm_handler.generate_with_actions(query, context, pages, action_result)
+        
+        return {
+            "response_type": "action",
+            "action": action_result,
+            "explanation": explanation,
+            "context_preview": self._preview(context)
+        }
+    
+    async def _aprocess_action_query(self, query: str, action_result: Dict[str, Any], context: str, pages: List[int]) -> Dict[str, Any]:
+        with timed_stage("llm"):
+            explanation = await self.llm_handler.agenerate_with_actions(query, context, pages, action_result)
         
         return {
             "response_type": "action",
             "action": action_result,
             "explanation": explanation,
-            "context_preview": context[:300] + "..." if len(context) > 300 else context
+            "context_preview": self._preview(context)
         }
     
-    def get_action_history(self) -> List[Dict]:
-        """Get history of all executed actions."""
+    def get_action_history(self, offset: int = 0, limit: Optional[int] = None) -> List[Dict]:
+        """Get a page of the executed actions, oldest first."""
         if self.action_executor:
-            return self.action_executor.get_action_history()
+            return self.action_executor.get_action_history(offset, limit)
         return []
     
+    def get_action_count(self) -> int:
+        return self.action_executor.action_count() if self.action_executor else 0
+    
     def clear_action_history(self):
         """Clear the action execution history."""
         if self.action_executor:
@@ -163,12 +578,19 @@ class AgenticRAGAssistant:
                     "top_k": self.config.top_k,
                     "actions_enabled": self.config.enable_actions
                 },
-                "actions": self.get_action_history(),
-                "action_count": len(self.get_action_history())
+                "action_count": self.get_action_count()
             }
+            actions = self.action_executor.iter_history() if self.action_executor else iter(())
             
+            # Actions are streamed from the journal one line each rather than built into one document
             with open(filepath, 'w') as f:
-                json.dump(session_data, f, indent=2)
+                f.write("{")
+                for key, value in session_data.items():
+                    f.write(f"{json.dumps(key)}: {json.dumps(value, default=str)}, ")
+                f.write('"actions": [')
+                for i, action in enumerate(actions):
+                    f.write((",\n" if i else "\n") + json.dumps(action, default=str))
+                f.write("\n]}\n")
             
             self.logger.info(f"Session log exported to: {filepath}")
             return True
@@ -179,16 +601,15 @@ class AgenticRAGAssistant:
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get statistics about the assistant's operations."""
-        actions = self.get_action_history()
-        
-        action_types = {}
-        for action in actions:
-            action_type = action.get("action_type", "unknown")
-            action_types[action_type] = action_types.get(action_type, 0) + 1
-        
         return {
-            "total_actions": len(actions),
-            "actions_by_type": action_types,
+            "total_actions": self.get_action_count(),
+            "actions_by_type": self.action_executor.action_counts() if self.action_executor else {},
+            "caches": {
+                **self.retriever.cache_stats(),
+                "answer_cache": self.answer_cache.stats() if self.answer_cache else None,
+                "completion_cache": (self.llm_handler.completion_cache.stats()
+                                     if self.llm_handler.completion_cache else None)
+            },
             "configuration": {
                 "llm_provider": self.config.llm_provider,
                 "model": self.config.model_name,
@@ -221,11 +642,13 @@ class AgenticRAGAssistant:
                     break
                 
                 if query.lower() == 'history':
-                    history = self.get_action_history()
+                    total = self.get_action_count()
+                    shown = min(total, 20)
+                    history = self.get_action_history(total - shown)
                     print(f"\n{'='*60}")
-                    print(f"Action History ({len(history)} actions)")
+                    print(f"Action History ({total} actions" + (f", last {shown})" if shown < total else ")"))
                     print("="*60)
-                    for i, action in enumerate(history, 1):
+                    for i, action in enumerate(history, total - shown + 1):
                         print(f"\n{i}. {action['action_type']} - {action['timestamp']}")
                         print(f"   Status: {action['result'].get('status', 'unknown')}")
                     print("="*60)
@@ -1,9 +1,16 @@
-from fastapi import FastAPI
+import json
+import time
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import AgentConfig
 from agent import AgenticRAGAssistant
+from timing import summarize_latencies
+from metrics import CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_REQUEST_SECONDS, REGISTRY
 
 
 app = FastAPI(title="Agentic RAG API")
@@ -24,21 +31,80 @@ if not assistant.initialize():
     raise RuntimeError("Failed to initialize assistant")
 
 
+@app.middleware("http")
+async def track_requests(request, call_next):
+    # Unknown paths share one label so stray requests cannot grow the label set
+    path = request.url.path if request.url.path in ROUTE_PATHS else "other"
+    in_flight = HTTP_IN_FLIGHT.labels(path)
+    in_flight.inc()
+    started = time.perf_counter()
+
+    def finish(status):
+        in_flight.dec()
+        HTTP_REQUEST_SECONDS.labels(request.method, path, status).observe(time.perf_counter() - started)
+
+    try:
+        response = await call_next(request)
+    except Exception:
+        finish(500)
+        raise
+
+    # Streamed responses are in flight until their last chunk is sent
+    body = response.body_iterator
+
+    async def tracked_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish(response.status_code)
+
+    response.body_iterator = tracked_body()
+    return response
+
+
+def collect_cache_metrics():
+    """Cache and batcher counts kept by the assistant, read at scrape time."""
+    caches = {"query": assistant.retriever.query_cache}
+    if assistant.answer_cache is not None:
+        caches["answer"] = assistant.answer_cache
+    if assistant.llm_handler.completion_cache is not None:
+        caches["completion"] = assistant.llm_handler.completion_cache
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    yield ("rag_cache_hits_total", "counter", "Cache lookups that hit.",
+           [({"cache": name}, s["hits"]) for name, s in stats.items()])
+    yield ("rag_cache_misses_total", "counter", "Cache lookups that missed.",
+           [({"cache": name}, s["misses"]) for name, s in stats.items()])
+    yield ("rag_cache_entries", "gauge", "Entries held per cache.",
+           [({"cache": name}, s["size"]) for name, s in stats.items()])
+
+    if assistant.retriever.batcher is not None:
+        batcher = assistant.retriever.batcher.stats()
+        yield ("rag_batcher_batches_total", "counter", "Query embedding batches run.", [({}, batcher["batches"])])
+        yield ("rag_batcher_queries_total", "counter", "Queries embedded through the batcher.", [({}, batcher["queries"])])
+
+
+REGISTRY.add_collector(collect_cache_metrics)
+
+
 class ChatRequest(BaseModel):
     query: str
 
 
+class ChatBatchRequest(BaseModel):
+    queries: List[str]
+    concurrency: Optional[int] = None
+
+
 class ChatResponse(BaseModel):
     answer: str
     intent: str
     confidence: float
     response_type: str
+    timings: Optional[Dict[str, float]] = None
 
 
-@app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
-    result = assistant.process_query(req.query)
-
+def to_chat_response(result: dict) -> dict:
     if result.get("error"):
         return {
             "answer": result["error"],
@@ -52,4 +118,88 @@ def chat(req: ChatRequest):
         "intent": result["intent"]["intent_type"],
         "confidence": result["retrieval"]["confidence"],
         "response_type": result["response_type"],
+        "timings": result.get("timings"),
+    }
+
+
+@app.post("/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest):
+    # Runs on the event loop: retrieval is offloaded to the retriever's
+    # executor and the provider call is awaited, so no threadpool slot is held
+    result = await assistant.aprocess_query(req.query)
+    return to_chat_response(result)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """
+    Server-sent events: a ``metadata`` event (intent, pages, confidence) is
+    sent as soon as retrieval finishes, then ``token`` events as the LLM
+    generates, then ``done``, or ``error`` if the request failed; an error
+    after ``token`` events has ``truncated: true`` (the answer was cut off).
+    """
+    async def events():
+        async for event in assistant.astream_query(req.query):
+            yield format_sse(event["event"], event["data"])
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/chat/batch")
+async def chat_batch(req: ChatBatchRequest):
+    """
+    Newline-delimited JSON: one line per query in completion order (with its
+    ``index`` and ``latency_ms``), then a final ``summary`` line.
+    """
+    concurrency = min(req.concurrency or config.batch_concurrency, config.batch_concurrency * 4)
+
+    async def lines():
+        started = time.perf_counter()
+        latencies, errors = [], 0
+        async for result in assistant.aprocess_batch(req.queries, concurrency):
+            latencies.append(result["latency_ms"])
+            errors += 1 if result.get("error") else 0
+            yield json.dumps({
+                "index": result["index"],
+                "query": result["query"],
+                "latency_ms": result["latency_ms"],
+                **to_chat_response(result),
+            }) + "\n"
+
+        elapsed = time.perf_counter() - started
+        yield json.dumps({"summary": {
+            **summarize_latencies(latencies),
+            "errors": errors,
+            "wall_time_s": round(elapsed, 3),
+            "throughput_qps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        }}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/actions")
+def actions(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=500)):
+    """A page of the action journal, oldest first; ``total`` is the number of actions logged."""
+    return {
+        "total": assistant.get_action_count(),
+        "offset": offset,
+        "limit": limit,
+        "actions": assistant.get_action_history(offset, limit),
     }
+
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition of latency histograms, counters and gauges."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+ROUTE_PATHS = frozenset(route.path for route in app.routes)
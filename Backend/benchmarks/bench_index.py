@@ -0,0 +1,155 @@
+"""
+Index compression report - recall@k and memory of compressed FAISS indexes
+against the exact float32 baseline, with and without exact re-scoring.
+
+Usage:
+    python benchmarks/bench_index.py [--store vectorstore] [--k 5]
+        [--configs fp16 sq8 pq opq pca128+fp16 ivf+pq hnsw+sq8] [--output report.json]
+
+A config is a "+"-separated list of: an index type (flat, hnsw, ivf), an
+encoding (float, fp16, sq8, pq, opq), pcaN (reduce to N dims), pqM (M
+sub-quantizers, pqMxB for B-bit codes) and rescoreN (shortlist multiplier).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import dataclasses
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss
+import numpy as np
+
+from vector_index import (
+    ENCODINGS, INDEX_TYPES, VECTORS_FILENAME, IndexParams,
+    build_index, open_vectors, recall_at_k, rescore,
+)
+
+DEFAULT_CONFIGS = ["fp16", "sq8", "pq", "opq", "pca128+fp16", "pca96+pq24", "ivf+pq", "hnsw+sq8"]
+
+
+def parse_config(spec: str) -> IndexParams:
+    params = IndexParams()
+    for part in spec.split("+"):
+        if part in INDEX_TYPES:
+            params.index_type = part
+        elif part in ENCODINGS:
+            params.encoding = part
+        elif part.startswith("pca"):
+            params.pca_dim = int(part[3:])
+        elif part.startswith("rescore"):
+            params.rescore = int(part[7:])
+        elif part.startswith(("pq", "opq")):
+            # pqM / opqM, optionally pqMxB for B-bit codes
+            params.encoding = "opq" if part.startswith("opq") else "pq"
+            m, _, nbits = part[len(params.encoding):].partition("x")
+            params.pq_m = int(m)
+            params.pq_nbits = int(nbits) if nbits else params.pq_nbits
+        else:
+            raise ValueError(f"Unknown config part: {part}")
+    return params
+
+
+def load_store_vectors(directory: str) -> np.ndarray:
+    params = IndexParams.load(directory)
+    vectors_path = os.path.join(directory, VECTORS_FILENAME)
+    if params is not None and os.path.exists(vectors_path):
+        return np.array(open_vectors(vectors_path, params.dim))
+    index = faiss.read_index(os.path.join(directory, "index.faiss"))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def make_queries(vectors: np.ndarray, count: int, noise: float, seed: int) -> np.ndarray:
+    """Perturbed copies of stored vectors, so each query has a realistic neighbourhood."""
+    rng = np.random.default_rng(seed)
+    queries = vectors[rng.choice(len(vectors), min(count, len(vectors)), replace=False)].copy()
+    queries += rng.normal(0, noise, queries.shape).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+    return queries.astype(np.float32)
+
+
+def evaluate(params: IndexParams, vectors: np.ndarray, queries: np.ndarray,
+             baseline_rows: np.ndarray, k: int) -> dict:
+    start = time.perf_counter()
+    index = build_index(vectors, params)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, rows = index.search(queries, k)
+    search_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    factor = params.rescore_factor if params.rescore_factor > 1 else 4
+    start = time.perf_counter()
+    _, shortlist = index.search(queries, k * factor)
+    _, rescored_rows = rescore(queries, shortlist, vectors, k)
+    rescore_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+    bytes_per_vector = params.bytes_per_vector()
+    return {
+        "factory": params.factory_string(),
+        "index_bytes": int(faiss.serialize_index(index).size),
+        "bytes_per_vector": bytes_per_vector,
+        "compression": round(4 * params.dim / bytes_per_vector, 2),
+        f"recall@{k}": round(recall_at_k(rows, baseline_rows, k), 4),
+        f"recall@{k}_rescored": round(recall_at_k(rescored_rows, baseline_rows, k), 4),
+        "rescore_factor": factor,
+        "search_us": round(search_us, 1),
+        "search_rescored_us": round(rescore_us, 1),
+        "build_s": round(build_s, 2),
+        "params": dataclasses.asdict(params),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/memory report for compressed FAISS indexes")
+    parser.add_argument("--store", default="vectorstore", help="Vector store directory")
+    parser.add_argument("--configs", nargs="*", default=DEFAULT_CONFIGS)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--noise", type=float, default=0.05, help="Gaussian noise added to sampled query vectors")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    vectors = np.ascontiguousarray(load_store_vectors(args.store), dtype=np.float32)
+    queries = make_queries(vectors, args.queries, args.noise, args.seed)
+
+    baseline = faiss.IndexFlatL2(vectors.shape[1])
+    baseline.add(vectors)
+    _, baseline_rows = baseline.search(queries, args.k)
+
+    print(f"{len(vectors)} vectors x {vectors.shape[1]} dims, {len(queries)} queries, k={args.k}")
+    print(f"Baseline float32: {4 * vectors.shape[1]} bytes/vector\n")
+    header = f"{'config':<16}{'factory':<24}{'B/vec':>8}{'ratio':>8}{'recall':>9}{'rescored':>10}{'us/q':>9}"
+    print(header)
+    print("-" * len(header))
+
+    results = {}
+    for spec in args.configs:
+        try:
+            result = evaluate(parse_config(spec), vectors, queries, baseline_rows, args.k)
+        except (RuntimeError, ValueError) as e:
+            print(f"{spec:<16}failed: {str(e).splitlines()[0]}")
+            continue
+        results[spec] = result
+        print(f"{spec:<16}{result['factory']:<24}{result['bytes_per_vector']:>8g}{result['compression']:>7}x"
+              f"{result[f'recall@{args.k}']:>9.3f}{result[f'recall@{args.k}_rescored']:>10.3f}"
+              f"{result['search_rescored_us']:>9.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "store": args.store,
+                "vectors": len(vectors),
+                "dim": int(vectors.shape[1]),
+                "queries": len(queries),
+                "k": args.k,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nReport saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
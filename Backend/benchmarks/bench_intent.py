@@ -0,0 +1,121 @@
+"""
+Intent matcher benchmark - compiled keyword automaton vs. per-keyword scans
+
+Usage:
+    python benchmarks/bench_intent.py [--keywords 10000] [--queries 2000]
+"""
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ACTION_KEYWORDS
+from intent_detector import IntentDetector
+from keyword_matcher import KeywordAutomaton
+
+
+VOCABULARY = [
+    "ticket", "leave", "meeting", "laptop", "vpn", "password", "access", "payroll",
+    "schedule", "request", "issue", "error", "printer", "email", "policy", "holiday",
+    "server", "database", "deploy", "review", "manager", "team", "report", "invoice",
+]
+
+
+def linear_scores(action_keywords, query_lower):
+    """Reference scoring: one lower/startswith/substring check per keyword."""
+    results = {}
+    for action_type, keywords in action_keywords.items():
+        score = 0
+        matched = []
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if query_lower == keyword_lower:
+                score += 20
+                matched.append(keyword)
+            elif query_lower.startswith(keyword_lower):
+                score += 10
+                matched.append(keyword)
+            elif keyword_lower in query_lower:
+                score += 2 * len(keyword.split())
+                matched.append(keyword)
+        if score > 0:
+            results[action_type] = (score, matched)
+    return results
+
+
+def build_keyword_table(size: int, rng: random.Random):
+    """Real keywords plus synthetic 1-4 word phrases up to ``size`` entries."""
+    table = {action: list(keywords) for action, keywords in ACTION_KEYWORDS.items()}
+    actions = list(table)
+    total = sum(len(keywords) for keywords in table.values())
+    while total < size:
+        phrase = " ".join(rng.choice(VOCABULARY) + str(rng.randint(0, 999)) for _ in range(rng.randint(1, 4)))
+        table[rng.choice(actions)].append(phrase)
+        total += 1
+    return table
+
+
+def build_queries(table, count: int, rng: random.Random):
+    keywords = [keyword for keywords in table.values() for keyword in keywords]
+    queries = []
+    for _ in range(count):
+        words = [rng.choice(VOCABULARY) for _ in range(rng.randint(4, 14))]
+        if rng.random() < 0.5:
+            words.insert(rng.randint(0, len(words)), rng.choice(keywords))
+        queries.append(" ".join(words))
+    return queries
+
+
+def time_per_query(fn, queries):
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return (time.perf_counter() - start) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark intent keyword matching")
+    parser.add_argument("--keywords", type=int, default=10000, help="Total keyword table size")
+    parser.add_argument("--queries", type=int, default=2000, help="Number of queries to score")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    table = build_keyword_table(args.keywords, rng)
+    queries = build_queries(table, args.queries, rng)
+    keyword_count = sum(len(keywords) for keywords in table.values())
+
+    start = time.perf_counter()
+    automaton = KeywordAutomaton(table)
+    automaton.score("")
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = sum(
+        1 for query in queries
+        if automaton.score(query.lower().strip()) != linear_scores(table, query.lower().strip())
+    )
+
+    linear_us = time_per_query(lambda q: linear_scores(table, q.lower().strip()), queries)
+    compiled_us = time_per_query(lambda q: automaton.score(q.lower().strip()), queries)
+
+    detector = IntentDetector()
+    detector.action_keywords = table
+    detector.detect_intent("")  # compile outside the timed loop
+    detect_us = time_per_query(detector.detect_intent, queries)
+
+    print(f"Keywords: {keyword_count}, queries: {len(queries)}")
+    print(f"Compile time: {compile_ms:.1f} ms")
+    print(f"Per-keyword scan:   {linear_us:9.1f} us/query")
+    print(f"Compiled automaton: {compiled_us:9.1f} us/query ({linear_us / compiled_us:.1f}x)")
+    print(f"detect_intent:      {detect_us:9.1f} us/query")
+    print(f"Score mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+Pipeline benchmark - per-stage latency and throughput of the whole assistant,
+through AgenticRAGAssistant.process_query and through the FastAPI app, with a
+deterministic in-process LLM stub in place of the provider.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--queries queries.jsonl] [--repeat 3]
+        [--targets process_query api] [--concurrency 8]
+        [--llm-latency-ms 200] [--llm-jitter-ms 50] [--warm]
+        [--output results.json] [--compare baseline.json]
+
+Stages come from each result's ``timings`` (intent, embed, search, assemble,
+prompt, llm, action, ...); ``retrieval`` includes batch_wait (micro-batcher
+queueing), embed, search and assemble, and ``llm`` includes prompt. The api
+target adds ``request``, the latency seen by the HTTP client. By default caches are cold: the answer and completion caches are off and query
+vectors are not cached, so every query is embedded. ``--compare`` prints
+the change against an earlier ``--output`` file and exits non-zero when a
+p95 regressed by more than ``--max-regression`` percent.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from llm_stub import StubLLM
+from timing import summarize_latencies
+
+DEFAULT_QUERIES = [
+    "What is HCLTech's revenue growth in 2024-25?",
+    "What are the key strategic initiatives mentioned in the annual report?",
+    "What technologies is HCLTech investing in?",
+    "How many employees does HCLTech have?",
+    "What was the EBIT margin for FY25?",
+    "Summarize the sustainability commitments",
+    "Who are the members of the board of directors?",
+    "What dividends were declared during the year?",
+    "FY25 EBIT",
+    "What is the capital of France?",
+    "File a ticket for laptop not connecting to VPN",
+    "Apply for 3 days of casual leave next week",
+    "Schedule a meeting with IT team to discuss cloud migration",
+    "Request software installation for Visual Studio Code",
+    "Escalate the payroll issue, it is urgent",
+    "Update documentation for the onboarding guide",
+]
+
+# Display order; any other stage found in the timings is listed after these
+STAGE_ORDER = ("request", "total", "intent", "answer_cache", "retrieval", "retrieval_wait",
+               "batch_wait", "embed", "search", "assemble", "action", "llm", "prompt")
+
+
+def load_queries(path: Optional[str]) -> List[str]:
+    if not path:
+        return list(DEFAULT_QUERIES)
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line) if line[0] in '{["' else line
+                queries.append(item["query"] if isinstance(item, dict) else item)
+    return queries
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(timings: List[Dict[str, float]], wall_time_s: float, errors: int) -> dict:
+    samples: Dict[str, List[float]] = {}
+    for entry in timings:
+        for key, value in entry.items():
+            samples.setdefault(key[:-3] if key.endswith("_ms") else key, []).append(value)
+
+    names = [name for name in STAGE_ORDER if name in samples] + sorted(set(samples) - set(STAGE_ORDER))
+    requests = len(timings) + errors
+    return {
+        "requests": requests,
+        "errors": errors,
+        "wall_time_s": round(wall_time_s, 3),
+        "throughput_qps": round(requests / wall_time_s, 2) if wall_time_s else 0.0,
+        "stages": {name: summarize_latencies(samples[name]) for name in names},
+    }
+
+
+def run_process_query(assistant, queries: List[str], repeat: int) -> dict:
+    timings, errors = [], 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            result = assistant.process_query(query)
+            if result.get("error"):
+                errors += 1
+            else:
+                timings.append(result["timings"])
+    return summarize(timings, time.perf_counter() - started, errors)
+
+
+async def run_api(app, queries: List[str], repeat: int, concurrency: int) -> dict:
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    timings, errors = [], 0
+
+    async def request(client, query):
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post("/chat", json={"query": query})
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        body = response.json() if response.status_code == 200 else {}
+        if body.get("response_type") in (None, "error"):
+            errors += 1
+            return
+        timings.append({**(body.get("timings") or {}), "request_ms": round(elapsed_ms, 2)})
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(request(client, query) for _ in range(repeat) for query in queries))
+        wall_time_s = time.perf_counter() - started
+    return summarize(timings, wall_time_s, errors)
+
+
+def print_report(name: str, report: dict):
+    print(f"\n[{name}] {report['requests']} requests, {report['errors']} errors, "
+          f"{report['wall_time_s']}s, {report['throughput_qps']} req/s")
+    header = f"  {'stage':<16}{'count':>7}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}"
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+    for stage, summary in report["stages"].items():
+        print(f"  {stage:<16}{summary['count']:>7}{summary['mean_ms']:>10.2f}{summary['p50_ms']:>10.2f}"
+              f"{summary['p95_ms']:>10.2f}{summary['p99_ms']:>10.2f}{summary['max_ms']:>10.2f}")
+
+
+def compare(results: dict, baseline: dict, max_regression: float) -> int:
+    """Print p50/p95 changes against ``baseline``; return the number of p95 regressions."""
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('timestamp', '?')}):")
+    if baseline.get("settings") != results["settings"]:
+        print(f"  Note: settings differ from the baseline's {baseline.get('settings')}")
+    regressions = 0
+    for target, report in results["targets"].items():
+        old_report = baseline.get("targets", {}).get(target)
+        if old_report is None:
+            continue
+        old_qps, new_qps = old_report["throughput_qps"], report["throughput_qps"]
+        print(f"\n[{target}] throughput {old_qps} -> {new_qps} req/s")
+        for stage, summary in report["stages"].items():
+            old = old_report["stages"].get(stage)
+            if old is None or not old["count"]:
+                continue
+            changes = []
+            for key in ("p50_ms", "p95_ms"):
+                delta = (summary[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+                changes.append(f"{key[:-3]} {old[key]:.2f} -> {summary[key]:.2f} ms ({delta:+.1f}%)")
+                if key == "p95_ms" and delta > max_regression and summary[key] - old[key] > 1.0:
+                    regressions += 1
+                    changes[-1] += " REGRESSION"
+            print(f"  {stage:<16}" + "   ".join(changes))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the assistant pipeline per stage")
+    parser.add_argument("--queries", help="JSONL ({\"query\": ...} or strings) or plain text, one query per line")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the query set")
+    parser.add_argument("--warmup", type=int, default=3, help="Queries run before measuring")
+    parser.add_argument("--targets", nargs="+", choices=("process_query", "api"), default=["process_query", "api"])
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent requests for the api target")
+    parser.add_argument("--store", help="Vector store directory (default: VECTOR_DB_PATH)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0)
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--warm", action="store_true", help="Keep the answer, completion and query caches enabled")
+    parser.add_argument("--output", help="Write results as JSON")
+    parser.add_argument("--compare", help="Earlier --output file to compare against")
+    parser.add_argument("--max-regression", type=float, default=10.0, help="Allowed p95 increase in percent")
+    args = parser.parse_args()
+
+    if args.store:
+        os.environ["VECTOR_DB_PATH"] = args.store
+    if not args.warm:
+        os.environ["ANSWER_CACHE_ENABLED"] = "false"
+        os.environ["COMPLETION_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("LLM_API_KEY", "benchmark")
+
+    queries = load_queries(args.queries)
+    stub = StubLLM(args.llm_latency_ms, args.llm_jitter_ms, seed=args.seed)
+
+    # api_server builds its assistant at import; benchmark that one for both targets
+    from api_server import app, assistant, config
+    logging.disable(logging.CRITICAL)
+    stub.install(assistant.llm_handler)
+    if not args.warm:
+        assistant.retriever.query_cache.max_size = 0
+
+    for query in queries[:args.warmup]:
+        assistant.process_query(query)
+
+    results = {
+        "benchmark": "pipeline",
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "queries": len(queries),
+            "repeat": args.repeat,
+            "concurrency": args.concurrency,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_jitter_ms": args.llm_jitter_ms,
+            "caches": "warm" if args.warm else "cold",
+            "top_k": config.top_k,
+            "retrieval_mode": config.retrieval_mode,
+            "index": assistant.retriever.index_params.factory_string(),
+        },
+        "targets": {},
+    }
+
+    print(f"{len(queries)} queries x {args.repeat}, LLM stub {args.llm_latency_ms:g}+{args.llm_jitter_ms:g} ms, "
+          f"{results['settings']['caches']} caches, {results['settings']['index']} index")
+
+    if "process_query" in args.targets:
+        results["targets"]["process_query"] = run_process_query(assistant, queries, args.repeat)
+        print_report("process_query", results["targets"]["process_query"])
+    if "api" in args.targets:
+        results["targets"]["api"] = asyncio.run(run_api(app, queries, args.repeat, args.concurrency))
+        print_report(f"api, concurrency {args.concurrency}", results["targets"]["api"])
+    print(f"\nLLM stub calls: {stub.calls}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n{regressions} p95 regression(s) above {args.max_regression}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
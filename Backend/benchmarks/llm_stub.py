@@ -0,0 +1,66 @@
+"""
+Deterministic in-process LLM stub for benchmarks.
+
+Replaces the provider calls of an LLMHandler, so the full pipeline (prompt
+building, fallbacks, streaming) runs without network access or API keys.
+Each prompt gets the same latency and answer on every run: the jitter is
+derived from a CRC of the prompt and the seed.
+"""
+import time
+import zlib
+import asyncio
+import random
+from typing import AsyncIterator
+
+from llm_handler import PROVIDERS
+
+
+class StubLLM:
+    """Answers after ``latency_ms`` (+ up to ``jitter_ms``); streams in ``chunks`` parts."""
+
+    def __init__(self, latency_ms: float = 200.0, jitter_ms: float = 0.0, chunks: int = 8, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.chunks = max(1, chunks)
+        self.seed = seed
+        self.calls = 0
+
+    def latency(self, prompt: str) -> float:
+        """Seconds this prompt takes; a pure function of the prompt and seed."""
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")) ^ self.seed)
+        return (self.latency_ms + rng.random() * self.jitter_ms) / 1000.0
+
+    def answer(self, prompt: str) -> str:
+        digest = zlib.crc32(prompt.encode("utf-8"))
+        return f"Stub answer {digest:08x} for a {len(prompt)} character prompt."
+
+    def generate(self, prompt: str) -> str:
+        self.calls += 1
+        time.sleep(self.latency(prompt))
+        return self.answer(prompt)
+
+    async def agenerate(self, prompt: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.latency(prompt))
+        return self.answer(prompt)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        self.calls += 1
+        text = self.answer(prompt)
+        step = max(1, -(-len(text) // self.chunks))
+        delay = self.latency(prompt) / self.chunks
+        for start in range(0, len(text), step):
+            await asyncio.sleep(delay)
+            yield text[start:start + step]
+
+    def install(self, handler) -> "StubLLM":
+        """Route every provider of ``handler`` (an LLMHandler) and its backups to this stub."""
+        for backend in handler.backends:
+            for provider in PROVIDERS:
+                setattr(backend, f"_generate_{provider}", self.generate)
+                setattr(backend, f"_agenerate_{provider}", self.agenerate)
+                setattr(backend, f"_astream_{provider}", self.astream)
+        if handler.config.llm_provider not in PROVIDERS:
+            # Unknown providers skip the LLM entirely; benchmark a real code path instead
+            handler.config.llm_provider = PROVIDERS[0]
+        return self
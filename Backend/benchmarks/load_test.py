@@ -0,0 +1,302 @@
+"""
+Load generator - replays a query mix against the API at increasing load to
+find where it saturates.
+
+Usage:
+    python benchmarks/load_test.py --mode open --rates 5 10 20 40 [--duration 15]
+    python benchmarks/load_test.py --mode closed --concurrency 1 4 16 64
+        [--url http://127.0.0.1:8000] [--stream-fraction 0.2] [--slo-ms 2000]
+        [--queries queries.jsonl] [--output load.json]
+
+Open loop sends requests at a fixed arrival rate (``--arrival poisson`` or
+``uniform``) whether or not earlier ones finished, so latency is measured
+from each request's scheduled time and includes any backlog. Closed loop
+runs N clients that each send their next request when the previous one
+completes (plus ``--think-ms``).
+
+Without ``--url`` the FastAPI app runs in-process with the LLM stub from
+llm_stub.py, so no server, network or API key is needed; note that the
+in-process transport delivers a streamed body at once, so time to first
+token is only meaningful with ``--url``. To load a real server offline,
+run it with ``LLM_PROVIDER=local`` against local_llm_server.py.
+
+Reported per step: throughput, latency percentiles, error rate, and
+queueing delay: ``lag`` is how late the generator sent a request (open loop
+only), and ``queue`` is the part of the server-side latency spent outside
+the query pipeline (HTTP handling and event loop backlog), from the
+``timings`` that /chat returns.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from bench_pipeline import git_commit, load_queries
+from llm_stub import StubLLM
+from timing import summarize_latencies
+
+
+@dataclass
+class Sample:
+    endpoint: str
+    scheduled: float
+    started: float
+    first_byte: float = 0.0
+    finished: float = 0.0
+    error: Optional[str] = None
+    server_ms: Optional[float] = None
+
+
+async def send(client, endpoint: str, query: str, scheduled: float) -> Sample:
+    import httpx
+
+    sample = Sample(endpoint, scheduled, time.perf_counter())
+    try:
+        if endpoint == "chat":
+            response = await client.post("/chat", json={"query": query})
+            sample.first_byte = time.perf_counter()
+            if response.status_code != 200:
+                sample.error = f"http_{response.status_code}"
+            else:
+                body = response.json()
+                if body.get("response_type") == "error":
+                    sample.error = "response_error"
+                sample.server_ms = (body.get("timings") or {}).get("total_ms")
+        else:
+            async with client.stream("POST", "/chat/stream", json={"query": query}) as response:
+                if response.status_code != 200:
+                    sample.error = f"http_{response.status_code}"
+                async for line in response.aiter_lines():
+                    if line == "event: token" and not sample.first_byte:
+                        sample.first_byte = time.perf_counter()
+                    elif line == "event: error":
+                        sample.error = "stream_error"
+    except httpx.HTTPError as e:
+        sample.error = type(e).__name__
+    sample.finished = time.perf_counter()
+    sample.first_byte = sample.first_byte or sample.finished
+    return sample
+
+
+def pick_endpoint(rng: random.Random, stream_fraction: float) -> str:
+    return "stream" if rng.random() < stream_fraction else "chat"
+
+
+async def open_loop(client, queries: List[str], rate: float, duration: float, arrival: str,
+                    max_in_flight: int, stream_fraction: float, rng: random.Random) -> dict:
+    samples, tasks, dropped = [], set(), 0
+
+    async def run(query: str, endpoint: str, scheduled: float):
+        samples.append(await send(client, endpoint, query, scheduled))
+
+    started = time.perf_counter()
+    next_at, i = started, 0
+    while next_at - started < duration:
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        if len(tasks) >= max_in_flight:
+            dropped += 1
+        else:
+            task = asyncio.create_task(run(queries[i % len(queries)], pick_endpoint(rng, stream_fraction), next_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        i += 1
+        next_at += rng.expovariate(rate) if arrival == "poisson" else 1.0 / rate
+
+    if tasks:
+        await asyncio.gather(*tasks)
+    return summarize(samples, time.perf_counter() - started, dropped, offered_qps=rate)
+
+
+async def closed_loop(client, queries: List[str], concurrency: int, duration: float, think_ms: float,
+                      stream_fraction: float, rng: random.Random) -> dict:
+    samples = []
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def worker(offset: int):
+        i = offset
+        while time.perf_counter() < deadline:
+            now = time.perf_counter()
+            samples.append(await send(client, pick_endpoint(rng, stream_fraction), queries[i % len(queries)], now))
+            i += concurrency
+            if think_ms:
+                await asyncio.sleep(think_ms / 1000.0)
+
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    return summarize(samples, time.perf_counter() - started, 0, concurrency=concurrency)
+
+
+def summarize(samples: List[Sample], wall_time_s: float, dropped: int, **load) -> dict:
+    ok = [sample for sample in samples if sample.error is None]
+    errors: Dict[str, int] = {}
+    for sample in samples:
+        if sample.error is not None:
+            errors[sample.error] = errors.get(sample.error, 0) + 1
+
+    def ms(values):
+        return summarize_latencies([value * 1000 for value in values])
+
+    streams = [sample for sample in ok if sample.endpoint == "stream"]
+    queued = [(s.finished - s.started) * 1000 - s.server_ms for s in ok if s.server_ms is not None]
+    return {
+        **load,
+        "requests": len(samples),
+        "completed": len(ok),
+        "errors": errors,
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "dropped": dropped,
+        "wall_time_s": round(wall_time_s, 3),
+        "throughput_qps": round(len(ok) / wall_time_s, 2) if wall_time_s else 0.0,
+        "latency": ms(s.finished - s.scheduled for s in ok),
+        "service": ms(s.finished - s.started for s in ok),
+        "lag": ms(s.started - s.scheduled for s in ok),
+        "queue": summarize_latencies([max(0.0, value) for value in queued]),
+        "first_token": ms(s.first_byte - s.scheduled for s in streams),
+    }
+
+
+def print_header(mode: str):
+    load = "rate" if mode == "open" else "clients"
+    header = (f"  {load:>8}{'req/s':>9}{'errors':>8}{'dropped':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+              f"{'lag p95':>9}{'queue p95':>10}{'ttft p50':>10}")
+    print(header)
+    print("  " + "-" * (len(header) - 2))
+
+
+def print_step(step: dict):
+    load = step.get("offered_qps", step.get("concurrency"))
+    latency = step["latency"]
+    ttft = f"{step['first_token']['p50_ms']:>10.1f}" if step["first_token"]["count"] else f"{'-':>10}"
+    print(f"  {load:>8g}{step['throughput_qps']:>9.2f}{step['error_rate'] * 100:>7.1f}%{step['dropped']:>9}"
+          f"{latency['p50_ms']:>9.1f}{latency['p95_ms']:>9.1f}{latency['p99_ms']:>9.1f}"
+          f"{step['lag']['p95_ms']:>9.1f}{step['queue']['p95_ms']:>10.1f}{ttft}")
+
+
+def saturation(steps: List[dict], slo_ms: float, max_error_rate: float) -> Optional[dict]:
+    """
+    First step that is saturated: it misses the p95 SLO, errors too often,
+    or (open loop) completes less than 90% of the offered rate.
+    """
+    for step in steps:
+        reasons = []
+        if step["latency"]["p95_ms"] > slo_ms:
+            reasons.append(f"p95 {step['latency']['p95_ms']:.0f} ms > {slo_ms:g} ms")
+        if step["error_rate"] > max_error_rate:
+            reasons.append(f"error rate {step['error_rate']:.1%}")
+        offered = step.get("offered_qps")
+        if offered and step["throughput_qps"] < 0.9 * offered:
+            reasons.append(f"throughput {step['throughput_qps']:.1f} < 90% of {offered:g} req/s")
+        if reasons:
+            return {"step": step.get("offered_qps", step.get("concurrency")), "reasons": reasons}
+    return None
+
+
+def in_process_app(args):
+    """The FastAPI app with the LLM stub installed and caches configured."""
+    if args.store:
+        os.environ["VECTOR_DB_PATH"] = args.store
+    if not args.warm:
+        os.environ["ANSWER_CACHE_ENABLED"] = "false"
+        os.environ["COMPLETION_CACHE_ENABLED"] = "false"
+    os.environ.setdefault("LLM_API_KEY", "benchmark")
+
+    from api_server import app, assistant
+    StubLLM(args.llm_latency_ms, args.llm_jitter_ms, seed=args.seed).install(assistant.llm_handler)
+    if not args.warm:
+        assistant.retriever.query_cache.max_size = 0
+    return app
+
+
+async def run(args, queries: List[str]) -> List[dict]:
+    import httpx
+
+    if args.url:
+        transport, base_url = None, args.url
+    else:
+        transport, base_url = httpx.ASGITransport(app=in_process_app(args)), "http://load"
+    limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+    rng = random.Random(args.seed)
+
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits,
+                                 timeout=args.timeout) as client:
+        for query in queries[:args.warmup]:
+            await send(client, "chat", query, time.perf_counter())
+
+        steps = []
+        print_header(args.mode)
+        for load in (args.rates if args.mode == "open" else args.concurrency):
+            if args.mode == "open":
+                step = await open_loop(client, queries, load, args.duration, args.arrival,
+                                       args.max_in_flight, args.stream_fraction, rng)
+            else:
+                step = await closed_loop(client, queries, int(load), args.duration, args.think_ms,
+                                         args.stream_fraction, rng)
+            steps.append(step)
+            print_step(step)
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open/closed-loop load generator for the chat API")
+    parser.add_argument("--url", help="Base URL of a running api_server (default: in-process app with the LLM stub)")
+    parser.add_argument("--mode", choices=("open", "closed"), default="open")
+    parser.add_argument("--rates", type=float, nargs="+", default=[2, 5, 10, 20], help="Open loop: requests/second per step")
+    parser.add_argument("--arrival", choices=("poisson", "uniform"), default="poisson")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="Closed loop: clients per step")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Closed loop: pause between a client's requests")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step")
+    parser.add_argument("--warmup", type=int, default=3, help="Sequential requests before the first step")
+    parser.add_argument("--stream-fraction", type=float, default=0.0, help="Share of requests sent to /chat/stream")
+    parser.add_argument("--max-in-flight", type=int, default=512, help="Open loop: arrivals beyond this are dropped")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--slo-ms", type=float, default=2000.0, help="p95 latency above which a step is saturated")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--queries", help="JSONL ({\"query\": ...} or strings) or plain text, one query per line")
+    parser.add_argument("--store", help="In-process: vector store directory (default: VECTOR_DB_PATH)")
+    parser.add_argument("--llm-latency-ms", type=float, default=200.0, help="In-process: LLM stub latency")
+    parser.add_argument("--llm-jitter-ms", type=float, default=50.0)
+    parser.add_argument("--warm", action="store_true", help="In-process: keep the answer, completion and query caches enabled")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    random.Random(args.seed).shuffle(queries)
+    logging.disable(logging.CRITICAL)
+
+    target = args.url or f"in-process app, LLM stub {args.llm_latency_ms:g}+{args.llm_jitter_ms:g} ms"
+    print(f"{args.mode} loop against {target}: {len(queries)} queries, {args.duration:g}s per step, "
+          f"{args.stream_fraction:.0%} streamed, latency in ms\n")
+    steps = asyncio.run(run(args, queries))
+
+    saturated = saturation(steps, args.slo_ms, args.max_error_rate)
+    if saturated:
+        print(f"\nSaturated at {saturated['step']:g}: {'; '.join(saturated['reasons'])}")
+    else:
+        print("\nNo step saturated; raise the load to find the limit")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                "benchmark": "load",
+                "commit": git_commit(),
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "settings": {key: value for key, value in vars(args).items() if key != "output"},
+                "steps": steps,
+                "saturation": saturated,
+            }, f, indent=2)
+        print(f"Results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Cache Module - Bounded in-process caches used on the query path
+"""
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from embedding_cache import normalize_text
+
+
+def normalize_query(query: str) -> str:
+    """
+    Cache key for a query. The embedding model is uncased and ignores
+    whitespace runs, so this never maps two queries with different
+    embeddings onto the same key.
+    """
+    return normalize_text(query).lower()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with an optional time-to-live and hit/miss counters."""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                value, stored_at = item
+                if self.ttl is None or time.monotonic() - stored_at < self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+            return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache matched by query-embedding similarity.
+
+    Entries live in a fixed-size matrix so a lookup is one matrix-vector
+    product. An entry hits when its cosine similarity to the incoming query
+    is at least ``threshold``. Entries are evicted LRU/TTL, and everything is
+    dropped when the vector store fingerprint changes.
+    """
+
+    def __init__(self, max_size: int = 512, ttl: Optional[float] = None, threshold: float = 0.95):
+        self.max_size = max_size
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.threshold = threshold
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self._matrix = None
+        self._payloads = [None] * max_size
+        self._stored_at = [0.0] * max_size
+        self._order = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _unit(vector) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _sync_fingerprint(self, fingerprint: Optional[str]):
+        if fingerprint != self.fingerprint:
+            self._clear()
+            self.fingerprint = fingerprint
+
+    def _clear(self):
+        self._order.clear()
+        self._payloads = [None] * self.max_size
+        if self._matrix is not None:
+            self._matrix[:] = 0.0
+
+    def _best_slot(self, vector: np.ndarray) -> Tuple[Optional[int], float]:
+        if not self._order:
+            return None, -1.0
+        slots = np.fromiter(self._order.keys(), dtype=np.int64, count=len(self._order))
+        similarities = self._matrix[slots] @ vector
+        best = int(np.argmax(similarities))
+        return int(slots[best]), float(similarities[best])
+
+    def get(self, vector, fingerprint: Optional[str]) -> Optional[Dict[str, Any]]:
+        if self.max_size <= 0:
+            return None
+        vector = self._unit(vector)
+
+        with self._lock:
+            self._sync_fingerprint(fingerprint)
+            slot, similarity = self._best_slot(vector)
+
+            if slot is not None and similarity >= self.threshold:
+                if self.ttl is None or time.monotonic() - self._stored_at[slot] < self.ttl:
+                    self._order.move_to_end(slot)
+                    self.hits += 1
+                    return {**self._payloads[slot], "cache_similarity": round(similarity, 4)}
+                del self._order[slot]
+                self._payloads[slot] = None
+
+            self.misses += 1
+            return None
+
+    def put(self, vector, payload: Dict[str, Any], fingerprint: Optional[str]):
+        if self.max_size <= 0:
+            return
+        vector = self._unit(vector)
+
+        with self._lock:
+            self._sync_fingerprint(fingerprint)
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_size, vector.shape[0]), dtype=np.float32)
+
+            # Replace a paraphrase that is already cached rather than storing both
+            slot, similarity = self._best_slot(vector)
+            if slot is None or similarity < self.threshold:
+                if len(self._order) < self.max_size:
+                    slot = next(i for i in range(self.max_size) if i not in self._order)
+                else:
+                    slot, _ = self._order.popitem(last=False)
+
+            self._matrix[slot] = vector
+            self._payloads[slot] = payload
+            self._stored_at[slot] = time.monotonic()
+            self._order[slot] = None
+            self._order.move_to_end(slot)
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._order),
+            "max_size": self.max_size,
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,191 @@
+"""
+Chunk Store Module - Columnar, memory-mapped storage for chunk text and metadata.
+
+Replaces the pickled LangChain docstore (index.pkl). Row ``i`` of the chunk
+store belongs to vector ``i`` of index.faiss. The file is a versioned binary
+layout of a header, a section table and 8-byte aligned sections:
+
+    text_offsets  uint64[count + 1]   byte offsets into the text blob
+    pages         int32[count]        0-based page number
+    starts        int32[count]        character offset of the chunk in its page (-1 if unknown)
+    source_ids    uint32[count]       index into the sources table
+    chunk_ids     20 bytes[count]     SHA-1 chunk id digest
+    sources       utf-8 JSON list     distinct source paths
+    text          utf-8 blob          concatenated chunk text
+
+Readers map the file and only touch the rows they are asked for, so opening
+a store is O(1) in the corpus size.
+"""
+import os
+import json
+import mmap
+import hashlib
+import struct
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+MAGIC = b"EMCS"
+VERSION = 1
+CHUNKS_FILENAME = "chunks.bin"
+
+_HEADER = struct.Struct("<4sHHQ")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = ("text_offsets", "pages", "starts", "source_ids", "chunk_ids", "sources", "text")
+_ID_SIZE = 20
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def _id_bytes(chunk_id: str) -> bytes:
+    try:
+        digest = bytes.fromhex(chunk_id)
+    except ValueError:
+        digest = b""
+    if len(digest) != _ID_SIZE:
+        # Legacy (uuid) ids are mapped onto the fixed-width id column
+        digest = hashlib.sha1(chunk_id.encode("utf-8")).digest()
+    return digest
+
+
+def write_chunk_store(path: str, records: Iterable[Tuple[str, str, int, int, str]]):
+    """
+    Write ``(chunk_id, text, page, start, source)`` records, in vector order,
+    to ``path`` atomically.
+    """
+    offsets = [0]
+    pages, starts, source_ids, ids, texts = [], [], [], [], []
+    sources = {}
+
+    for cid, text, page, start, source in records:
+        encoded = text.encode("utf-8", errors="surrogatepass")
+        texts.append(encoded)
+        offsets.append(offsets[-1] + len(encoded))
+        pages.append(page)
+        starts.append(start)
+        source_ids.append(sources.setdefault(source, len(sources)))
+        ids.append(_id_bytes(cid))
+
+    count = len(pages)
+    sections = {
+        "text_offsets": np.asarray(offsets, dtype="<u8").tobytes(),
+        "pages": np.asarray(pages, dtype="<i4").tobytes(),
+        "starts": np.asarray(starts, dtype="<i4").tobytes(),
+        "source_ids": np.asarray(source_ids, dtype="<u4").tobytes(),
+        "chunk_ids": b"".join(ids),
+        "sources": json.dumps(list(sources)).encode("utf-8"),
+    }
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        position = _align(_HEADER.size + _SECTION.size * len(_SECTIONS))
+        table = []
+        for name in _SECTIONS:
+            length = offsets[-1] if name == "text" else len(sections[name])
+            table.append((position, length))
+            position = _align(position + length)
+
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, count))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+
+        for name, (offset, _) in zip(_SECTIONS, table):
+            f.write(b"\0" * (offset - f.tell()))
+            if name == "text":
+                for encoded in texts:
+                    f.write(encoded)
+            else:
+                f.write(sections[name])
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class ChunkStore:
+    """Read-only, lazily paged view over a chunk store file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Chunk store is empty or truncated: {path}")
+
+        magic, version, _, count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a chunk store: {path}")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Unsupported chunk store version {version} (supported: {VERSION})")
+
+        self.version = version
+        self.count = count
+        table = {
+            name: _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            for i, name in enumerate(_SECTIONS)
+        }
+
+        def view(name, dtype):
+            offset, length = table[name]
+            return np.frombuffer(self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+        self._text_offsets = view("text_offsets", "<u8")
+        self._pages = view("pages", "<i4")
+        self._starts = view("starts", "<i4")
+        self._source_ids = view("source_ids", "<u4")
+        self._ids_offset = table["chunk_ids"][0]
+        self._text_base = table["text"][0]
+
+        offset, length = table["sources"]
+        self.sources = json.loads(self._mmap[offset:offset + length].decode("utf-8"))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def text(self, row: int) -> str:
+        begin, end = int(self._text_offsets[row]), int(self._text_offsets[row + 1])
+        return self._mmap[self._text_base + begin:self._text_base + end].decode("utf-8", errors="surrogatepass")
+
+    def page(self, row: int) -> int:
+        return int(self._pages[row])
+
+    def start(self, row: int) -> int:
+        return int(self._starts[row])
+
+    def source(self, row: int) -> str:
+        return self.sources[self._source_ids[row]]
+
+    def chunk_id(self, row: int) -> str:
+        offset = self._ids_offset + row * _ID_SIZE
+        return self._mmap[offset:offset + _ID_SIZE].hex()
+
+    def document(self, row: int) -> Document:
+        metadata = {"page": self.page(row), "source": self.source(row), "chunk_id": self.chunk_id(row)}
+        start = self.start(row)
+        if start >= 0:
+            metadata["start"] = start
+        return Document(page_content=self.text(row), metadata=metadata)
+
+    def documents(self, rows: Iterable[int]) -> List[Document]:
+        return [self.document(int(row)) for row in rows]
+
+    def close(self):
+        # numpy views keep the buffer exported; drop them before closing the map
+        self._text_offsets = self._pages = self._starts = self._source_ids = None
+        try:
+            self._mmap.close()
+        except (BufferError, AttributeError):
+            pass
+        self._file.close()
+
+
+def open_chunk_store(directory: str) -> Optional[ChunkStore]:
+    path = os.path.join(directory, CHUNKS_FILENAME)
+    return ChunkStore(path) if os.path.exists(path) else None
@@ -0,0 +1,147 @@
+"""
+Completion Cache Module - Persistent LLM completions keyed by prompt
+fingerprint, shared by every worker process on the host.
+
+The key is a SHA-256 of (provider, model, temperature, max_tokens, prompt),
+so a byte-identical prompt sent with the same generation settings returns
+the stored completion without a provider call. A completion is stored under
+the provider and model that produced it; callers with fallback providers
+look up each provider's key in order of preference. Entries live in a
+SQLite database in WAL mode: readers never wait for a writer, and
+concurrent writers from other processes wait up to ``busy_timeout`` for
+the lock.
+
+Eviction is least-recently-used and approximate. ``last_used`` is only
+rewritten when it is older than ``TOUCH_INTERVAL`` so hits stay read-only,
+and each process trims the table back to ``max_entries`` every
+``EVICT_EVERY`` writes, so it can briefly hold a few more entries.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key BLOB PRIMARY KEY,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used);
+"""
+
+
+class CompletionCache:
+    """Size-bounded, multi-process LRU store of LLM completions on disk."""
+
+    TOUCH_INTERVAL = 60.0
+    EVICT_EVERY = 64
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: Optional[float] = None,
+                 busy_timeout: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.busy_timeout = busy_timeout
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    @staticmethod
+    def key(provider: str, model: str, temperature: float, max_tokens: int, prompt: str) -> bytes:
+        fields = json.dumps([provider, model, float(temperature), int(max_tokens), prompt], ensure_ascii=False)
+        return hashlib.sha256(fields.encode("utf-8")).digest()
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread, reopened after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, *keys: bytes) -> Optional[str]:
+        """
+        The completion stored under the first of ``keys`` that has a live
+        one, or None. Storage errors count as misses.
+        """
+        now = time.time()
+        row = None
+        try:
+            conn = self._connection()
+            rows = conn.execute(f"SELECT key, response, created, last_used FROM completions "
+                                f"WHERE key IN ({', '.join('?' * len(keys))})", keys).fetchall()
+            found = {key: (response, created, last_used) for key, response, created, last_used in rows
+                     if self.ttl is None or now - created <= self.ttl}
+            key = next((key for key in keys if key in found), None)
+            if key is not None:
+                row = found[key]
+                if now - row[2] > self.TOUCH_INTERVAL:
+                    conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (now, key))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Completion cache read failed: {str(e)}")
+            row = None
+
+        self._count(row is not None)
+        return row[0] if row is not None else None
+
+    def put(self, key: bytes, response: str):
+        now = time.time()
+        try:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO completions (key, response, created, last_used) VALUES (?, ?, ?, ?)",
+                         (key, response, now, now))
+            with self._lock:
+                self._writes += 1
+                evict = (self._writes - 1) % self.EVICT_EVERY == 0
+            if evict:
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Completion cache write failed: {str(e)}")
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        if self.ttl is not None:
+            conn.execute("DELETE FROM completions WHERE created < ?", (now - self.ttl,))
+        excess = conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0] - self.max_entries
+        if excess > 0:
+            conn.execute("DELETE FROM completions WHERE key IN "
+                         "(SELECT key FROM completions ORDER BY last_used LIMIT ?)", (excess,))
+
+    def __len__(self) -> int:
+        try:
+            return self._connection().execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "max_size": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
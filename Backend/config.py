@@ -1,7 +1,8 @@
 import os
+import copy
 import logging
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -57,6 +58,82 @@ ACTION_KEYWORDS = {
     'search': ['search', 'look for', 'locate'],
 }
 
+# Retrieval policy per action type. Information queries always retrieve.
+#   skip       - no retrieval; the action response is written without document context
+#   defer      - retrieve after the action runs, and only if it succeeded
+#   concurrent - retrieve on the retrieval executor while the action runs
+# Override per deployment with e.g. ACTION_RETRIEVAL_POLICY="apply_leave=defer,file_ticket=skip"
+RETRIEVAL_POLICIES = ('skip', 'defer', 'concurrent')
+DEFAULT_RETRIEVAL_POLICY = 'concurrent'
+ACTION_RETRIEVAL_POLICY = {
+    'file_ticket': 'concurrent',
+    'schedule_meeting': 'skip',
+    'request_software': 'defer',
+    'escalate_issue': 'concurrent',
+    'apply_leave': 'skip',
+    'update_documentation': 'concurrent',
+}
+
+# LLM providers LLMHandler can call. "local" is any OpenAI-compatible server
+# at LLM_BASE_URL, such as local_llm_server.py for offline load testing
+LLM_PROVIDERS = ('groq', 'anthropic', 'openai', 'local')
+DEFAULT_LOCAL_BASE_URL = "http://127.0.0.1:8001/v1"
+
+# Context windows (prompt + completion tokens) of known models, matched by
+# longest name prefix so dated snapshots such as "gpt-4o-2024-08-06" resolve.
+# Unknown models, including whatever a local server runs, get DEFAULT_CONTEXT_WINDOW
+MODEL_CONTEXT_WINDOWS = {
+    'llama-3.3-70b-versatile': 131072,
+    'llama-3.1-70b-versatile': 131072,
+    'llama-3.1-8b-instant': 131072,
+    'mixtral-8x7b-32768': 32768,
+    'claude-3': 200000,
+    'gpt-4o': 128000,
+    'gpt-4-turbo': 128000,
+    'gpt-4': 8192,
+    'gpt-3.5-turbo': 16385,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+# Tokens kept free for the prompt template, the question and action details
+PROMPT_OVERHEAD_TOKENS = 512
+
+# Ranking used for information queries
+#   dense  - embedding similarity only
+#   hybrid - dense and BM25 rankings fused with reciprocal rank fusion
+RETRIEVAL_MODES = ('dense', 'hybrid')
+
+
+def parse_llm_fallbacks(spec: str) -> List[Tuple[str, str]]:
+    """Parse "provider:model,provider:model" into (provider, model) pairs."""
+    fallbacks = []
+    for item in spec.split(","):
+        provider, _, model = item.strip().partition(":")
+        if provider:
+            fallbacks.append((provider.strip().lower(), model.strip()))
+    return fallbacks
+
+
+def model_context_window(model: str) -> int:
+    model = model.lower()
+    matches = [name for name in MODEL_CONTEXT_WINDOWS if model.startswith(name)]
+    return MODEL_CONTEXT_WINDOWS[max(matches, key=len)] if matches else DEFAULT_CONTEXT_WINDOW
+
+
+def context_token_budget(models: List[str], max_tokens: int) -> int:
+    """Tokens of retrieved context that fit every model in ``models`` next to the prompt and a ``max_tokens`` answer."""
+    window = min(model_context_window(model) for model in models)
+    return max(0, window - max_tokens - PROMPT_OVERHEAD_TOKENS)
+
+
+def parse_retrieval_policy(spec: str) -> Dict[str, str]:
+    """Parse "action=policy,action=policy" into a dict."""
+    policy = {}
+    for item in spec.split(","):
+        if "=" in item:
+            action_type, value = item.split("=", 1)
+            policy[action_type.strip()] = value.strip().lower()
+    return policy
+
 
 @dataclass
 class RetrieverConfig:
@@ -66,11 +143,28 @@ class RetrieverConfig:
     embedding_model: str = field(default_factory=lambda: os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"))
     top_k: int = field(default_factory=lambda: int(os.getenv("TOP_K", "5")))
     similarity_threshold: float = field(default_factory=lambda: float(os.getenv("SIMILARITY_THRESHOLD", "0.3")))
+    adaptive_k_gap: float = field(default_factory=lambda: float(os.getenv("ADAPTIVE_K_GAP", "0.1")))
     confidence_base: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_BASE", "0.7")))
     confidence_multiplier: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_MULTIPLIER", "0.3")))
     confidence_max: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_MAX", "0.95")))
     chunk_size: int = field(default_factory=lambda: int(os.getenv("CHUNK_SIZE", "500")))
     chunk_overlap: int = field(default_factory=lambda: int(os.getenv("CHUNK_OVERLAP", "50")))
+    query_cache_size: int = field(default_factory=lambda: int(os.getenv("QUERY_CACHE_SIZE", "1024")))
+    query_cache_ttl: float = field(default_factory=lambda: float(os.getenv("QUERY_CACHE_TTL", "3600")))
+    store_check_interval: float = field(default_factory=lambda: float(os.getenv("STORE_CHECK_INTERVAL", "30")))
+    retrieval_workers: int = field(default_factory=lambda: int(os.getenv("RETRIEVAL_WORKERS", "4")))
+    batch_max_size: int = field(default_factory=lambda: int(os.getenv("QUERY_BATCH_MAX_SIZE", "32")))
+    batch_max_wait_ms: float = field(default_factory=lambda: float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "5")))
+    context_token_budget: int = field(default_factory=lambda: int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000")))
+    context_chars_per_token: float = field(default_factory=lambda: float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "4")))
+    hnsw_ef_search: int = field(default_factory=lambda: int(os.getenv("HNSW_EF_SEARCH", "0")))
+    ivf_nprobe: int = field(default_factory=lambda: int(os.getenv("IVF_NPROBE", "0")))
+    rescore_factor: int = field(default_factory=lambda: int(os.getenv("RESCORE_FACTOR", "0")))
+    retrieval_mode: str = field(default_factory=lambda: os.getenv("RETRIEVAL_MODE", "hybrid").lower())
+    hybrid_depth: int = field(default_factory=lambda: int(os.getenv("HYBRID_DEPTH", "50")))
+    rrf_k: int = field(default_factory=lambda: int(os.getenv("RRF_K", "60")))
+    lexical_fast_path: bool = field(default_factory=lambda: os.getenv("LEXICAL_FAST_PATH", "true").lower() == "true")
+    lexical_min_match: float = field(default_factory=lambda: float(os.getenv("LEXICAL_MIN_MATCH", "1.0")))
 
 
 @dataclass
@@ -81,6 +175,23 @@ class AgentConfig:
     llm_provider: str = field(default_factory=lambda: os.getenv("LLM_PROVIDER", "groq"))
     model_name: str = field(default_factory=lambda: os.getenv("MODEL_NAME", "llama-3.3-70b-versatile"))
     llm_api_key: Optional[str] = field(default_factory=lambda: os.getenv("LLM_API_KEY"))
+    llm_base_url: str = field(default_factory=lambda: os.getenv("LLM_BASE_URL", DEFAULT_LOCAL_BASE_URL))
+    llm_timeout: float = field(default_factory=lambda: float(os.getenv("LLM_TIMEOUT", "60")))
+    llm_connect_timeout: float = field(default_factory=lambda: float(os.getenv("LLM_CONNECT_TIMEOUT", "10")))
+    llm_max_connections: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_CONNECTIONS", "100")))
+    llm_keepalive_connections: int = field(default_factory=lambda: int(os.getenv("LLM_KEEPALIVE_CONNECTIONS", "20")))
+    llm_keepalive_expiry: float = field(default_factory=lambda: float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30")))
+    llm_max_retries: int = field(default_factory=lambda: int(os.getenv("LLM_MAX_RETRIES", "3")))
+    llm_retry_base_delay: float = field(default_factory=lambda: float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25")))
+    llm_retry_max_delay: float = field(default_factory=lambda: float(os.getenv("LLM_RETRY_MAX_DELAY", "4")))
+    llm_breaker_failures: int = field(default_factory=lambda: int(os.getenv("LLM_BREAKER_FAILURES", "5")))
+    llm_breaker_reset: float = field(default_factory=lambda: float(os.getenv("LLM_BREAKER_RESET", "30")))
+    # Backup providers in order, e.g. LLM_FALLBACKS="openai:gpt-4o-mini,local:local-model"
+    # (a missing model reuses MODEL_NAME; keys come from <PROVIDER>_API_KEY, else LLM_API_KEY)
+    llm_fallbacks: List[Tuple[str, str]] = field(default_factory=lambda: parse_llm_fallbacks(os.getenv("LLM_FALLBACKS", "")))
+    llm_hedge_percentile: float = field(default_factory=lambda: float(os.getenv("LLM_HEDGE_PERCENTILE", "95")))
+    llm_hedge_delay_ms: float = field(default_factory=lambda: float(os.getenv("LLM_HEDGE_DELAY_MS", "2000")))
+    llm_hedge_min_delay_ms: float = field(default_factory=lambda: float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "100")))
     temperature: float = field(default_factory=lambda: float(os.getenv("TEMPERATURE", "0.7")))
     max_tokens: int = field(default_factory=lambda: int(os.getenv("MAX_TOKENS", "2048")))
     
@@ -93,16 +204,56 @@ class AgentConfig:
     # Retrieval Configuration
     top_k: int = field(default_factory=lambda: int(os.getenv("TOP_K", "5")))
     similarity_threshold: float = field(default_factory=lambda: float(os.getenv("SIMILARITY_THRESHOLD", "0.3")))
+    adaptive_k_gap: float = field(default_factory=lambda: float(os.getenv("ADAPTIVE_K_GAP", "0.1")))
     confidence_base: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_BASE", "0.7")))
     confidence_multiplier: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_MULTIPLIER", "0.3")))
     confidence_max: float = field(default_factory=lambda: float(os.getenv("CONFIDENCE_MAX", "0.95")))
+    query_cache_size: int = field(default_factory=lambda: int(os.getenv("QUERY_CACHE_SIZE", "1024")))
+    query_cache_ttl: float = field(default_factory=lambda: float(os.getenv("QUERY_CACHE_TTL", "3600")))
+    store_check_interval: float = field(default_factory=lambda: float(os.getenv("STORE_CHECK_INTERVAL", "30")))
+    retrieval_workers: int = field(default_factory=lambda: int(os.getenv("RETRIEVAL_WORKERS", "4")))
+    batch_max_size: int = field(default_factory=lambda: int(os.getenv("QUERY_BATCH_MAX_SIZE", "32")))
+    batch_max_wait_ms: float = field(default_factory=lambda: float(os.getenv("QUERY_BATCH_MAX_WAIT_MS", "5")))
+    # 0 derives the budget from the context windows of the primary and fallback models
+    context_token_budget: int = field(default_factory=lambda: int(os.getenv("CONTEXT_TOKEN_BUDGET", "0")))
+    context_chars_per_token: float = field(default_factory=lambda: float(os.getenv("CONTEXT_CHARS_PER_TOKEN", "4")))
+    hnsw_ef_search: int = field(default_factory=lambda: int(os.getenv("HNSW_EF_SEARCH", "0")))
+    ivf_nprobe: int = field(default_factory=lambda: int(os.getenv("IVF_NPROBE", "0")))
+    rescore_factor: int = field(default_factory=lambda: int(os.getenv("RESCORE_FACTOR", "0")))
+    retrieval_mode: str = field(default_factory=lambda: os.getenv("RETRIEVAL_MODE", "hybrid").lower())
+    hybrid_depth: int = field(default_factory=lambda: int(os.getenv("HYBRID_DEPTH", "50")))
+    rrf_k: int = field(default_factory=lambda: int(os.getenv("RRF_K", "60")))
+    lexical_fast_path: bool = field(default_factory=lambda: os.getenv("LEXICAL_FAST_PATH", "true").lower() == "true")
+    lexical_min_match: float = field(default_factory=lambda: float(os.getenv("LEXICAL_MIN_MATCH", "1.0")))
+    
+    # Answer Cache Configuration
+    answer_cache_enabled: bool = field(default_factory=lambda: os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true")
+    answer_cache_size: int = field(default_factory=lambda: int(os.getenv("ANSWER_CACHE_SIZE", "512")))
+    answer_cache_ttl: float = field(default_factory=lambda: float(os.getenv("ANSWER_CACHE_TTL", "86400")))
+    answer_cache_threshold: float = field(default_factory=lambda: float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95")))
+    
+    # Completion Cache Configuration (answers at temperature > 0 are samples, cached only when opted in)
+    completion_cache_enabled: bool = field(default_factory=lambda: os.getenv("COMPLETION_CACHE_ENABLED", "true").lower() == "true")
+    completion_cache_path: str = field(default_factory=lambda: os.getenv("COMPLETION_CACHE_PATH", "./data/completions.sqlite3"))
+    completion_cache_size: int = field(default_factory=lambda: int(os.getenv("COMPLETION_CACHE_SIZE", "10000")))
+    completion_cache_ttl: float = field(default_factory=lambda: float(os.getenv("COMPLETION_CACHE_TTL", "604800")))
+    completion_cache_sampled: bool = field(default_factory=lambda: os.getenv("COMPLETION_CACHE_SAMPLED", "false").lower() == "true")
+    
+    # Batch Configuration
+    batch_concurrency: int = field(default_factory=lambda: int(os.getenv("BATCH_CONCURRENCY", "8")))
+    batch_retrieval_size: int = field(default_factory=lambda: int(os.getenv("BATCH_RETRIEVAL_SIZE", "64")))
     
     # Document Configuration
     pdf_path: str = field(default_factory=lambda: os.getenv("PDF_PATH", "./data/HCLTech_Annual_Report.pdf"))
     
     # Action Configuration
     enable_actions: bool = field(default_factory=lambda: os.getenv("ENABLE_ACTIONS", "true").lower() == "true")
-    action_log_path: str = field(default_factory=lambda: os.getenv("ACTION_LOG_PATH", "./data/actions.json"))
+    action_log_path: str = field(default_factory=lambda: os.getenv("ACTION_LOG_PATH", "./data/actions.jsonl"))
+    action_history_size: int = field(default_factory=lambda: int(os.getenv("ACTION_HISTORY_SIZE", "1000")))
+    action_log_fsync_interval: float = field(default_factory=lambda: float(os.getenv("ACTION_LOG_FSYNC_INTERVAL", "1.0")))
+    action_retrieval_policy: Dict[str, str] = field(default_factory=lambda: {
+        **ACTION_RETRIEVAL_POLICY, **parse_retrieval_policy(os.getenv("ACTION_RETRIEVAL_POLICY", ""))
+    })
     
     # System Configuration
     log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
@@ -110,6 +261,9 @@ class AgentConfig:
     def __post_init__(self):
         """Validate configuration after initialization."""
         self._setup_logging()
+        if self.context_token_budget <= 0:
+            models = [self.model_name, *(model or self.model_name for _, model in self.llm_fallbacks)]
+            self.context_token_budget = context_token_budget(models, self.max_tokens)
         self._validate_config()
         self._create_directories()
     
@@ -125,11 +279,15 @@ class AgentConfig:
     
     def _validate_config(self):
         """Validate configuration parameters."""
-        if not self.llm_api_key:
+        if not self.llm_api_key and self.llm_provider != "local":
             self.logger.warning("LLM_API_KEY not found in environment variables")
         
-        if self.llm_provider not in ["groq", "anthropic", "openai"]:
-            self.logger.warning(f"Unknown LLM provider: {self.llm_provider}. Supported: groq, anthropic, openai")
+        if self.llm_provider not in LLM_PROVIDERS:
+            self.logger.warning(f"Unknown LLM provider: {self.llm_provider}. Supported: {', '.join(LLM_PROVIDERS)}")
+        
+        for provider, _ in self.llm_fallbacks:
+            if provider not in LLM_PROVIDERS:
+                self.logger.warning(f"Unknown fallback LLM provider: {provider}. Supported: {', '.join(LLM_PROVIDERS)}")
         
         if self.temperature < 0 or self.temperature > 2:
             self.logger.warning(f"Temperature {self.temperature} is outside recommended range [0, 2]")
@@ -137,9 +295,26 @@ class AgentConfig:
         if self.max_tokens < 100:
             self.logger.warning(f"max_tokens {self.max_tokens} seems too low")
         
+        if self.context_token_budget < self.chunk_size / self.context_chars_per_token:
+            self.logger.warning(f"context_token_budget {self.context_token_budget} does not fit one chunk; "
+                                f"lower max_tokens or set CONTEXT_TOKEN_BUDGET")
+        
         if self.chunk_size < 100:
             self.logger.warning(f"chunk_size {self.chunk_size} seems too small")
         
+        if self.answer_cache_enabled and not 0 < self.answer_cache_threshold <= 1:
+            self.logger.warning(f"answer_cache_threshold {self.answer_cache_threshold} should be in (0, 1]")
+        
+        if not 0 < self.lexical_min_match <= 1:
+            self.logger.warning(f"lexical_min_match {self.lexical_min_match} should be in (0, 1]")
+        
+        if self.retrieval_mode not in RETRIEVAL_MODES:
+            self.logger.warning(f"Unknown retrieval mode: {self.retrieval_mode}. Supported: {', '.join(RETRIEVAL_MODES)}")
+        
+        for action_type, policy in self.action_retrieval_policy.items():
+            if policy not in RETRIEVAL_POLICIES:
+                self.logger.warning(f"Unknown retrieval policy '{policy}' for {action_type}. Supported: {', '.join(RETRIEVAL_POLICIES)}")
+        
         self.logger.info(f"Configuration loaded: Provider={self.llm_provider}, Model={self.model_name}")
     
     def _create_directories(self):
@@ -147,6 +322,7 @@ class AgentConfig:
         directories = [
             os.path.dirname(self.vector_db_path) if self.vector_db_path else None,
             os.path.dirname(self.action_log_path) if self.action_log_path else None,
+            os.path.dirname(self.completion_cache_path) if self.completion_cache_enabled else None,
             os.path.dirname(self.pdf_path) if self.pdf_path else None,
         ]
         
@@ -176,6 +352,11 @@ class AgentConfig:
                 "name": "OpenAI",
                 "description": "GPT models",
                 "models": ["gpt-4", "gpt-4-turbo-preview", "gpt-3.5-turbo"]
+            },
+            "local": {
+                "name": "Local",
+                "description": f"OpenAI-compatible server at {self.llm_base_url}",
+                "models": [self.model_name]
             }
         }
         return provider_info.get(self.llm_provider, {"name": "Unknown", "description": "Unknown provider"})
@@ -186,11 +367,19 @@ class AgentConfig:
         print("  AGENTIC RAG SYSTEM CONFIGURATION")
         print("=" * 70)
         print(f"\n[LLM Configuration]")
-        print(f"  Provider:     {self.llm_provider}")
+        print(f"  Provider:     {self.llm_provider}"
+              + (f" ({self.llm_base_url})" if self.llm_provider == "local" else ""))
         print(f"  Model:        {self.model_name}")
         print(f"  Temperature:  {self.temperature}")
         print(f"  Max Tokens:   {self.max_tokens}")
         print(f"  API Key:      {'*' * 20}{self.llm_api_key[-10:] if self.llm_api_key else 'NOT SET'}")
+        print(f"  Client:       {self.llm_max_connections} connections ({self.llm_keepalive_connections} keep-alive, "
+              f"{self.llm_keepalive_expiry}s), timeout {self.llm_timeout}s")
+        print(f"  Retries:      {self.llm_max_retries} (backoff {self.llm_retry_base_delay}-{self.llm_retry_max_delay}s), "
+              f"breaker after {self.llm_breaker_failures or 'never'} failures, {self.llm_breaker_reset}s")
+        if self.llm_fallbacks:
+            print(f"  Fallbacks:    {', '.join(f'{p}:{m or self.model_name}' for p, m in self.llm_fallbacks)} "
+                  + (f"(hedge at p{self.llm_hedge_percentile:g})" if self.llm_hedge_percentile > 0 else "(failover only)"))
         
         print(f"\n[Vector Database]")
         print(f"  Path:         {self.vector_db_path}")
@@ -200,14 +389,26 @@ class AgentConfig:
         
         print(f"\n[Retrieval]")
         print(f"  Top K:        {self.top_k}")
-        print(f"  Threshold:    {self.similarity_threshold}")
+        print(f"  Threshold:    {self.similarity_threshold} (adaptive k gap {self.adaptive_k_gap or 'off'})")
+        print(f"  Mode:         {self.retrieval_mode}"
+              + (f" (RRF k={self.rrf_k}, depth {self.hybrid_depth})" if self.retrieval_mode == 'hybrid' else "")
+              + (f", lexical fast path (min match {self.lexical_min_match})" if self.lexical_fast_path else ""))
+        print(f"  Query Cache:  {self.query_cache_size} entries, TTL {self.query_cache_ttl}s")
+        print(f"  Context:      {self.context_token_budget} tokens (~{self.context_chars_per_token} chars/token)")
+        print(f"  Answer Cache: {'enabled' if self.answer_cache_enabled else 'disabled'} "
+              f"(threshold {self.answer_cache_threshold}, {self.answer_cache_size} entries)")
+        print(f"  Completions:  {'enabled' if self.completion_cache_enabled else 'disabled'} "
+              f"({self.completion_cache_path}, {self.completion_cache_size} entries"
+              + (", temperature > 0 included)" if self.completion_cache_sampled else ", temperature 0 only)"))
         
         print(f"\n[Documents]")
         print(f"  PDF Path:     {self.pdf_path}")
         
         print(f"\n[Actions]")
         print(f"  Enabled:      {self.enable_actions}")
-        print(f"  Log Path:     {self.action_log_path}")
+        print(f"  Log Path:     {self.action_log_path or 'in memory only'} "
+              f"({self.action_history_size} recent in memory, fsync every {self.action_log_fsync_interval}s)")
+        print(f"  Retrieval:    {', '.join(f'{k}={v}' for k, v in self.action_retrieval_policy.items())}")
         
         print(f"\n[System]")
         print(f"  Log Level:    {self.log_level}")
@@ -217,6 +418,13 @@ class AgentConfig:
         """Convert configuration to dictionary."""
         return {
             "llm_provider": self.llm_provider,
+            "llm_base_url": self.llm_base_url,
+            "llm_timeout": self.llm_timeout,
+            "llm_max_connections": self.llm_max_connections,
+            "llm_max_retries": self.llm_max_retries,
+            "llm_breaker_failures": self.llm_breaker_failures,
+            "llm_fallbacks": [f"{p}:{m}" for p, m in self.llm_fallbacks],
+            "llm_hedge_percentile": self.llm_hedge_percentile,
             "model_name": self.model_name,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
@@ -226,13 +434,42 @@ class AgentConfig:
             "chunk_overlap": self.chunk_overlap,
             "top_k": self.top_k,
             "similarity_threshold": self.similarity_threshold,
+            "adaptive_k_gap": self.adaptive_k_gap,
+            "retrieval_mode": self.retrieval_mode,
+            "lexical_fast_path": self.lexical_fast_path,
+            "lexical_min_match": self.lexical_min_match,
             "confidence_base": self.confidence_base,
+            "query_cache_size": self.query_cache_size,
+            "query_cache_ttl": self.query_cache_ttl,
+            "context_token_budget": self.context_token_budget,
+            "answer_cache_enabled": self.answer_cache_enabled,
+            "answer_cache_threshold": self.answer_cache_threshold,
+            "completion_cache_enabled": self.completion_cache_enabled,
+            "completion_cache_path": self.completion_cache_path,
+            "completion_cache_sampled": self.completion_cache_sampled,
             "pdf_path": self.pdf_path,
             "enable_actions": self.enable_actions,
             "action_log_path": self.action_log_path,
+            "action_history_size": self.action_history_size,
+            "action_retrieval_policy": self.action_retrieval_policy,
             "log_level": self.log_level,
         }
     
+    def for_fallback(self, provider: str, model: str) -> "AgentConfig":
+        """
+        A copy of this configuration that targets one fallback provider.
+        Copied field by field rather than re-constructed, so logging setup, validation and
+        directory creation (already done for the primary, fallbacks included) are not repeated.
+        """
+        fallback = copy.copy(self)
+        fallback.llm_provider = provider
+        fallback.model_name = model or self.model_name
+        fallback.llm_api_key = os.getenv(f"{provider.upper()}_API_KEY") or self.llm_api_key
+        fallback.llm_fallbacks = []
+        # The primary caches whichever backend's answer wins
+        fallback.completion_cache_enabled = False
+        return fallback
+    
     @classmethod
     def from_env(cls):
         """Create AgentConfig from environment variables (alias for default constructor)."""
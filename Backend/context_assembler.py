@@ -0,0 +1,178 @@
+"""
+Context Assembler Module - Merges overlapping chunks and fits context into a token budget
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.documents import Document
+
+
+# Shortest suffix/prefix match treated as chunk overlap when offsets are unknown
+MIN_TEXT_OVERLAP = 32
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Rough token count for ``text``; ~4 characters per token for English."""
+    return math.ceil(len(text) / chars_per_token) if text else 0
+
+
+@dataclass
+class _Span:
+    source: str
+    page: int
+    start: int          # character offset in the page, -1 if unknown
+    text: str
+    rank: int           # best (lowest) retrieval rank of the merged chunks
+    members: List[Tuple[int, int]] = field(default_factory=list)  # (rank, offset in text)
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+
+def _text_overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of ``left`` that is a prefix of ``right``."""
+    limit = min(len(left), len(right))
+    if limit < MIN_TEXT_OVERLAP:
+        return 0
+    probe = right[:MIN_TEXT_OVERLAP]
+    position = left.find(probe, len(left) - limit)
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+class ContextAssembler:
+    """
+    Builds the prompt context from ranked chunks.
+
+    Chunks are grouped by (source, page) and sorted by offset; overlapping
+    or adjacent spans are merged so the ingest overlap is sent once, and
+    duplicate text is dropped. Merged spans are then taken in order of their
+    best retrieval rank until ``token_budget`` is spent, and emitted in
+    document order.
+    """
+
+    def __init__(self, token_budget: int = 2000, chars_per_token: float = 4.0, separator: str = "\n\n"):
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.separator = separator
+
+    def assemble(self, docs: List[Document]) -> Tuple[str, List[Document]]:
+        """
+        Return ``(context, used_docs)`` for ``docs`` in rank order. ``used_docs``
+        are the input documents whose text made it into the context.
+        """
+        spans = self._merge([
+            _Span(
+                source=doc.metadata.get("source", ""),
+                page=doc.metadata.get("page", -1),
+                start=doc.metadata.get("start", -1),
+                text=doc.page_content,
+                rank=rank,
+                members=[(rank, 0)],
+            )
+            for rank, doc in enumerate(docs)
+        ])
+        selected = self._fit(spans)
+
+        context = self.separator.join(span.text for span in selected)
+        used = sorted(rank for span in selected for rank, _ in span.members)
+        return context, [docs[rank] for rank in used]
+
+    def _merge(self, spans: List[_Span]) -> List[_Span]:
+        groups: Dict[Tuple[str, int], List[_Span]] = {}
+        for span in spans:
+            groups.setdefault((span.source, span.page), []).append(span)
+
+        merged, seen = [], set()
+        for key in sorted(groups, key=lambda key: (str(key[0]), key[1])):
+            group = groups[key]
+            located = sorted((s for s in group if s.start >= 0), key=lambda s: s.start)
+            unlocated = [s for s in group if s.start < 0]
+
+            for span in self._merge_by_offset(located) + self._merge_by_text(unlocated):
+                if span.text not in seen:
+                    seen.add(span.text)
+                    merged.append(span)
+        return merged
+
+    @staticmethod
+    def _join(left: _Span, right: _Span, text: str, offset: int) -> _Span:
+        """Merge ``right`` into ``left``; ``right`` begins at ``offset`` in ``text``."""
+        members = left.members + [(rank, offset + at) for rank, at in right.members]
+        return _Span(left.source, left.page, left.start, text, min(left.rank, right.rank), members)
+
+    def _merge_by_offset(self, spans: List[_Span]) -> List[_Span]:
+        merged: List[_Span] = []
+        for span in spans:
+            if merged and span.start <= merged[-1].end:
+                last = merged[-1]
+                tail = span.text[last.end - span.start:] if span.end > last.end else ""
+                merged[-1] = self._join(last, span, last.text + tail, span.start - last.start)
+            else:
+                merged.append(span)
+        return merged
+
+    def _merge_by_text(self, spans: List[_Span]) -> List[_Span]:
+        # Chunks from stores without offsets: detect overlap from the text itself
+        spans = list(spans)
+        changed = True
+        while changed:
+            changed = False
+            for i in range(len(spans)):
+                for j in range(len(spans)):
+                    if i == j:
+                        continue
+                    left, right = spans[i], spans[j]
+                    contained = left.text.find(right.text)
+                    if contained != -1:
+                        joined = self._join(left, right, left.text, contained)
+                    else:
+                        overlap = _text_overlap(left.text, right.text)
+                        if not overlap:
+                            continue
+                        joined = self._join(left, right, left.text + right.text[overlap:], len(left.text) - overlap)
+                    spans[i] = joined
+                    del spans[j]
+                    changed = True
+                    break
+                if changed:
+                    break
+        return sorted(spans, key=lambda s: s.rank)
+
+    def _fit(self, spans: List[_Span]) -> List[_Span]:
+        """Keep the best-ranked spans within the token budget, in document order."""
+        if self.token_budget <= 0:
+            return spans
+
+        budget = self.token_budget
+        separator_tokens = estimate_tokens(self.separator, self.chars_per_token)
+        selected = []
+        for position, span in sorted(enumerate(spans), key=lambda item: item[1].rank):
+            cost = estimate_tokens(span.text, self.chars_per_token) + (separator_tokens if selected else 0)
+            if cost <= budget:
+                selected.append((position, span))
+                budget -= cost
+                continue
+
+            # Truncate the first span that does not fit at a word boundary
+            chars = int((budget - (separator_tokens if selected else 0)) * self.chars_per_token)
+            text = self._truncate(span.text, chars)
+            if text:
+                members = [(rank, at) for rank, at in span.members if at < len(text)]
+                selected.append((position, _Span(span.source, span.page, span.start, text, span.rank, members)))
+            break
+
+        return [span for _, span in sorted(selected, key=lambda item: item[0])]
+
+    @staticmethod
+    def _truncate(text: str, chars: int) -> Optional[str]:
+        if chars < MIN_TEXT_OVERLAP:
+            return None
+        cut = text[:chars]
+        boundary = cut.rfind(" ")
+        return cut[:boundary] if boundary > chars // 2 else cut
@@ -0,0 +1,156 @@
+"""
+Embedding Cache Module - Persistent, memory-mapped store of chunk embeddings
+keyed by (embedding model, normalized chunk hash).
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import unicodedata
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFKC, collapsed whitespace."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Append-only vector cache, one directory per embedding model.
+
+    ``keys.bin`` holds 20-byte SHA-1 digests of normalized chunk text and
+    ``vectors.f32`` the matching float32 rows in the same order. Vectors are
+    read through a read-only memory map, so only rows that are actually
+    looked up are paged in. Intended for a single writer (the ingest process).
+    """
+
+    VERSION = 1
+    KEY_SIZE = 20
+
+    def __init__(self, directory: str, model_name: str):
+        self.logger = logging.getLogger(__name__)
+        self.model_name = model_name
+        self.path = os.path.join(directory, re.sub(r"[^A-Za-z0-9._-]+", "_", model_name))
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.keys_path = os.path.join(self.path, "keys.bin")
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+
+        self.dim = None
+        self.hits = 0
+        self.misses = 0
+        self._index = {}
+        self._rows = 0
+        self._vectors = None
+
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            self._reset()
+            return
+
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+
+        if meta.get("version") != self.VERSION or meta.get("model") != self.model_name:
+            self.logger.warning(f"Discarding incompatible embedding cache at {self.path}")
+            self._reset()
+            return
+
+        self.dim = meta["dim"]
+        keys = open(self.keys_path, 'rb').read() if os.path.exists(self.keys_path) else b""
+        vector_bytes = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+
+        # A crash between the two appends leaves one file longer than the other
+        rows = min(len(keys) // self.KEY_SIZE, vector_bytes // (self.dim * 4))
+        if len(keys) != rows * self.KEY_SIZE or vector_bytes != rows * self.dim * 4:
+            self.logger.warning(f"Truncating embedding cache to {rows} consistent rows")
+            os.truncate(self.keys_path, rows * self.KEY_SIZE)
+            os.truncate(self.vectors_path, rows * self.dim * 4)
+
+        self._index = {keys[i * self.KEY_SIZE:(i + 1) * self.KEY_SIZE]: i for i in range(rows)}
+        self._rows = rows
+        self.logger.info(f"Embedding cache loaded: {rows} vectors ({self.model_name})")
+
+    def _reset(self):
+        for path in (self.meta_path, self.keys_path, self.vectors_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self.dim = None
+        self._index = {}
+        self._rows = 0
+        self._vectors = None
+
+    def _write_meta(self):
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "model": self.model_name, "dim": self.dim}, f)
+
+    def _matrix(self) -> np.ndarray:
+        if self._vectors is None:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(self._rows, self.dim))
+        return self._vectors
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha1(normalize_text(text).encode("utf-8", errors="surrogatepass")).digest()
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def __contains__(self, text: str) -> bool:
+        return self.key(text) in self._index
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        row = self._index.get(self.key(text))
+        return None if row is None else np.array(self._matrix()[row])
+
+    def add(self, keys: Sequence[bytes], vectors: np.ndarray):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            self._write_meta()
+
+        fresh = [i for i, key in enumerate(keys) if key not in self._index]
+        if not fresh:
+            return
+
+        # Vectors first: a torn write then only leaves an unreferenced tail row
+        with open(self.vectors_path, 'ab') as f:
+            f.write(vectors[fresh].tobytes())
+        with open(self.keys_path, 'ab') as f:
+            f.write(b"".join(keys[i] for i in fresh))
+
+        for i in fresh:
+            self._index[keys[i]] = self._rows
+            self._rows += 1
+        self._vectors = None
+
+    def embed(self, texts: List[str], embed_fn: Callable[[List[str]], List[List[float]]]) -> np.ndarray:
+        """Return embeddings for ``texts``, computing (and caching) only the misses."""
+        keys = [self.key(text) for text in texts]
+
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in self._index and key not in missing:
+                missing[key] = i
+
+        self.misses += len(missing)
+        self.hits += len(keys) - len(missing)
+
+        if missing:
+            computed = np.asarray(embed_fn([texts[i] for i in missing.values()]), dtype=np.float32)
+            self.add(list(missing.keys()), computed)
+
+        if not keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.array(self._matrix()[[self._index[key] for key in keys]])
+
+    def stats(self) -> dict:
+        return {"vectors": self._rows, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,138 @@
+"""
+Hedging Module - Race an ordered list of equivalent calls for tail latency
+and failover.
+
+Call 0 (the primary) starts at once. The next call starts when every
+running call is still silent after ``delay`` seconds (a hedge) or as soon
+as a running call fails (a failover); ``delay=None`` disables hedging and
+keeps failover. The first successful result wins and the others are
+cancelled. When every call fails, the primary's result is returned.
+
+``on_launch(i, reason)`` is called for each extra call ("slow" or "error"),
+and ``on_latency(i, seconds)`` for each call that succeeded, with its
+latency. Failed calls report nothing, since a fast error would pull a
+percentile-based delay down, and neither do cancelled calls: the time they
+ran is only a lower bound.
+"""
+import time
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, Executor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Sequence, Tuple
+
+LaunchCallback = Optional[Callable[[int, str], None]]
+LatencyCallback = Optional[Callable[[int, float], None]]
+
+
+def hedge(calls: Sequence[Callable[[], Any]], delay: Optional[float], failed: Callable[[Any], bool],
+          executor: Executor, on_launch: LaunchCallback = None, on_latency: LatencyCallback = None) -> Tuple[int, Any]:
+    """
+    Run blocking ``calls`` on ``executor``; returns ``(index, result)``.
+    Threads cannot be cancelled, so abandoned calls finish in the background.
+    """
+    futures, started, results = {}, {}, {}
+
+    def launch(i: int, reason: Optional[str] = None):
+        started[i] = time.perf_counter()
+        future = executor.submit(calls[i])
+        futures[future] = i
+        if on_latency:
+            # Abandoned calls keep running, so their full latency is still known
+            def done(f):
+                if not f.cancelled() and f.exception() is None and not failed(f.result()):
+                    on_latency(i, time.perf_counter() - started[i])
+            future.add_done_callback(done)
+        if reason and on_launch:
+            on_launch(i, reason)
+
+    launch(0)
+    pending = set(futures)
+    while pending:
+        more = len(started) < len(calls)
+        done, pending = wait(pending, timeout=delay if more else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception:
+                results[i] = None
+            if not failed(results[i]):
+                for other in pending:
+                    other.cancel()
+                return i, results[i]
+
+        if more:
+            launch(len(started), "error" if done else "slow")
+            pending = set(future for future, i in futures.items() if i not in results)
+    return 0, results.get(0)
+
+
+async def ahedge(calls: Sequence[Callable[[], Awaitable[Any]]], delay: Optional[float], failed: Callable[[Any], bool],
+                 on_launch: LaunchCallback = None, on_latency: LatencyCallback = None) -> Tuple[int, Any]:
+    """Async variant of hedge; losing calls are cancelled."""
+    tasks, started, results = {}, {}, {}
+
+    def launch(i: int, reason: Optional[str] = None):
+        started[i] = time.perf_counter()
+        tasks[asyncio.ensure_future(calls[i]())] = i
+        if reason and on_launch:
+            on_launch(i, reason)
+
+    def finish(i: int):
+        if on_latency and not failed(results[i]):
+            on_latency(i, time.perf_counter() - started[i])
+
+    launch(0)
+    pending = set(tasks)
+    try:
+        while pending:
+            more = len(started) < len(calls)
+            done, pending = await asyncio.wait(pending, timeout=delay if more else None,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                i = tasks[task]
+                results[i] = None if task.exception() is not None else task.result()
+                finish(i)
+                if not failed(results[i]):
+                    return i, results[i]
+
+            if more:
+                launch(len(started), "error" if done else "slow")
+                pending = set(task for task, i in tasks.items() if i not in results)
+        return 0, results.get(0)
+    finally:
+        abandoned = [task for task in tasks if not task.done()]
+        for task in abandoned:
+            task.cancel()
+        if abandoned:
+            # Let cancellation unwind so the losers' connections and generators are released
+            await asyncio.wait(abandoned)
+
+
+async def _first_chunk(stream: AsyncIterator[str]) -> Optional[str]:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+async def ahedge_stream(streams: Sequence[Callable[[], AsyncIterator[str]]], delay: Optional[float],
+                        failed: Callable[[Optional[str]], bool], on_launch: LaunchCallback = None,
+                        on_latency: LatencyCallback = None) -> Tuple[int, Optional[str], Optional[AsyncIterator[str]]]:
+    """
+    Race ``streams`` to their first chunk; returns ``(index, first_chunk,
+    stream)`` so the caller continues the winner. Losing streams are closed.
+    A stream that ends without a chunk counts as failed (first_chunk None).
+    """
+    iterators: Dict[int, AsyncIterator[str]] = {}
+
+    def opener(i: int):
+        async def first():
+            iterators[i] = streams[i]()
+            return await _first_chunk(iterators[i])
+        return first
+
+    index, chunk = await ahedge([opener(i) for i in range(len(streams))], delay, failed, on_launch, on_latency)
+    for i, iterator in iterators.items():
+        if i != index:
+            await iterator.aclose()
+    return index, chunk, iterators.get(index)
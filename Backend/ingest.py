@@ -1,115 +1,594 @@
 import os
 import sys
+import glob
+import queue
+import argparse
 import logging
+import threading
+import time
+import dataclasses
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple
 
+import faiss
+import numpy as np
 import PyPDF2
 from langchain_huggingface import HuggingFaceEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
-from langchain_core.documents import Document  
+from langchain_core.documents import Document
 from tqdm import tqdm
 
+from chunk_store import CHUNKS_FILENAME, open_chunk_store, write_chunk_store
+from embedding_cache import EmbeddingCache
+from lexical_index import LEXICAL_FILENAME, write_lexical_index
+from manifest import IngestManifest, chunk_id, hash_text
+from vector_index import ENCODINGS, INDEX_TYPES, VECTORS_FILENAME, IndexParams, build_index, open_vectors, write_vectors
+
 PDF_PATH = "data/Annual-Report-2024-25.pdf"
 VECTOR_DB_PATH = "vectorstore"
+INDEX_FILENAME = "index.faiss"
+LEGACY_DOCSTORE_FILENAME = "index.pkl"
 CHUNK_SIZE = 1000
 CHUNK_OVERLAP = 200
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_CACHE_DIR = "embedding_cache"
+
+# Pipeline tuning
+INGEST_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+PAGES_PER_TASK = 16          # pages extracted per worker task
+EMBED_BATCH_SIZE = 256       # chunks looked up, embedded and written per pipeline batch
+ENCODE_BATCH_SIZE = 32       # sentences per model forward pass
+QUEUE_DEPTH = 4              # chunk batches buffered between chunking and embedding
+
+_SENTINEL = object()
 
 
 def load_pdf_manual(pdf_path: str) -> List[Document]:
     documents = []
-    
+
     print(f"Loading PDF: {pdf_path}")
-    
+
     with open(pdf_path, 'rb') as file:
         pdf_reader = PyPDF2.PdfReader(file)
         total_pages = len(pdf_reader.pages)
-        
+
         print(f"Total pages: {total_pages}")
-        
+
         for page_num in tqdm(range(total_pages), desc="Reading pages"):
             page = pdf_reader.pages[page_num]
             text = page.extract_text()
-            
+
             if text.strip():
                 doc = Document(
                     page_content=text,
                     metadata={"page": page_num, "source": pdf_path}
                 )
                 documents.append(doc)
-    
+
     return documents
 
 
-def split_text_manual(documents: List[Document], chunk_size: int, overlap: int) -> List[Document]:
-    # split documents into chunks
-    chunks = []
-    
-    print(f"Splitting into chunks (size={chunk_size}, overlap={overlap})...")
-    
-    for doc in tqdm(documents, desc="Splitting documents"):
+def iter_chunks(documents: Iterable[Document], chunk_size: int, overlap: int) -> Iterator[Document]:
+    # lazily split documents into chunks
+    for doc in documents:
         text = doc.page_content
         metadata = doc.metadata
-        
+
         start = 0
         while start < len(text):
             end = start + chunk_size
             chunk_text = text[start:end]
-            
+
             if chunk_text.strip():
-                chunk = Document(
+                yield Document(
                     page_content=chunk_text,
-                    metadata=metadata.copy()
+                    metadata={**metadata, "start": start}
                 )
-                chunks.append(chunk)
-            
+
             start += chunk_size - overlap
-    
-    return chunks
 
 
-def main():
-    if not os.path.exists(PDF_PATH):
-        raise FileNotFoundError(f"PDF not found: {PDF_PATH}")
+def split_text_manual(documents: List[Document], chunk_size: int, overlap: int) -> List[Document]:
+    # split documents into chunks
+    print(f"Splitting into chunks (size={chunk_size}, overlap={overlap})...")
+
+    return list(iter_chunks(tqdm(documents, desc="Splitting documents"), chunk_size, overlap))
+
+
+def resolve_pdf_paths(sources: Iterable[str]) -> List[str]:
+    """Expand files, directories (searched recursively) and glob patterns into PDF paths."""
+    paths = []
+
+    for source in sources:
+        if os.path.isdir(source):
+            matches = glob.glob(os.path.join(source, "**", "*.pdf"), recursive=True)
+        elif os.path.isfile(source):
+            matches = [source]
+        else:
+            matches = glob.glob(source, recursive=True)
+
+        paths.extend(m for m in matches if m.lower().endswith(".pdf") and os.path.isfile(m))
+
+    # Resolve to absolute paths so runs from different directories share manifest entries and chunk ids
+    return sorted(dict.fromkeys(os.path.realpath(p) for p in paths))
+
+
+def count_pages(pdf_path: str) -> int:
+    with open(pdf_path, 'rb') as file:
+        return len(PyPDF2.PdfReader(file).pages)
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[Tuple[int, str]]:
+    """Worker task: extract text for pages [start, stop) of one PDF."""
+    pages = []
+
+    with open(pdf_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+
+        for page_num in range(start, stop):
+            try:
+                text = pdf_reader.pages[page_num].extract_text() or ""
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"Skipping page {page_num} of {pdf_path}: {str(e)}")
+                text = ""
+            pages.append((page_num, text))
+
+    return pages
+
+
+def _iter_page_tasks(pdf_paths: List[str], pages_per_task: int) -> Iterator[Tuple[str, int, int]]:
+    for pdf_path in pdf_paths:
+        try:
+            total_pages = count_pages(pdf_path)
+        except Exception as e:
+            print(f"✗ Skipping unreadable PDF {pdf_path}: {str(e)}")
+            continue
+
+        for start in range(0, total_pages, pages_per_task):
+            yield pdf_path, start, min(start + pages_per_task, total_pages)
+
+
+def iter_pages(pdf_paths: List[str], workers: int = INGEST_WORKERS,
+               pages_per_task: int = PAGES_PER_TASK) -> Iterator[Document]:
+    """
+    Extract pages from many PDFs on a process pool.
+    At most ``2 * workers`` tasks are in flight, so memory stays bounded
+    regardless of corpus size. Pages are yielded in (file, page) order.
+    """
+    tasks = _iter_page_tasks(pdf_paths, pages_per_task)
+
+    def to_documents(pdf_path, results):
+        for page_num, text in results:
+            if text.strip():
+                yield Document(
+                    page_content=text,
+                    metadata={"page": page_num, "source": pdf_path}
+                )
+
+    if workers <= 1:
+        for pdf_path, start, stop in tasks:
+            yield from to_documents(pdf_path, _extract_page_range(pdf_path, start, stop))
+        return
+
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for pdf_path, start, stop in tasks:
+            pending.append((pdf_path, executor.submit(_extract_page_range, pdf_path, start, stop)))
+
+            if len(pending) >= max_pending:
+                pdf_path, future = pending.popleft()
+                yield from to_documents(pdf_path, future.result())
+
+        while pending:
+            pdf_path, future = pending.popleft()
+            yield from to_documents(pdf_path, future.result())
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _produce_batches(batches: Iterable[list], out: queue.Queue, stop: threading.Event):
+    """Feed chunk batches into the bounded queue; runs on a background thread."""
+    def put(item):
+        while not stop.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    try:
+        for batch in batches:
+            if stop.is_set():
+                return
+            put(batch)
+    except BaseException as e:
+        put(e)
+        return
+    put(_SENTINEL)
+
+
+class ChangeTracker:
+    """
+    Filters the chunk stream down to chunks that are not already indexed,
+    recording the new per-page manifest entries as pages go by.
+    """
+
+    def __init__(self, manifest: IngestManifest, indexed_ids: Iterable[str] = ()):
+        self.manifest = manifest
+        self.indexed_ids = set(indexed_ids)
+        self.pages = defaultdict(dict)
+        self.reused_pages = 0
+
+    def chunks(self, pages: Iterable[Document], chunk_size: int, overlap: int) -> Iterator[Document]:
+        for doc in pages:
+            source = doc.metadata["source"]
+            page = doc.metadata["page"]
+            page_hash = hash_text(doc.page_content)
+
+            # Unchanged page whose vectors are all still present - nothing to do
+            old = self.manifest.page_entry(source, page)
+            if old and old["hash"] == page_hash and self.indexed_ids.issuperset(old["chunks"]):
+                self.pages[source][str(page)] = old
+                self.reused_pages += 1
+                continue
+
+            ids = []
+            for chunk in iter_chunks([doc], chunk_size, overlap):
+                cid = chunk_id(source, page, chunk.metadata["start"], chunk.page_content)
+                ids.append(cid)
+                if cid not in self.indexed_ids:
+                    chunk.metadata["chunk_id"] = cid
+                    self.indexed_ids.add(cid)
+                    yield chunk
+
+            self.pages[source][str(page)] = {"hash": page_hash, "chunks": ids}
+
+    def chunk_ids(self, path: str) -> set:
+        ids = set()
+        for entry in self.pages.get(path, {}).values():
+            ids.update(entry["chunks"])
+        return ids
+
+
+def run_pipeline(chunks: Iterable[Document], embeddings: HuggingFaceEmbeddings,
+                 vectorstore: Optional[FAISS] = None, cache: Optional[EmbeddingCache] = None,
+                 batch_size: int = EMBED_BATCH_SIZE, queue_depth: int = QUEUE_DEPTH) -> Optional[FAISS]:
+    """
+    Run extract -> chunk -> embed -> write as overlapping stages.
+    The lazy chunk stream (page extraction on worker processes plus chunking)
+    is drained on a producer thread, while embedding and writing happen on the
+    calling thread; the two are connected by a bounded queue. With a cache,
+    only chunks whose vectors were never computed reach the model.
+    """
+    batches = iter_batches(chunks, batch_size)
+
+    batch_queue = queue.Queue(maxsize=queue_depth)
+    stop = threading.Event()
+    producer = threading.Thread(target=_produce_batches, args=(batches, batch_queue, stop), daemon=True)
+    producer.start()
+
+    progress = tqdm(desc="Embedding chunks", unit="chunk")
+    try:
+        while True:
+            item = batch_queue.get()
+            if item is _SENTINEL:
+                break
+            if isinstance(item, BaseException):
+                raise item
+
+            texts = [chunk.page_content for chunk in item]
+            metadatas = [chunk.metadata for chunk in item]
+            ids = [chunk.metadata["chunk_id"] for chunk in item]
+            if cache is not None:
+                vectors = cache.embed(texts, embeddings.embed_documents)
+            else:
+                vectors = embeddings.embed_documents(texts)
+
+            if vectorstore is None:
+                vectorstore = FAISS.from_embeddings(list(zip(texts, vectors)), embeddings, metadatas=metadatas, ids=ids)
+            else:
+                vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+            progress.update(len(item))
+
+        producer.join()
+    finally:
+        stop.set()
+        progress.close()
+        producer.join(timeout=5)
+
+    return vectorstore
+
+
+def _read_working_index(directory: str, params: Optional[IndexParams]):
+    """Exact flat index for ingest: index.faiss itself, or rebuilt from vectors.f32."""
+    if params is None or params.exact:
+        index_path = os.path.join(directory, INDEX_FILENAME)
+        return faiss.read_index(index_path) if os.path.exists(index_path) else None
+
+    vectors_path = os.path.join(directory, VECTORS_FILENAME)
+    if not os.path.exists(vectors_path):
+        return None
+    index = faiss.IndexFlatL2(params.dim)
+    index.add(np.ascontiguousarray(open_vectors(vectors_path, params.dim)))
+    return index
+
+
+def load_existing_vectorstore(directory: str, embeddings: HuggingFaceEmbeddings) -> Optional[FAISS]:
+    """Rebuild the in-memory working store from the saved vectors and the chunk store."""
+    store = open_chunk_store(directory)
+    if store is None:
+        return None
+
+    try:
+        index = _read_working_index(directory, IndexParams.load(directory))
+        if index is None:
+            return None
+        if index.ntotal != len(store):
+            print(f"✗ Saved vectors and {CHUNKS_FILENAME} disagree ({index.ntotal} vs {len(store)} rows)")
+            return None
+
+        docs, index_to_docstore_id = {}, {}
+        for row in range(len(store)):
+            doc = store.document(row)
+            docs[doc.metadata["chunk_id"]] = doc
+            index_to_docstore_id[row] = doc.metadata["chunk_id"]
+    finally:
+        store.close()
+
+    return FAISS(embeddings, index, InMemoryDocstore(docs), index_to_docstore_id)
+
+
+def save_vectorstore(vectorstore: FAISS, directory: str, params: Optional[IndexParams] = None):
+    """
+    Persist the serving index described by ``params`` (flat by default), a
+    chunk store whose row i describes vector i, and a lexical index over the
+    same rows.
+    """
+    os.makedirs(directory, exist_ok=True)
+    params = params or IndexParams()
+
+    records = []
+    for row in range(vectorstore.index.ntotal):
+        doc_id = vectorstore.index_to_docstore_id[row]
+        doc = vectorstore.docstore.search(doc_id)
+        records.append((
+            doc_id,
+            doc.page_content,
+            doc.metadata.get("page", -1),
+            doc.metadata.get("start", -1),
+            doc.metadata.get("source", ""),
+        ))
+    write_chunk_store(os.path.join(directory, CHUNKS_FILENAME), records)
+    # BM25 postings over the same rows, for hybrid and identifier lookups
+    write_lexical_index(os.path.join(directory, LEXICAL_FILENAME), (text for _, text, _, _, _ in records))
+
+    vectors_path = os.path.join(directory, VECTORS_FILENAME)
+    if params.exact:
+        index = vectorstore.index
+        params.dim = index.d
+        if os.path.exists(vectors_path):
+            os.remove(vectors_path)
+    else:
+        vectors = vectorstore.index.reconstruct_n(0, vectorstore.index.ntotal)
+        index = build_index(vectors, params)
+        print(f"✓ Built {params.factory_string()} index over {len(vectors)} vectors "
+              f"(~{params.bytes_per_vector():g} bytes/vector, {4 * params.dim / params.bytes_per_vector():.1f}x smaller than float32)")
+        write_vectors(vectors_path, vectors)
+
+    index_path = os.path.join(directory, INDEX_FILENAME)
+    faiss.write_index(index, index_path + ".tmp")
+    os.replace(index_path + ".tmp", index_path)
+    params.save(directory)
+
+    # The pickled docstore is superseded by the chunk store
+    legacy_path = os.path.join(directory, LEGACY_DOCSTORE_FILENAME)
+    if os.path.exists(legacy_path):
+        os.remove(legacy_path)
+
+
+def convert_legacy_store(directory: str, embeddings: HuggingFaceEmbeddings):
+    """One-time migration of a pickled (index.pkl) store produced by older versions."""
+    # Only run this on a store you built yourself: loading it unpickles index.pkl
+    vectorstore = FAISS.load_local(directory, embeddings, allow_dangerous_deserialization=True)
+    save_vectorstore(vectorstore, directory)
+    return vectorstore
+
+
+def build_lexical_index(directory: str) -> int:
+    """Write the BM25 index for a store whose chunks.bin predates lexical.bin; returns the chunk count."""
+    chunk_store = open_chunk_store(directory)
+    if chunk_store is None:
+        raise FileNotFoundError(f"No {CHUNKS_FILENAME} in {directory}")
+    try:
+        write_lexical_index(os.path.join(directory, LEXICAL_FILENAME),
+                            (chunk_store.text(row) for row in range(len(chunk_store))))
+        return len(chunk_store)
+    finally:
+        chunk_store.close()
+
+
+def load_embeddings(model_name: str = EMBEDDING_MODEL, batch_size: int = ENCODE_BATCH_SIZE) -> HuggingFaceEmbeddings:
+    return HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs={'device': 'cpu'},
+        encode_kwargs={'normalize_embeddings': True, 'batch_size': batch_size}
+    )
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Ingest PDFs into the FAISS vector store")
+    parser.add_argument("sources", nargs="*", default=[PDF_PATH],
+                        help="PDF files, directories or glob patterns (default: %(default)s)")
+    parser.add_argument("--output", default=VECTOR_DB_PATH, help="Vector store directory")
+    parser.add_argument("--workers", type=int, default=INGEST_WORKERS, help="Page extraction processes")
+    parser.add_argument("--pages-per-task", type=int, default=PAGES_PER_TASK)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE, help="Chunks per pipeline batch")
+    parser.add_argument("--encode-batch-size", type=int, default=ENCODE_BATCH_SIZE,
+                        help="Sentences per embedding model forward pass")
+    parser.add_argument("--cache-dir", default=EMBEDDING_CACHE_DIR, help="Persistent embedding cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the embedding cache")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--chunk-overlap", type=int, default=CHUNK_OVERLAP)
+    parser.add_argument("--full", action="store_true",
+                        help="Ignore the manifest and rebuild the vector store from scratch")
+    parser.add_argument("--convert-legacy", action="store_true",
+                        help="Convert a trusted pickled store (index.pkl) in --output to the chunk store format and exit")
+    parser.add_argument("--build-lexical", action="store_true",
+                        help=f"Build {LEXICAL_FILENAME} from the {CHUNKS_FILENAME} in --output and exit")
+
+    # Index options default to the store's saved index_params.json, then to a flat index
+    index = parser.add_argument_group("index")
+    index.add_argument("--index-type", choices=INDEX_TYPES, help="Serving index type")
+    index.add_argument("--hnsw-m", type=int, help="HNSW neighbours per node")
+    index.add_argument("--ef-construction", type=int, help="HNSW build-time candidate list size")
+    index.add_argument("--ef-search", type=int, help="Default HNSW search-time candidate list size")
+    index.add_argument("--nlist", type=int, help="IVF inverted lists (default ~4*sqrt(n))")
+    index.add_argument("--nprobe", type=int, help="Default IVF lists probed per query")
+    index.add_argument("--train-size", type=int, help="Vectors sampled to train IVF centroids and quantizers")
+    index.add_argument("--encoding", choices=ENCODINGS,
+                       help="Vector storage: float32, fp16 or sq8 scalar quantization, PQ or OPQ+PQ codes")
+    index.add_argument("--pq-m", type=int, help="PQ sub-quantizers (bytes per vector at 8 bits)")
+    index.add_argument("--pq-nbits", type=int, help="Bits per PQ sub-quantizer code")
+    index.add_argument("--pca-dim", type=int, help="Reduce vectors to this many dimensions with PCA (0: off)")
+    index.add_argument("--rescore", type=int,
+                       help="Re-score k * RESCORE candidates with exact vectors (default 4 when compressed)")
+    return parser.parse_args(argv)
+
+
+def resolve_index_params(args: argparse.Namespace, saved: Optional[IndexParams]) -> IndexParams:
+    """Saved parameters overridden by any index options given on the command line."""
+    params = dataclasses.replace(saved) if saved is not None else IndexParams()
+    for name in ("index_type", "hnsw_m", "ef_construction", "ef_search", "nlist", "nprobe", "train_size",
+                 "encoding", "pq_m", "pq_nbits", "pca_dim", "rescore"):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(params, name, value)
+    return params
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started = time.time()
+
+    if args.convert_legacy:
+        vectorstore = convert_legacy_store(args.output, load_embeddings(batch_size=args.encode_batch_size))
+        print(f"✓ Converted {vectorstore.index.ntotal} chunks in {args.output} to {CHUNKS_FILENAME}")
+        return
+
+    if args.build_lexical:
+        count = build_lexical_index(args.output)
+        print(f"✓ Indexed {count} chunks in {args.output} into {LEXICAL_FILENAME}")
+        return
+
+    pdf_paths = resolve_pdf_paths(args.sources)
+    if not pdf_paths:
+        raise FileNotFoundError(f"No PDFs found for: {' '.join(args.sources)}")
 
     print("\n" + "="*60)
     print("PDF Ingestion Pipeline")
     print("="*60)
-
-    # Load PDF
-    documents = load_pdf_manual(PDF_PATH)
-    print(f"✓ Loaded {len(documents)} pages")
-
-    # Split into chunks
-    chunks = split_text_manual(documents, CHUNK_SIZE, CHUNK_OVERLAP)
-    print(f"✓ Created {len(chunks)} chunks")
+    print(f"Sources: {len(pdf_paths)} PDF(s), workers={args.workers}, batch size={args.batch_size}")
+    print(f"Chunking (size={args.chunk_size}, overlap={args.chunk_overlap})")
+    saved_params = IndexParams.load(args.output)
+    index_params = resolve_index_params(args, saved_params)
+    print(f"Index: {index_params.index_type}, {index_params.encoding} vectors"
+          + (f", PCA to {index_params.pca_dim} dims" if index_params.pca_dim else ""))
 
     # Load embeddings
     print("Loading embeddings model...")
-    embeddings = HuggingFaceEmbeddings(
-        model_name="sentence-transformers/all-MiniLM-L6-v2",
-        model_kwargs={'device': 'cpu'},
-        encode_kwargs={'normalize_embeddings': True}
-    )
-    print("✓ Embeddings loaded")
+    embeddings = load_embeddings(batch_size=args.encode_batch_size)
+    cache = None if args.no_cache else EmbeddingCache(args.cache_dir, EMBEDDING_MODEL)
+    print(f"✓ Embeddings loaded (cache: {'disabled' if cache is None else f'{len(cache)} vectors'})")
 
-    # Create vector store
-    print("Creating FAISS vector store...")
-    vectorstore = FAISS.from_documents(
-        tqdm(chunks, desc="Embedding chunks"),
-        embeddings
-    )
-    print("✓ Vector store created")
+    # Reuse the existing store when it was built with the same settings
+    settings = {
+        "embedding_model": EMBEDDING_MODEL,
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.chunk_overlap,
+    }
+    manifest = None if args.full else IngestManifest.load(args.output)
+    vectorstore = None
+    if manifest is not None and manifest.compatible(settings):
+        vectorstore = load_existing_vectorstore(args.output, embeddings)
+    if vectorstore is None:
+        print("Building vector store from scratch...")
+        manifest = IngestManifest(settings)
+    else:
+        print(f"✓ Loaded existing vector store ({vectorstore.index.ntotal} chunks)")
+
+    # Only changed or new files need extracting
+    changed, file_info = [], {}
+    for path in pdf_paths:
+        unchanged, info = manifest.check_file(path)
+        if not unchanged:
+            changed.append(path)
+            file_info[path] = info
+    removed = manifest.missing_files()
+    print(f"Files: {len(changed)} new/changed, {len(pdf_paths) - len(changed)} unchanged, {len(removed)} removed")
+
+    indexed_ids = vectorstore.index_to_docstore_id.values() if vectorstore is not None else ()
+    tracker = ChangeTracker(manifest, indexed_ids)
+    embedded_before = vectorstore.index.ntotal if vectorstore is not None else 0
+
+    # Extract, chunk, embed and index as one streaming pipeline
+    if changed:
+        pages = iter_pages(changed, workers=args.workers, pages_per_task=args.pages_per_task)
+        vectorstore = run_pipeline(
+            tracker.chunks(pages, args.chunk_size, args.chunk_overlap),
+            embeddings,
+            vectorstore=vectorstore,
+            cache=cache,
+            batch_size=args.batch_size,
+        )
+    if vectorstore is None:
+        raise RuntimeError("No text could be extracted from the given PDFs")
+    embedded = vectorstore.index.ntotal - embedded_before
+
+    # Drop vectors of pages/chunks that changed or disappeared
+    stale = set()
+    for path in changed:
+        stale |= manifest.chunk_ids(path) - tracker.chunk_ids(path)
+        manifest.set_file(path, file_info[path], tracker.pages.get(path, {}))
+    for path in removed:
+        stale |= manifest.remove_file(path)
+    stale &= set(vectorstore.index_to_docstore_id.values())
+    if stale:
+        vectorstore.delete(list(stale))
+
+    print(f"✓ Embedded {embedded} new chunks, reused {tracker.reused_pages} unchanged pages, "
+          f"deleted {len(stale)} stale chunks ({vectorstore.index.ntotal} total)")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"✓ Embedding cache: {stats['hits']} hits, {stats['misses']} computed")
 
     # Save
-    os.makedirs(VECTOR_DB_PATH, exist_ok=True)
-    vectorstore.save_local(VECTOR_DB_PATH)
-    print(f"✓ Saved to: {VECTOR_DB_PATH}")
+    if (embedded or stale or removed or args.full or index_params != saved_params
+            or not os.path.exists(os.path.join(args.output, CHUNKS_FILENAME))
+            or not os.path.exists(os.path.join(args.output, LEXICAL_FILENAME))):
+        save_vectorstore(vectorstore, args.output, index_params)
+        print(f"✓ Saved to: {args.output}")
+    else:
+        print("✓ Vector store already up to date")
+    manifest.save(args.output)
 
     print("\n" + "="*60)
-    print("Ingestion Complete!")
+    print(f"Ingestion Complete! ({time.time() - started:.1f}s)")
     print("="*60)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
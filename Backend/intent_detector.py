@@ -4,6 +4,7 @@ Intent Detection Module - Classifies user queries as information or action reque
 import logging
 from typing import Dict, Any
 from config import ACTION_KEYWORDS
+from keyword_matcher import KeywordAutomaton
 
 
 class IntentDetector:
@@ -12,6 +13,21 @@ class IntentDetector:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.action_keywords = ACTION_KEYWORDS
+        self.matcher = None
+        self._compiled_size = 0
+    
+    def _keyword_count(self) -> int:
+        return sum(len(keywords) for keywords in self.action_keywords.values())
+    
+    def _compiled_matcher(self) -> KeywordAutomaton:
+        """
+        Keyword automaton for the current table. add_keyword extends it in
+        place; it is recompiled if the table was edited some other way.
+        """
+        if self.matcher is None or self._compiled_size != self._keyword_count():
+            self.matcher = KeywordAutomaton(self.action_keywords)
+            self._compiled_size = len(self.matcher)
+        return self.matcher
     
     def detect_intent(self, query: str) -> Dict[str, Any]:
         """
@@ -23,33 +39,11 @@ class IntentDetector:
         # Score each action type
         action_scores = {}
         
-        for action_type, keywords in self.action_keywords.items():
-            score = 0
-            matched = []
-            
-            for keyword in keywords:
-                keyword_lower = keyword.lower()
-                
-                # Exact match - highest priority
-                if query_lower == keyword_lower:
-                    score += 20
-                    matched.append(keyword)
-                # Starts with keyword - high priority
-                elif query_lower.startswith(keyword_lower):
-                    score += 10
-                    matched.append(keyword)
-                # Contains keyword - medium priority
-                elif keyword_lower in query_lower:
-                    # Give more weight to longer, more specific keywords
-                    keyword_weight = len(keyword.split())
-                    score += (2 * keyword_weight)
-                    matched.append(keyword)
-            
-            if score > 0:
-                action_scores[action_type] = {
-                    'score': score,
-                    'matched': matched
-                }
+        for action_type, (score, matched) in self._compiled_matcher().score(query_lower).items():
+            action_scores[action_type] = {
+                'score': score,
+                'matched': matched
+            }
         
         # If we have action matches, return the highest scoring one
         if action_scores:
@@ -109,6 +103,9 @@ class IntentDetector:
         if action_type in self.action_keywords:
             if keyword.lower() not in [k.lower() for k in self.action_keywords[action_type]]:
                 self.action_keywords[action_type].append(keyword)
+                if self.matcher is not None and self._compiled_size == self._keyword_count() - 1:
+                    self.matcher.add(action_type, keyword)
+                    self._compiled_size += 1
                 self.logger.info(f"Added keyword '{keyword}' to action '{action_type}'")
         else:
             self.logger.warning(f"Action type '{action_type}' not found")
\ No newline at end of file
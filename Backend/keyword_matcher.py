@@ -0,0 +1,173 @@
+"""
+Keyword Matcher Module - Aho-Corasick automaton for scoring intent keywords
+"""
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+# Scoring used by IntentDetector
+EXACT_SCORE = 20
+PREFIX_SCORE = 10
+CONTAINS_SCORE_PER_WORD = 2
+
+
+@dataclass
+class _Pattern:
+    action_type: str
+    position: int      # index of the keyword in its action's list
+    keyword: str       # keyword as configured
+    length: int        # length of the lowercased keyword
+    weight: int        # score when contained (not exact/prefix)
+
+
+class KeywordAutomaton:
+    """
+    Matches every configured keyword against a query in one pass.
+
+    Keywords are lowercased and weighted once when added. ``score`` walks the
+    query through the automaton and classifies each keyword occurrence as an
+    exact, prefix or substring match, giving the same scores as checking the
+    keywords one at a time.
+
+    Adding a keyword extends the trie in place; failure links are rebuilt
+    lazily before the next match, and only when the new keyword created trie
+    nodes or a new output node.
+    """
+
+    def __init__(self, action_keywords: Optional[Dict[str, List[str]]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[List[int]] = [[]]
+        self._output_link: List[int] = [-1]
+        self._patterns: List[_Pattern] = []
+        self._empty: List[int] = []
+        self._actions: Dict[str, int] = {}
+        self._dirty = False
+
+        for action_type, keywords in (action_keywords or {}).items():
+            # Register every action, even without keywords, so ties keep table order
+            self._actions.setdefault(action_type, 0)
+            for keyword in keywords:
+                self.add(action_type, keyword)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, action_type: str, keyword: str):
+        """Add a keyword, keeping per-action order for reporting matches."""
+        keyword_lower = keyword.lower()
+        position = self._actions.get(action_type, 0)
+        self._actions[action_type] = position + 1
+
+        pattern_id = len(self._patterns)
+        self._patterns.append(_Pattern(
+            action_type=action_type,
+            position=position,
+            keyword=keyword,
+            length=len(keyword_lower),
+            weight=CONTAINS_SCORE_PER_WORD * len(keyword.split()),
+        ))
+
+        # "" is a prefix of every query, so it never needs the automaton
+        if not keyword_lower:
+            self._empty.append(pattern_id)
+            return
+
+        node = 0
+        for char in keyword_lower:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+                self._output_link.append(-1)
+                self._goto[node][char] = next_node
+                self._dirty = True
+            node = next_node
+
+        if not self._outputs[node]:
+            self._dirty = True
+        self._outputs[node].append(pattern_id)
+
+    def _build(self):
+        """Breadth-first pass computing failure and output links."""
+        queue = deque()
+        for node in self._goto[0].values():
+            self._fail[node] = 0
+            self._output_link[node] = -1
+            queue.append(node)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                if fail == child:
+                    fail = 0
+                self._fail[child] = fail
+                self._output_link[child] = fail if self._outputs[fail] else self._output_link[fail]
+                queue.append(child)
+
+        self._dirty = False
+
+    def _matches(self, text: str) -> Dict[int, int]:
+        """Map each keyword found in ``text`` to its match score."""
+        if self._dirty:
+            self._build()
+
+        goto, fail, outputs, output_link = self._goto, self._fail, self._outputs, self._output_link
+        patterns = self._patterns
+        text_length = len(text)
+        scores = {}
+
+        for pattern_id in self._empty:
+            scores[pattern_id] = EXACT_SCORE if text_length == 0 else PREFIX_SCORE
+
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if outputs[node] else output_link[node]
+            while match > 0:
+                for pattern_id in outputs[match]:
+                    # The first occurrence decides: it is the prefix one if any
+                    if pattern_id in scores:
+                        continue
+                    length = patterns[pattern_id].length
+                    if end == length:
+                        scores[pattern_id] = EXACT_SCORE if length == text_length else PREFIX_SCORE
+                    else:
+                        scores[pattern_id] = patterns[pattern_id].weight
+                match = output_link[match]
+
+        return scores
+
+    def score(self, text: str) -> Dict[str, Tuple[int, List[str]]]:
+        """
+        Score ``text`` (already lowercased and stripped) against every action.
+
+        Returns ``{action_type: (score, matched_keywords)}`` for actions with a
+        positive score, in the order actions were first added, with each
+        action's keywords in configured order.
+        """
+        found: Dict[str, List[Tuple[int, int, str]]] = {}
+        for pattern_id, score in self._matches(text).items():
+            pattern = self._patterns[pattern_id]
+            found.setdefault(pattern.action_type, []).append((pattern.position, score, pattern.keyword))
+
+        results = {}
+        for action_type in self._actions:
+            hits = found.get(action_type)
+            if not hits:
+                continue
+            hits.sort()
+            total = sum(score for _, score, _ in hits)
+            if total > 0:
+                results[action_type] = (total, [keyword for _, _, keyword in hits])
+        return results
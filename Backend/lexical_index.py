@@ -0,0 +1,269 @@
+"""
+Lexical Index Module - Memory-mapped BM25 inverted index over the chunk store.
+
+Posting ``row`` values are chunk store rows, so lexical and dense results
+refer to the same chunks. The file follows the chunk store layout: a
+header, a section table and 8-byte aligned sections:
+
+    term_offsets     uint64[terms + 1]   byte offsets into the term blob
+    terms            utf-8 blob          vocabulary, sorted
+    posting_offsets  uint64[terms + 1]   posting range of each term
+    rows             uint32[postings]    chunk rows, ascending per term
+    freqs            uint16[postings]    term frequency in the chunk
+    lengths          uint32[count]       chunk length in tokens
+
+Terms are looked up by binary search over the mapped vocabulary, so opening
+the index is O(1) and a query only touches the posting lists of its terms.
+"""
+import os
+import re
+import math
+import mmap
+import struct
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAGIC = b"EMLX"
+VERSION = 1
+LEXICAL_FILENAME = "lexical.bin"
+
+_HEADER = struct.Struct("<4sHHQQQ")
+_SECTION = struct.Struct("<QQ")
+_SECTIONS = ("term_offsets", "terms", "posting_offsets", "rows", "freqs", "lengths")
+
+# Words, numbers and identifiers such as "FY25", "HR-2024-017", "3.5" or "1,234"
+TOKEN_PATTERN = re.compile(r"[A-Za-z0-9]+(?:(?:[-_./:]|(?<=\d),(?=\d))[A-Za-z0-9]+)*")
+_PART_PATTERN = re.compile(r"[A-Za-z0-9]+")
+# A query term that names something: has a digit, a separator, or is an acronym
+_IDENTIFIER_PATTERN = re.compile(r"(?=.*\d)[A-Za-z0-9]+(?:[-_./:,][A-Za-z0-9]+)*|[A-Z]{2,}(?:[-_./:][A-Z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have how in is it its of on or that the their this to was were
+what when where which who why will with
+""".split())
+
+
+def tokenize(text: str) -> Iterator[str]:
+    """
+    Lowercased terms of ``text``. Compound tokens are emitted whole and as
+    their parts, so "HR-2024-017" matches exactly and "2024" still matches.
+    """
+    for match in TOKEN_PATTERN.finditer(text):
+        token = match.group().lower()
+        if token in STOPWORDS:
+            continue
+        yield token
+        if not token.isalnum():
+            for part in _PART_PATTERN.findall(token):
+                if part not in STOPWORDS:
+                    yield part
+
+
+def is_identifier_query(query: str, max_terms: int = 3) -> bool:
+    """
+    Whether ``query`` is a short lookup made only of identifiers ("FY25 EBIT",
+    "POL-104"), which lexical matching answers better than embeddings.
+    """
+    terms = query.strip().rstrip("?!.").split()
+    return 0 < len(terms) <= max_terms and all(_IDENTIFIER_PATTERN.fullmatch(term) for term in terms)
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_lexical_index(path: str, texts: Iterable[str]):
+    """Index chunk ``texts``, in chunk store row order, into ``path`` atomically."""
+    postings: Dict[str, List[Tuple[int, int]]] = {}
+    lengths = []
+
+    for row, text in enumerate(texts):
+        counts = Counter(tokenize(text))
+        lengths.append(sum(counts.values()))
+        for term, freq in counts.items():
+            postings.setdefault(term, []).append((row, freq))
+
+    terms = sorted(postings)
+    encoded = [term.encode("utf-8") for term in terms]
+    term_offsets = np.zeros(len(terms) + 1, dtype="<u8")
+    np.cumsum([len(term) for term in encoded], out=term_offsets[1:])
+    posting_offsets = np.zeros(len(terms) + 1, dtype="<u8")
+    np.cumsum([len(postings[term]) for term in terms], out=posting_offsets[1:])
+
+    rows = np.fromiter((row for term in terms for row, _ in postings[term]), dtype="<u4", count=int(posting_offsets[-1]))
+    freqs = np.fromiter((min(freq, 0xFFFF) for term in terms for _, freq in postings[term]),
+                        dtype="<u2", count=int(posting_offsets[-1]))
+
+    sections = {
+        "term_offsets": term_offsets.tobytes(),
+        "terms": b"".join(encoded),
+        "posting_offsets": posting_offsets.tobytes(),
+        "rows": rows.tobytes(),
+        "freqs": freqs.tobytes(),
+        "lengths": np.asarray(lengths, dtype="<u4").tobytes(),
+    }
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        position = _align(_HEADER.size + _SECTION.size * len(_SECTIONS))
+        table = []
+        for name in _SECTIONS:
+            table.append((position, len(sections[name])))
+            position = _align(position + len(sections[name]))
+
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(lengths), len(terms), sum(lengths)))
+        for entry in table:
+            f.write(_SECTION.pack(*entry))
+
+        for name, (offset, _) in zip(_SECTIONS, table):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(sections[name])
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
+
+
+class _Terms:
+    """Sequence view over the mapped vocabulary, for bisect."""
+
+    def __init__(self, buffer, offsets: np.ndarray, base: int):
+        self._buffer = buffer
+        self._offsets = offsets
+        self._base = base
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        begin, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return self._buffer[self._base + begin:self._base + end].decode("utf-8")
+
+
+class LexicalIndex:
+    """Read-only BM25 search over a lexical index file."""
+
+    def __init__(self, path: str, k1: float = 1.2, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Lexical index is empty or truncated: {path}")
+
+        magic, version, _, count, term_count, total_length = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a lexical index: {path}")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"Unsupported lexical index version {version} (supported: {VERSION})")
+
+        self.count = count
+        self.term_count = term_count
+        self.avg_length = total_length / count if count else 0.0
+        table = {
+            name: _SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size)
+            for i, name in enumerate(_SECTIONS)
+        }
+
+        def view(name, dtype):
+            offset, length = table[name]
+            return np.frombuffer(self._mmap, dtype=dtype, count=length // np.dtype(dtype).itemsize, offset=offset)
+
+        self._posting_offsets = view("posting_offsets", "<u8")
+        self._rows = view("rows", "<u4")
+        self._freqs = view("freqs", "<u2")
+        self._lengths = view("lengths", "<u4")
+        self._terms = _Terms(self._mmap, view("term_offsets", "<u8"), table["terms"][0])
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _postings(self, term: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        i = bisect_left(self._terms, term)
+        if i == len(self._terms) or self._terms[i] != term:
+            return None
+        begin, end = int(self._posting_offsets[i]), int(self._posting_offsets[i + 1])
+        return self._rows[begin:end], self._freqs[begin:end]
+
+    def _idf(self, df: int) -> float:
+        return math.log(1 + (self.count - df + 0.5) / (df + 0.5))
+
+    def coverage(self, query: str, rows: np.ndarray) -> np.ndarray:
+        """
+        IDF-weighted share of the query's terms that each of ``rows`` contains:
+        1.0 when a chunk has every term, near 0 when it only shares common ones.
+        """
+        matched = np.zeros(len(rows), dtype=np.float32)
+        total = 0.0
+        for term in dict.fromkeys(tokenize(query)):
+            postings = self._postings(term)
+            idf = self._idf(0 if postings is None else len(postings[0]))
+            total += idf
+            if postings is not None:
+                matched += idf * np.isin(rows, postings[0])
+        return matched / total if total else matched
+
+    def search(self, query: str, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k ``(rows, scores)`` by BM25, best first. Only chunks containing
+        at least one query term are returned, so there may be fewer than k.
+        """
+        row_parts, score_parts = [], []
+        for term in dict.fromkeys(tokenize(query)):
+            postings = self._postings(term)
+            if postings is None:
+                continue
+            rows, freqs = postings
+            idf = self._idf(len(rows))
+            tf = freqs.astype(np.float32)
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[rows] / self.avg_length)
+            row_parts.append(rows)
+            score_parts.append(idf * tf * (self.k1 + 1) / (tf + norm))
+
+        if not row_parts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        rows, inverse = np.unique(np.concatenate(row_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+        if len(rows) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return rows[order].astype(np.int64), scores[order]
+
+    def close(self):
+        self._posting_offsets = self._rows = self._freqs = self._lengths = self._terms = None
+        try:
+            self._mmap.close()
+        except (BufferError, AttributeError):
+            pass
+        self._file.close()
+
+
+def open_lexical_index(directory: str) -> Optional[LexicalIndex]:
+    path = os.path.join(directory, LEXICAL_FILENAME)
+    return LexicalIndex(path) if os.path.exists(path) else None
+
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], k: int, constant: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fuse ranked row lists with RRF: each row scores sum(1 / (constant + rank)).
+    Returns the top-k ``(rows, scores)``, best first; ties keep first-seen order.
+    """
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(int(row) for row in ranking if row >= 0):
+            fused[row] = fused.get(row, 0.0) + 1.0 / (constant + rank + 1)
+
+    best = sorted(fused.items(), key=lambda item: -item[1])[:k]
+    rows = np.fromiter((row for row, _ in best), dtype=np.int64, count=len(best))
+    scores = np.fromiter((score for _, score in best), dtype=np.float32, count=len(best))
+    return rows, scores
@@ -0,0 +1,86 @@
+"""
+LLM Clients Module - Shared, connection-pooled provider SDK clients.
+
+Clients are built once per (provider, API key, base URL) and shared by
+every LLMHandler in the process, so connections to the provider stay
+alive between requests instead of paying TCP/TLS setup per handler. Each
+sync client gets its own httpx.Client and each async client its own
+httpx.AsyncClient with explicit pool limits and keep-alive expiry. The
+SDKs' built-in retries are disabled; retries and circuit breaking happen
+in LLMHandler (see resilience.py) so they are the same for every provider.
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+
+    @classmethod
+    def from_config(cls, config) -> "PoolSettings":
+        return cls(
+            timeout=config.llm_timeout,
+            connect_timeout=min(config.llm_connect_timeout, config.llm_timeout),
+            max_connections=config.llm_max_connections,
+            max_keepalive_connections=config.llm_keepalive_connections,
+            keepalive_expiry=config.llm_keepalive_expiry,
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+_clients: Dict[tuple, Tuple[object, object]] = {}
+_lock = threading.Lock()
+
+
+def _build(provider: str, api_key: str, base_url: Optional[str], settings: PoolSettings) -> Tuple[object, object]:
+    http_client = httpx.Client(limits=settings.limits(), timeout=settings.timeouts())
+    async_http_client = httpx.AsyncClient(limits=settings.limits(), timeout=settings.timeouts())
+    options = {"api_key": api_key, "max_retries": 0, "timeout": settings.timeouts()}
+    if base_url:
+        options["base_url"] = base_url
+
+    if provider == "groq":
+        from groq import Groq, AsyncGroq
+        return Groq(http_client=http_client, **options), AsyncGroq(http_client=async_http_client, **options)
+    if provider == "anthropic":
+        import anthropic
+        return (anthropic.Anthropic(http_client=http_client, **options),
+                anthropic.AsyncAnthropic(http_client=async_http_client, **options))
+    if provider in ("openai", "local"):
+        import openai
+        return (openai.OpenAI(http_client=http_client, **options),
+                openai.AsyncOpenAI(http_client=async_http_client, **options))
+    raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+def get_clients(provider: str, api_key: str, base_url: Optional[str] = None,
+                settings: Optional[PoolSettings] = None) -> Tuple[object, object]:
+    """
+    The shared ``(client, async_client)`` for a provider. Raises ImportError
+    when the provider's SDK is not installed.
+    """
+    settings = settings or PoolSettings()
+    key = (provider, api_key, base_url, settings)
+    with _lock:
+        clients = _clients.get(key)
+        if clients is None:
+            clients = _clients[key] = _build(provider, api_key, base_url, settings)
+        return clients
+
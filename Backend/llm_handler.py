@@ -1,6 +1,38 @@
+import time
+import asyncio
 import logging
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
 from config import AgentConfig
+from timing import LatencyWindow, timed_stage
+from metrics import (
+    LLM_ERRORS, LLM_FALLBACKS, LLM_FIRST_TOKEN_SECONDS, LLM_HEDGE_DELAY, LLM_HEDGE_WINS, LLM_HEDGES,
+    LLM_REQUEST_SECONDS, LLM_RETRIES, record_circuit_state,
+)
+from llm_clients import PoolSettings, get_clients
+from resilience import RetryPolicy, acall_with_retries, call_with_retries, get_breaker
+from hedging import ahedge, ahedge_stream, hedge
+from completion_cache import CompletionCache
+
+ERROR_PREFIX = "**Error generating response:**"
+PROVIDERS = ("groq", "anthropic", "openai", "local")
+# Latency samples needed before the hedge delay follows the primary's percentile
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WORKERS = 16
+
+
+def is_error_response(text: str) -> bool:
+    """True for the canned message returned when no provider produced an answer."""
+    return text.startswith(ERROR_PREFIX)
+
+
+def _failed(response: Optional[str]) -> bool:
+    return response is None or is_error_response(response)
+
+
+async def _empty() -> AsyncIterator[str]:
+    return
+    yield
 
 
 class LLMHandler:
@@ -10,7 +42,25 @@ class LLMHandler:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.client = None
+        self.async_client = None
+        self.pool_settings = PoolSettings.from_config(config)
+        self.retry_policy = RetryPolicy(config.llm_max_retries, config.llm_retry_base_delay, config.llm_retry_max_delay)
+        self.breaker = get_breaker(config.llm_provider, config.llm_breaker_failures, config.llm_breaker_reset,
+                                   on_change=record_circuit_state)
         self._initialize_client()
+        
+        # Primary first, then LLM_FALLBACKS in order; backups are hedged or failed over to
+        self.name = f"{config.llm_provider}:{config.model_name}"
+        self.backends = [self] + [LLMHandler(config.for_fallback(provider, model))
+                                  for provider, model in config.llm_fallbacks]
+        # The primary's successful latencies: whole answers, and first chunks of streams
+        self.primary_latencies = {"complete": LatencyWindow(), "stream": LatencyWindow()}
+        self._hedge_executor = None
+        
+        self.completion_cache = None
+        if config.completion_cache_enabled and (config.temperature == 0 or config.completion_cache_sampled):
+            self.completion_cache = CompletionCache(config.completion_cache_path, config.completion_cache_size,
+                                                    config.completion_cache_ttl)
     
     def _initialize_client(self):
         try:
@@ -20,6 +70,8 @@ class LLMHandler:
                 self._initialize_anthropic()
             elif self.config.llm_provider == "openai":
                 self._initialize_openai()
+            elif self.config.llm_provider == "local":
+                self._initialize_local()
             else:
                 self.logger.warning(f"Unknown LLM provider: {self.config.llm_provider}")
         except Exception as e:
@@ -28,9 +80,8 @@ class LLMHandler:
     def _initialize_groq(self):
         """Initialize Groq client."""
         try:
-            from groq import Groq
             if self.config.llm_api_key:
-                self.client = Groq(api_key=self.config.llm_api_key)
+                self.client, self.async_client = get_clients("groq", self.config.llm_api_key, settings=self.pool_settings)
                 self.logger.info(f"Groq client initialized with model: {self.config.model_name}")
             else:
                 self.logger.warning("No API key provided for Groq")
@@ -41,9 +92,8 @@ class LLMHandler:
     
     def _initialize_anthropic(self):
         try:
-            import anthropic
             if self.config.llm_api_key:
-                self.client = anthropic.Anthropic(api_key=self.config.llm_api_key)
+                self.client, self.async_client = get_clients("anthropic", self.config.llm_api_key, settings=self.pool_settings)
                 self.logger.info("Anthropic client initialized")
             else:
                 self.logger.warning("No API key provided for Anthropic")
@@ -52,32 +102,248 @@ class LLMHandler:
     
     def _initialize_openai(self):
         try:
-            import openai
             if self.config.llm_api_key:
-                openai.api_key = self.config.llm_api_key
-                self.client = openai
+                self.client, self.async_client = get_clients("openai", self.config.llm_api_key, settings=self.pool_settings)
                 self.logger.info("OpenAI client initialized")
             else:
                 self.logger.warning("No API key provided for OpenAI")
         except ImportError:
             self.logger.error("openai package not installed. Install with: pip install openai")
     
+    def _initialize_local(self):
+        """OpenAI-compatible server at ``llm_base_url``, e.g. local_llm_server.py."""
+        try:
+            self.client, self.async_client = get_clients(
+                "local", self.config.llm_api_key or "local", self.config.llm_base_url, self.pool_settings
+            )
+            self.logger.info(f"Local LLM client initialized at {self.config.llm_base_url}")
+        except ImportError:
+            self.logger.error("openai package not installed. Install with: pip install openai")
+    
+    def _call(self, create, **kwargs):
+        """Make a provider API call with retries on transient errors, through the provider's circuit breaker."""
+        return call_with_retries(lambda: create(**kwargs), self.retry_policy, self.breaker, self._count_retry)
+    
+    async def _acall(self, create, **kwargs):
+        return await acall_with_retries(lambda: create(**kwargs), self.retry_policy, self.breaker, self._count_retry)
+    
+    def _count_retry(self, error: BaseException):
+        self.logger.warning(f"Retrying {self.config.llm_provider} call after: {str(error)[:200]}")
+        LLM_RETRIES.labels(self.config.llm_provider).inc()
+    
     def generate_response(self, query: str, context: str, pages: List[int]) -> str:
+        if not context:
+            return self._generate_not_found(query)
         try:
-            prompt = self._build_prompt(query, context, pages)
+            with timed_stage("prompt"):
+                prompt = self._build_prompt(query, context, pages)
             
-            if self.config.llm_provider == "groq":
-                return self._generate_groq(prompt)
-            elif self.config.llm_provider == "anthropic":
-                return self._generate_anthropic(prompt)
-            elif self.config.llm_provider == "openai":
-                return self._generate_openai(prompt)
-            else:
-                return self._generate_fallback(query, context, pages)
+            response = self._call_provider(prompt)
+            return response if response is not None else self._generate_fallback(query, context, pages)
         except Exception as e:
             self.logger.error(f"Error generating LLM response: {str(e)}")
             return self._generate_fallback(query, context, pages)
     
+    async def agenerate_response(self, query: str, context: str, pages: List[int]) -> str:
+        """Async variant of generate_response; awaits the provider without holding a thread."""
+        if not context:
+            return self._generate_not_found(query)
+        try:
+            with timed_stage("prompt"):
+                prompt = self._build_prompt(query, context, pages)
+            
+            response = await self._acall_provider(prompt)
+            return response if response is not None else self._generate_fallback(query, context, pages)
+        except Exception as e:
+            self.logger.error(f"Error generating LLM response: {str(e)}")
+            return self._generate_fallback(query, context, pages)
+    
+    async def astream_response(self, query: str, context: str, pages: List[int]) -> AsyncIterator[str]:
+        """Yield the answer incrementally as the provider produces tokens."""
+        if not context:
+            yield self._generate_not_found(query)
+            return
+        with timed_stage("prompt"):
+            prompt = self._build_prompt(query, context, pages)
+        async for text in self._astream(prompt, lambda: self._generate_fallback(query, context, pages)):
+            yield text
+    
+    def hedge_delay(self, mode: str = "complete") -> Optional[float]:
+        """
+        Seconds to wait for the primary before hedging: the configured
+        percentile of its recent successful latencies once there are enough,
+        else ``llm_hedge_delay_ms``. For ``mode="stream"`` the latency is the
+        time to the first chunk. None when hedging is off (failover only).
+        """
+        if self.config.llm_hedge_percentile <= 0:
+            return None
+        latencies = self.primary_latencies[mode]
+        delay_ms = self.config.llm_hedge_delay_ms
+        if len(latencies) >= HEDGE_MIN_SAMPLES:
+            delay_ms = max(self.config.llm_hedge_min_delay_ms, latencies.percentile(self.config.llm_hedge_percentile))
+        LLM_HEDGE_DELAY.labels(mode).set(delay_ms / 1000.0)
+        return delay_ms / 1000.0
+    
+    def _hedge_callbacks(self, mode: str = "complete"):
+        def on_launch(i: int, reason: str):
+            self.logger.info(f"Hedging LLM request to {self.backends[i].name} ({reason})")
+            LLM_HEDGES.labels(self.backends[i].name, reason).inc()
+        
+        def on_latency(i: int, seconds: float):
+            if i == 0:
+                self.primary_latencies[mode].add(seconds * 1000)
+        
+        return on_launch, on_latency
+    
+    def _won(self, index: int):
+        if index > 0:
+            LLM_HEDGE_WINS.labels(self.backends[index].name).inc()
+    
+    def _completion_keys(self, prompt: str) -> List[bytes]:
+        """Completion cache keys for ``prompt``, one per backend in order; empty when caching is off."""
+        if self.completion_cache is None:
+            return []
+        return [CompletionCache.key(backend.config.llm_provider, backend.config.model_name,
+                                    self.config.temperature, self.config.max_tokens, prompt)
+                for backend in self.backends]
+    
+    def _cached_completion(self, keys: List[bytes]) -> Optional[str]:
+        if not keys:
+            return None
+        with timed_stage("completion_cache"):
+            return self.completion_cache.get(*keys)
+    
+    async def _acached_completion(self, keys: List[bytes]) -> Optional[str]:
+        if not keys:
+            return None
+        # A read can wait on another process's write lock; keep it off the event loop
+        with timed_stage("completion_cache"):
+            return await asyncio.get_running_loop().run_in_executor(None, self.completion_cache.get, *keys)
+    
+    def _call_provider(self, prompt: str) -> Optional[str]:
+        """Generate with the configured providers, through the completion cache; None if no provider is known."""
+        keys = self._completion_keys(prompt)
+        response = self._cached_completion(keys)
+        if response is None:
+            index, response = self._call_providers(prompt)
+            if keys and not _failed(response):
+                # Stored under the backend that produced it, never the primary's key
+                self.completion_cache.put(keys[index], response)
+        return response
+    
+    async def _acall_provider(self, prompt: str) -> Optional[str]:
+        keys = self._completion_keys(prompt)
+        response = await self._acached_completion(keys)
+        if response is None:
+            index, response = await self._acall_providers(prompt)
+            if keys and not _failed(response):
+                asyncio.get_running_loop().run_in_executor(None, self.completion_cache.put, keys[index], response)
+        return response
+    
+    async def _astream(self, prompt: str, fallback) -> AsyncIterator[str]:
+        keys = self._completion_keys(prompt)
+        cached = await self._acached_completion(keys)
+        if cached is not None:
+            yield cached
+            return
+        
+        index, first, stream = await self._aopen_stream(prompt)
+        if first is None:
+            yield fallback()
+            return
+        
+        parts = [first]
+        yield first
+        try:
+            async for text in stream:
+                parts.append(text)
+                yield text
+        except Exception as e:
+            # Part of the answer was already sent, so it cannot be replaced with a fallback;
+            # raise so the client gets an error event instead of a clean end to a cut-off answer
+            self.logger.warning(f"LLM stream interrupted: {str(e)}")
+            raise
+        
+        if keys and not _failed(first):
+            asyncio.get_running_loop().run_in_executor(None, self.completion_cache.put, keys[index], "".join(parts))
+    
+    def _call_providers(self, prompt: str) -> Tuple[int, Optional[str]]:
+        """``(index of the backend that answered, response)``."""
+        if len(self.backends) == 1:
+            return 0, self._call_backend(prompt)
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+        calls = [lambda backend=backend: backend._call_backend(prompt) for backend in self.backends]
+        index, response = hedge(calls, self.hedge_delay(), _failed, self._hedge_executor,
+                                *self._hedge_callbacks())
+        self._won(index)
+        return index, response
+    
+    async def _acall_providers(self, prompt: str) -> Tuple[int, Optional[str]]:
+        if len(self.backends) == 1:
+            return 0, await self._acall_backend(prompt)
+        calls = [lambda backend=backend: backend._acall_backend(prompt) for backend in self.backends]
+        index, response = await ahedge(calls, self.hedge_delay(), _failed, *self._hedge_callbacks())
+        self._won(index)
+        return index, response
+    
+    async def _aopen_stream(self, prompt: str) -> Tuple[int, Optional[str], Optional[AsyncIterator[str]]]:
+        """
+        ``(index, first_chunk, rest)`` from the backend whose stream won;
+        first_chunk is None when no provider is known or none produced a chunk.
+        """
+        streams = [lambda backend=backend: backend._astream_backend(prompt) or _empty() for backend in self.backends]
+        if len(streams) == 1:
+            return await ahedge_stream(streams, None, _failed)
+        index, first, stream = await ahedge_stream(streams, self.hedge_delay("stream"), _failed,
+                                                   *self._hedge_callbacks("stream"))
+        self._won(index)
+        return index, first, stream
+    
+    def _call_backend(self, prompt: str) -> Optional[str]:
+        """Generate with this handler's own provider; None if the provider is unknown."""
+        provider = self.config.llm_provider
+        if provider not in PROVIDERS:
+            return None
+        started = time.perf_counter()
+        response = getattr(self, f"_generate_{provider}")(prompt)
+        self._observe_call(provider, "generate", started, response)
+        return response
+    
+    async def _acall_backend(self, prompt: str) -> Optional[str]:
+        provider = self.config.llm_provider
+        if provider not in PROVIDERS:
+            return None
+        started = time.perf_counter()
+        response = await getattr(self, f"_agenerate_{provider}")(prompt)
+        self._observe_call(provider, "agenerate", started, response)
+        return response
+    
+    def _astream_backend(self, prompt: str) -> Optional[AsyncIterator[str]]:
+        if self.config.llm_provider not in PROVIDERS:
+            return None
+        return self._astream_timed(prompt)
+    
+    async def _astream_timed(self, prompt: str) -> AsyncIterator[str]:
+        provider = self.config.llm_provider
+        started = time.perf_counter()
+        first = None
+        try:
+            async for text in getattr(self, f"_astream_{provider}")(prompt):
+                if first is None:
+                    first = text
+                    LLM_FIRST_TOKEN_SECONDS.labels(provider).observe(time.perf_counter() - started)
+                yield text
+        except Exception:
+            LLM_REQUEST_SECONDS.labels(provider, "stream", "error").observe(time.perf_counter() - started)
+            raise
+        self._observe_call(provider, "stream", started, first or "")
+    
+    @staticmethod
+    def _observe_call(provider: str, mode: str, started: float, response: str):
+        outcome = "error" if is_error_response(response) else "ok"
+        LLM_REQUEST_SECONDS.labels(provider, mode, outcome).observe(time.perf_counter() - started)
+    
     def _build_prompt(self, query: str, context: str, pages: List[int]) -> str:
         prompt = f"""You are an intelligent Enterprise Assistant for HCLTech. You help employees by answering questions based on the company's official documentation.
 
@@ -104,7 +370,8 @@ Answer:"""
         
         try:
             # Groq API call with proper error handling
-            chat_completion = self.client.chat.completions.create(
+            chat_completion = self._call(
+                self.client.chat.completions.create,
                 messages=[
                     {
                         "role": "system",
@@ -133,12 +400,105 @@ Answer:"""
             self.logger.error(f"Model: {self.config.model_name}, Max tokens: {self.config.max_tokens}")
             return self._generate_fallback_error(str(e))
     
+    async def _agenerate_groq(self, prompt: str) -> str:
+        if not self.async_client:
+            return self._generate_fallback_error("Groq client not initialized")
+        
+        try:
+            chat_completion = await self._acall(
+                self.async_client.chat.completions.create,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an intelligent Enterprise Assistant for HCLTech. Provide accurate, professional responses based on company documentation."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+                model=self.config.model_name,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens,
+                top_p=1,
+                stream=False,
+                stop=None,
+            )
+            
+            response = chat_completion.choices[0].message.content
+            self.logger.info(f"Response generated successfully with Groq (model: {self.config.model_name})")
+            return response
+        except Exception as e:
+            self.logger.error(f"Error calling Groq API: {str(e)}")
+            self.logger.error(f"Model: {self.config.model_name}, Max tokens: {self.config.max_tokens}")
+            return self._generate_fallback_error(str(e))
+    
+    async def _astream_groq(self, prompt: str) -> AsyncIterator[str]:
+        if not self.async_client:
+            yield self._generate_fallback_error("Groq client not initialized")
+            return
+        
+        produced = False
+        try:
+            stream = await self._acall(
+                self.async_client.chat.completions.create,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are an intelligent Enterprise Assistant for HCLTech. Provide accurate, professional responses based on company documentation."
+                    },
+                    {
+                        "role": "user",
+                        "content": prompt,
+                    }
+                ],
+                model=self.config.model_name,
+                temperature=self.config.temperature,
+                max_tokens=self.config.max_tokens,
+                top_p=1,
+                stream=True,
+                stop=None,
+            )
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    produced = True
+                    yield delta
+            self.logger.info(f"Response streamed successfully with Groq (model: {self.config.model_name})")
+        except Exception as e:
+            self.logger.error(f"Error streaming from Groq API: {str(e)}")
+            if produced:
+                raise
+            yield self._generate_fallback_error(str(e))
+    
     def _generate_anthropic(self, prompt: str) -> str:
         if not self.client:
             return self._generate_fallback_error("Anthropic client not initialized")
         
         try:
-            message = self.client.messages.create(
+            message = self._call(
+                self.client.messages.create,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            
+            response = message.content[0].text
+            self.logger.info("Response generated successfully with Anthropic")
+            return response
+        except Exception as e:
+            self.logger.error(f"Error calling Anthropic API: {str(e)}")
+            return self._generate_fallback_error(str(e))
+    
+    async def _agenerate_anthropic(self, prompt: str) -> str:
+        if not self.async_client:
+            return self._generate_fallback_error("Anthropic client not initialized")
+        
+        try:
+            message = await self._acall(
+                self.async_client.messages.create,
                 model=self.config.model_name,
                 max_tokens=self.config.max_tokens,
                 temperature=self.config.temperature,
@@ -152,12 +512,40 @@ Answer:"""
             self.logger.error(f"Error calling Anthropic API: {str(e)}")
             return self._generate_fallback_error(str(e))
     
+    async def _astream_anthropic(self, prompt: str) -> AsyncIterator[str]:
+        if not self.async_client:
+            yield self._generate_fallback_error("Anthropic client not initialized")
+            return
+        
+        produced = False
+        try:
+            stream = await self._acall(
+                self.async_client.messages.create,
+                model=self.config.model_name,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
+            )
+            
+            async for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    produced = True
+                    yield event.delta.text
+            self.logger.info("Response streamed successfully with Anthropic")
+        except Exception as e:
+            self.logger.error(f"Error streaming from Anthropic API: {str(e)}")
+            if produced:
+                raise
+            yield self._generate_fallback_error(str(e))
+    
     def _generate_openai(self, prompt: str) -> str:
         if not self.client:
             return self._generate_fallback_error("OpenAI client not initialized")
         
         try:
-            response = self.client.ChatCompletion.create(
+            response = self._call(
+                self.client.chat.completions.create,
                 model=self.config.model_name,
                 messages=[
                     {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
@@ -174,7 +562,139 @@ Answer:"""
             self.logger.error(f"Error calling OpenAI API: {str(e)}")
             return self._generate_fallback_error(str(e))
     
+    async def _agenerate_openai(self, prompt: str) -> str:
+        if not self.async_client:
+            return self._generate_fallback_error("OpenAI client not initialized")
+        
+        try:
+            response = await self._acall(
+                self.async_client.chat.completions.create,
+                model=self.config.model_name,
+                messages=[
+                    {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature
+            )
+            
+            answer = response.choices[0].message.content
+            self.logger.info("Response generated successfully with OpenAI")
+            return answer
+        except Exception as e:
+            self.logger.error(f"Error calling OpenAI API: {str(e)}")
+            return self._generate_fallback_error(str(e))
+    
+    async def _astream_openai(self, prompt: str) -> AsyncIterator[str]:
+        if not self.async_client:
+            yield self._generate_fallback_error("OpenAI client not initialized")
+            return
+        
+        produced = False
+        try:
+            stream = await self._acall(
+                self.async_client.chat.completions.create,
+                model=self.config.model_name,
+                messages=[
+                    {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    produced = True
+                    yield delta
+            self.logger.info("Response streamed successfully with OpenAI")
+        except Exception as e:
+            self.logger.error(f"Error streaming from OpenAI API: {str(e)}")
+            if produced:
+                raise
+            yield self._generate_fallback_error(str(e))
+    
+    def _generate_local(self, prompt: str) -> str:
+        if not self.client:
+            return self._generate_fallback_error("Local LLM client not initialized")
+        
+        try:
+            response = self._call(
+                self.client.chat.completions.create,
+                model=self.config.model_name,
+                messages=[
+                    {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature
+            )
+            
+            answer = response.choices[0].message.content
+            self.logger.info("Response generated successfully with the local LLM")
+            return answer
+        except Exception as e:
+            self.logger.error(f"Error calling local LLM at {self.config.llm_base_url}: {str(e)}")
+            return self._generate_fallback_error(str(e))
+    
+    async def _agenerate_local(self, prompt: str) -> str:
+        if not self.async_client:
+            return self._generate_fallback_error("Local LLM client not initialized")
+        
+        try:
+            response = await self._acall(
+                self.async_client.chat.completions.create,
+                model=self.config.model_name,
+                messages=[
+                    {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature
+            )
+            
+            answer = response.choices[0].message.content
+            self.logger.info("Response generated successfully with the local LLM")
+            return answer
+        except Exception as e:
+            self.logger.error(f"Error calling local LLM at {self.config.llm_base_url}: {str(e)}")
+            return self._generate_fallback_error(str(e))
+    
+    async def _astream_local(self, prompt: str) -> AsyncIterator[str]:
+        if not self.async_client:
+            yield self._generate_fallback_error("Local LLM client not initialized")
+            return
+        
+        produced = False
+        try:
+            stream = await self._acall(
+                self.async_client.chat.completions.create,
+                model=self.config.model_name,
+                messages=[
+                    {"role": "system", "content": "You are an intelligent Enterprise Assistant for HCLTech."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    produced = True
+                    yield delta
+            self.logger.info("Response streamed successfully with the local LLM")
+        except Exception as e:
+            self.logger.error(f"Error streaming from local LLM at {self.config.llm_base_url}: {str(e)}")
+            if produced:
+                raise
+            yield self._generate_fallback_error(str(e))
+    
     def _generate_fallback(self, query: str, context: str, pages: List[int]) -> str:
+        LLM_FALLBACKS.labels("context").inc()
         return f"""Based on the HCLTech Annual Report (Pages: {pages}), here's the relevant context:
 
 **Query:** {query}
@@ -184,8 +704,19 @@ Answer:"""
 
 **Citation:** Pages {pages} from HCLTech Annual Integrated Report 2024-25"""
     
+    def _generate_not_found(self, query: str) -> str:
+        # Nothing passed the retriever's relevance checks, so there is nothing to ground an answer in
+        self.logger.info("No relevant context retrieved; answering without an LLM call")
+        LLM_FALLBACKS.labels("not_found").inc()
+        return f"""I couldn't find information about this in the HCLTech Annual Report.
+
+**Query:** {query}
+
+Try rephrasing the question, or ask about topics covered in the report."""
+    
     def _generate_fallback_error(self, error: str) -> str:
-        return f"""**Error generating response:** {error}
+        LLM_ERRORS.labels(self.config.llm_provider).inc()
+        return f"""{ERROR_PREFIX} {error}
 
 Please check:
 1. API key is correctly configured in .env file
@@ -194,8 +725,25 @@ Please check:
 4. API provider service is available
 5. Internet connection is active"""
     
-    def generate_with_actions(self, query: str, context: str, pages: List[int], action_result: dict) -> str:
-        prompt = f"""You are an intelligent Enterprise Assistant for HCLTech. 
+    def _build_action_prompt(self, query: str, context: str, pages: List[int], action_result: dict) -> str:
+        # Actions whose retrieval policy is "skip" arrive without context
+        if not context:
+            return f"""You are an intelligent Enterprise Assistant for HCLTech. 
+
+The user requested an action, which has been executed. Now provide a helpful response that:
+1. Confirms the action was completed
+2. Explains next steps if any
+
+User Query: {query}
+
+Action Executed:
+- Type: {action_result.get('action_type')}
+- Status: {action_result.get('status')}
+- Details: {action_result.get('details')}
+
+Provide a professional response:"""
+        
+        return f"""You are an intelligent Enterprise Assistant for HCLTech. 
 
 The user requested an action, which has been executed. Now provide a helpful response that:
 1. Confirms the action was completed
@@ -213,23 +761,44 @@ Action Executed:
 - Details: {action_result.get('details')}
 
 Provide a professional response:"""
+    
+    def generate_with_actions(self, query: str, context: str, pages: List[int], action_result: dict) -> str:
+        with timed_stage("prompt"):
+            prompt = self._build_action_prompt(query, context, pages, action_result)
 
         try:
-            if self.config.llm_provider == "groq":
-                return self._generate_groq(prompt)
-            elif self.config.llm_provider == "anthropic":
-                return self._generate_anthropic(prompt)
-            elif self.config.llm_provider == "openai":
-                return self._generate_openai(prompt)
-            else:
-                return self._generate_action_fallback(query, action_result, context, pages)
+            response = self._call_provider(prompt)
+            return response if response is not None else self._generate_action_fallback(query, action_result, context, pages)
         except Exception as e:
             self.logger.error(f"Error generating response with actions: {str(e)}")
             return self._generate_action_fallback(query, action_result, context, pages)
     
+    async def agenerate_with_actions(self, query: str, context: str, pages: List[int], action_result: dict) -> str:
+        with timed_stage("prompt"):
+            prompt = self._build_action_prompt(query, context, pages, action_result)
+
+        try:
+            response = await self._acall_provider(prompt)
+            return response if response is not None else self._generate_action_fallback(query, action_result, context, pages)
+        except Exception as e:
+            self.logger.error(f"Error generating response with actions: {str(e)}")
+            return self._generate_action_fallback(query, action_result, context, pages)
+    
+    async def astream_with_actions(self, query: str, context: str, pages: List[int], action_result: dict) -> AsyncIterator[str]:
+        with timed_stage("prompt"):
+            prompt = self._build_action_prompt(query, context, pages, action_result)
+        fallback = lambda: self._generate_action_fallback(query, action_result, context, pages)
+        async for text in self._astream(prompt, fallback):
+            yield text
+    
     def _generate_action_fallback(self, query: str, action_result: dict, context: str, pages: List[int]) -> str:
+        LLM_FALLBACKS.labels("action").inc()
         details = action_result.get('details', {})
         formatted_details = "\n".join([f"- {k.replace('_', ' ').title()}: {v}" for k, v in details.items() if k != "status"])
+        documentation = f"""
+**Relevant Documentation (Pages {pages}):**
+{context[:400]}
+""" if context else ""
         
         return f"""**Action Completed Successfully**
 
@@ -240,7 +809,4 @@ Provide a professional response:"""
 
 **Details:**
 {formatted_details}
-
-**Relevant Documentation (Pages {pages}):**
-{context[:400]}
-"""
\ No newline at end of file
+{documentation}"""
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""
+Local LLM Server - A stand-in for a hosted LLM with an OpenAI-compatible API.
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream=true``) and
+``GET /v1/models`` with made-up but deterministic answers, so the assistant
+can be run and load-tested with ``LLM_PROVIDER=local`` on a machine without
+network access or API quota. Latency and failures are configurable:
+
+    python local_llm_server.py [--port 8001] [--ttft-ms 300] [--tokens-per-sec 60]
+        [--output-tokens 150] [--error-rate 0.02] [--error-status 500 503 429]
+
+A request waits ``--ttft-ms`` before its first token and then produces
+``--tokens-per-sec`` tokens, capped by the request's ``max_tokens``. The
+answer depends only on the prompt; whether a request fails is drawn from
+a generator seeded with ``--seed``.
+"""
+import json
+import time
+import zlib
+import random
+import asyncio
+import argparse
+import itertools
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = """
+revenue growth digital services clients operations engineering cloud platform strategy
+employees margin quarter segment portfolio delivery partners innovation sustainability
+report customers transformation investment performance annual technology market global
+""".split()
+
+
+@dataclass
+class ServerSettings:
+    ttft_ms: float = 300.0
+    tokens_per_sec: float = 60.0
+    output_tokens: int = 150
+    error_rate: float = 0.0
+    error_statuses: List[int] = field(default_factory=lambda: [500])
+    model: str = "local-model"
+    seed: int = 42
+
+
+def completion_text(prompt: str, tokens: int) -> List[str]:
+    """``tokens`` words determined by the prompt, returned as stream deltas."""
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    words = [rng.choice(WORDS) for _ in range(max(1, tokens))]
+    words[0] = words[0].capitalize()
+    words[-1] += "."
+    return [words[0]] + [" " + word for word in words[1:]]
+
+
+def create_app(settings: Optional[ServerSettings] = None) -> FastAPI:
+    settings = settings or ServerSettings()
+    app = FastAPI(title="Local LLM Server")
+    app.state.settings = settings
+    app.state.stats = {"requests": 0, "errors": 0, "streams": 0}
+    failures = random.Random(settings.seed)
+    ids = itertools.count(1)
+
+    def error_response() -> Optional[JSONResponse]:
+        if settings.error_rate <= 0 or failures.random() >= settings.error_rate:
+            return None
+        app.state.stats["errors"] += 1
+        status = failures.choice(settings.error_statuses)
+        return JSONResponse(status_code=status, content={"error": {
+            "message": f"Injected failure (status {status})",
+            "type": "rate_limit_error" if status == 429 else "server_error",
+            "code": status,
+        }})
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok", **app.state.stats}
+
+    @app.get("/v1/models")
+    def models():
+        return {"object": "list", "data": [{"id": settings.model, "object": "model", "owned_by": "local"}]}
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.stats["requests"] += 1
+        failed = error_response()
+        if failed is not None:
+            return failed
+
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        max_tokens = body.get("max_tokens") or settings.output_tokens
+        deltas = completion_text(prompt, min(settings.output_tokens, max_tokens))
+        model = body.get("model") or settings.model
+        completion_id = f"chatcmpl-local-{next(ids)}"
+        created = int(time.time())
+        token_delay = 1.0 / settings.tokens_per_sec if settings.tokens_per_sec > 0 else 0.0
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(deltas),
+            "total_tokens": len(prompt) // 4 + len(deltas),
+        }
+
+        if not body.get("stream"):
+            await asyncio.sleep(settings.ttft_ms / 1000.0 + token_delay * (len(deltas) - 1))
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(deltas)},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        app.state.stats["streams"] += 1
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None) -> str:
+            return "data: " + json.dumps({
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        async def events():
+            await asyncio.sleep(settings.ttft_ms / 1000.0)
+            yield chunk({"role": "assistant", "content": deltas[0]})
+            for delta in deltas[1:]:
+                await asyncio.sleep(token_delay)
+                yield chunk({"content": delta})
+            yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI-compatible stand-in LLM for offline testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="Delay before the first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0, help="Generation speed after the first token")
+    parser.add_argument("--output-tokens", type=int, default=150, help="Answer length, capped by max_tokens")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, nargs="+", default=[500], help="Status codes failures use")
+    parser.add_argument("--model", default="local-model")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    import uvicorn
+    settings = ServerSettings(
+        ttft_ms=args.ttft_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        error_statuses=args.error_status,
+        model=args.model,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
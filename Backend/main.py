@@ -1,8 +1,12 @@
 
 import sys
 import json
+import time
+import asyncio
+from pathlib import Path
 from config import AgentConfig
 from agent import AgenticRAGAssistant
+from timing import summarize_latencies
 
 
 def run_demo_queries():
@@ -114,6 +118,68 @@ def run_single_query(query: str):
     return result
 
 
+def load_batch_queries(input_path: str):
+    """Read queries from JSONL: one {"query": ..., "id": ...} object or bare string per line."""
+    queries = []
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if isinstance(item, str):
+                item = {"query": item}
+            queries.append(item)
+    return queries
+
+
+def run_batch(input_path: str, output_path: str = None, concurrency: int = None):
+    """Process a JSONL file of queries and write one result per line."""
+    
+    config = AgentConfig.from_env()
+    assistant = AgenticRAGAssistant(config)
+    
+    if not assistant.initialize():
+        print("Failed to initialize assistant.")
+        return None
+    
+    items = load_batch_queries(input_path)
+    output_path = output_path or str(Path(input_path).with_suffix(".results.jsonl"))
+    
+    print(f"\nProcessing {len(items)} queries from {input_path}")
+    print("-"*70)
+    
+    async def process():
+        latencies, errors = [], 0
+        with open(output_path, "w", encoding="utf-8") as out:
+            queries = [item["query"] for item in items]
+            async for result in assistant.aprocess_batch(queries, concurrency):
+                item = items[result["index"]]
+                if "id" in item:
+                    result["id"] = item["id"]
+                latencies.append(result["latency_ms"])
+                errors += 1 if result.get("error") else 0
+                out.write(json.dumps(result) + "\n")
+        return latencies, errors
+    
+    start = time.perf_counter()
+    latencies, errors = asyncio.run(process())
+    elapsed = time.perf_counter() - start
+    
+    summary = summarize_latencies(latencies)
+    summary["errors"] = errors
+    summary["wall_time_s"] = round(elapsed, 3)
+    summary["throughput_qps"] = round(len(latencies) / elapsed, 2) if elapsed else 0.0
+    
+    print(f"\n Queries: {summary['count']} ({errors} errors)")
+    print(f" Latency (ms): mean {summary['mean_ms']}, p50 {summary['p50_ms']}, "
+          f"p95 {summary['p95_ms']}, p99 {summary['p99_ms']}, max {summary['max_ms']}")
+    print(f" Wall time: {summary['wall_time_s']}s ({summary['throughput_qps']} queries/s)")
+    print(f"\n Results saved to: {output_path}")
+    
+    return summary
+
+
 def run_interactive():
     """Run in interactive mode."""
     
@@ -139,12 +205,14 @@ Modes:
     demo        - Run demo queries showcasing different capabilities
     interactive - Run in interactive CLI mode (default)
     query       - Process a single query
+    batch       - Process a JSONL file of queries (--concurrency N, --output PATH)
     help        - Show this help message
 
 Examples:
     python main.py demo
     python main.py interactive
     python main.py query "What is HCLTech's revenue?"
+    python main.py batch queries.jsonl --concurrency 16
     python main.py help
     """)
 
@@ -169,6 +237,23 @@ def main():
             sys.exit(1)
         query = " ".join(sys.argv[2:])
         run_single_query(query)
+    elif mode == "batch":
+        args = sys.argv[2:]
+        options = {}
+        for flag in ("--concurrency", "--output"):
+            if flag in args:
+                i = args.index(flag)
+                if i + 1 >= len(args):
+                    print(f"Error: {flag} needs a value")
+                    sys.exit(1)
+                options[flag] = args[i + 1]
+                del args[i:i + 2]
+        if not args:
+            print("Error: Please provide a queries file")
+            print("Usage: python main.py batch queries.jsonl [--concurrency N] [--output PATH]")
+            sys.exit(1)
+        concurrency = int(options["--concurrency"]) if "--concurrency" in options else None
+        run_batch(args[0], options.get("--output"), concurrency)
     elif mode in ["help", "-h", "--help"]:
         print_usage()
     else:
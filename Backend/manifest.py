@@ -0,0 +1,114 @@
+"""
+Ingest Manifest Module - Tracks per-file, per-page and per-chunk content hashes
+so that re-ingestion only touches what changed.
+"""
+import os
+import json
+import hashlib
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", errors="surrogatepass")).hexdigest()
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_key(path: str) -> str:
+    """Canonical manifest key, so the same file matches whatever cwd or spelling it was given with."""
+    return os.path.normcase(os.path.realpath(path))
+
+
+def chunk_id(source: str, page: int, start: int, text: str) -> str:
+    """Deterministic vector id: identical chunk content at the same position keeps its id."""
+    return hash_text(f"{source}\0{page}\0{start}\0{text}")
+
+
+class IngestManifest:
+    """Content-hash manifest stored next to the vector store."""
+
+    VERSION = 2
+    FILENAME = "manifest.json"
+
+    def __init__(self, settings: Dict[str, Any], files: Optional[Dict[str, Dict]] = None):
+        self.settings = settings
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IngestManifest"]:
+        path = os.path.join(directory, cls.FILENAME)
+        if not os.path.exists(path):
+            return None
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        files = data.get("files", {})
+        if data.get("version") == 1:
+            # Version 1 keyed files by the path as typed; resolve them against the current cwd.
+            # Entries that no longer resolve show up as missing and their vectors get dropped.
+            files = {file_key(path): entry for path, entry in files.items()}
+        elif data.get("version") != cls.VERSION:
+            return None
+        return cls(data.get("settings", {}), files)
+
+    def save(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.FILENAME)
+        tmp_path = path + ".tmp"
+
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "settings": self.settings, "files": self.files}, f)
+        os.replace(tmp_path, path)
+
+    def compatible(self, settings: Dict[str, Any]) -> bool:
+        """Chunks can only be reused if they were produced with the same settings."""
+        return self.settings == settings
+
+    def check_file(self, path: str) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Return (unchanged, file_info) for a PDF on disk.
+        Size and mtime are compared first; the content hash is only computed when they differ.
+        """
+        stat = os.stat(path)
+        info = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        entry = self.files.get(file_key(path))
+
+        if entry and entry.get("size") == info["size"] and entry.get("mtime_ns") == info["mtime_ns"]:
+            info["sha256"] = entry["sha256"]
+            return True, info
+
+        info["sha256"] = file_sha256(path)
+        if entry and entry.get("sha256") == info["sha256"]:
+            # Touched but not modified - just refresh the stat fields
+            entry.update(info)
+            return True, info
+
+        return False, info
+
+    def page_entry(self, path: str, page: int) -> Optional[Dict[str, Any]]:
+        return self.files.get(file_key(path), {}).get("pages", {}).get(str(page))
+
+    def chunk_ids(self, path: str) -> Set[str]:
+        ids = set()
+        for page in self.files.get(file_key(path), {}).get("pages", {}).values():
+            ids.update(page["chunks"])
+        return ids
+
+    def set_file(self, path: str, info: Dict[str, Any], pages: Dict[str, Dict[str, Any]]):
+        self.files[file_key(path)] = {**info, "pages": pages}
+
+    def remove_file(self, path: str) -> Set[str]:
+        ids = self.chunk_ids(path)
+        self.files.pop(file_key(path), None)
+        return ids
+
+    def missing_files(self) -> List[str]:
+        """Files recorded in the manifest that no longer exist on disk."""
+        return [path for path in self.files if not os.path.exists(path)]
@@ -0,0 +1,130 @@
+"""
+Query Batcher Module - Coalesces concurrent query embeddings and FAISS searches
+into batched calls.
+"""
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from timing import StageTimer, current_timer
+
+
+@dataclass
+class _Request:
+    text: str
+    k: int
+    timer: Optional[StageTimer] = None
+    submitted: float = field(default_factory=time.perf_counter)
+    future: Future = field(default_factory=Future)
+
+
+class QueryBatcher:
+    """
+    Collects queries that arrive within ``max_wait_ms`` of each other (up to
+    ``max_batch_size``), embeds them with one model call and runs a single
+    batched index search. Each caller gets a Future resolving to
+    ``(vector, rows, scores)`` for its own query. Time spent waiting for
+    the batch and the batch's embed and search times are added to each
+    caller's stage timer.
+    """
+
+    def __init__(self, embed_fn: Callable[[List[str]], List[List[float]]],
+                 search_fn: Callable[[np.ndarray, int], Tuple[np.ndarray, np.ndarray]],
+                 max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.logger = logging.getLogger(__name__)
+        self.embed_fn = embed_fn
+        self.search_fn = search_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self.batches = 0
+        self.queries = 0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="query-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str, k: int) -> Future:
+        if self._stopped.is_set():
+            raise RuntimeError("QueryBatcher is closed")
+        request = _Request(text, k, current_timer())
+        self._queue.put(request)
+        return request.future
+
+    def _collect(self) -> List[_Request]:
+        batch = [self._queue.get()]
+        if batch[0] is None:
+            return []
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._stopped.set()
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if batch:
+                self._process(batch)
+
+        # Fail anything still queued after close()
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                request.future.set_exception(RuntimeError("QueryBatcher is closed"))
+
+    def _process(self, batch: List[_Request]):
+        try:
+            # Identical concurrent queries share one embedding row
+            texts = list(dict.fromkeys(request.text for request in batch))
+            positions = {text: i for i, text in enumerate(texts)}
+
+            started = time.perf_counter()
+            vectors = np.asarray(self.embed_fn(texts), dtype=np.float32)
+            embedded = time.perf_counter()
+            k = max(request.k for request in batch)
+            scores, rows = self.search_fn(vectors, k)
+            searched = time.perf_counter()
+
+            self.batches += 1
+            self.queries += len(batch)
+            for request in batch:
+                if request.timer is not None:
+                    request.timer.add("batch_wait", (started - request.submitted) * 1000)
+                    request.timer.add("embed", (embedded - started) * 1000)
+                    request.timer.add("search", (searched - embedded) * 1000)
+                i = positions[request.text]
+                request.future.set_result((vectors[i], rows[i, :request.k], scores[i, :request.k]))
+        except Exception as e:
+            self.logger.error(f"Error processing query batch of {len(batch)}: {str(e)}")
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "queries": self.queries,
+            "avg_batch_size": round(self.queries / self.batches, 2) if self.batches else 0.0,
+        }
+
+    def close(self):
+        self._queue.put(None)
+        self._stopped.set()
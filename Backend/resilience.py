@@ -0,0 +1,207 @@
+"""
+Resilience Module - Retries with jittered exponential backoff and circuit
+breakers for calls to external services (LLM providers).
+
+Only transient failures are retried: timeouts, connection errors, 408, 409,
+429 and 5xx responses. A server's ``Retry-After`` is honoured up to the
+backoff ceiling. A circuit breaker opens after ``failure_threshold``
+consecutive transient failures and rejects calls immediately for
+``reset_timeout`` seconds, then lets one trial call through (half-open).
+"""
+import time
+import random
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+# SDK exception classes (openai, groq, anthropic share these names) and httpx transport errors
+RETRYABLE_ERRORS = frozenset({"APIConnectionError", "APITimeoutError", "TransportError", "TimeoutException"})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    if isinstance(error, (CircuitOpenError, asyncio.CancelledError)):
+        return False
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__) or isinstance(error, TimeoutError)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the response's Retry-After header, if it has a numeric one."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers and headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    """``max_retries`` retries after the first attempt, with full-jitter backoff."""
+
+    max_retries: int = 3
+    base_delay: float = 0.25
+    max_delay: float = 4.0
+
+    def delay(self, retry: int, error: Optional[BaseException] = None) -> float:
+        """Seconds to wait before retry number ``retry`` (0-based)."""
+        hinted = retry_after(error) if error is not None else None
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+
+class CircuitBreaker:
+    """Thread-safe consecutive-failure circuit breaker."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 on_change: Optional[Callable[[str, str], None]] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_change = on_change
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            self.state = state
+            if self.on_change is not None:
+                self.on_change(self.name, state)
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now. Disabled when the threshold is 0."""
+        if self.failure_threshold <= 0:
+            return True
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state("half_open")
+            if self.state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state("closed")
+
+    def release(self):
+        """End a half-open trial that was abandoned (cancelled) without a verdict."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == "half_open" or self.failures >= self.failure_threshold > 0:
+                self._opened_at = time.monotonic()
+                self._set_state("open")
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+def _record_error(breaker: Optional[CircuitBreaker], error: BaseException) -> bool:
+    """Count a transient failure against ``breaker``; returns whether ``error`` is transient."""
+    transient = is_retryable(error)
+    if breaker is not None:
+        if transient:
+            breaker.record_failure()
+        else:
+            # Client errors (bad request, auth) say nothing about the service's health
+            breaker.record_success()
+    return transient
+
+
+def call_with_retries(fn: Callable[[], T], policy: RetryPolicy, breaker: Optional[CircuitBreaker] = None,
+                      on_retry: Optional[Callable[[BaseException], None]] = None) -> T:
+    """Call ``fn``, retrying transient failures; raises the last error or CircuitOpenError."""
+    retry = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {breaker.name} is open")
+        try:
+            result = fn()
+        except BaseException as e:
+            if not isinstance(e, Exception):
+                if breaker is not None:
+                    breaker.release()
+                raise
+            transient = _record_error(breaker, e)
+            if not transient or retry >= policy.max_retries:
+                raise
+            if on_retry is not None:
+                on_retry(e)
+            time.sleep(policy.delay(retry, e))
+            retry += 1
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+async def acall_with_retries(fn: Callable[[], Awaitable[T]], policy: RetryPolicy,
+                             breaker: Optional[CircuitBreaker] = None,
+                             on_retry: Optional[Callable[[BaseException], None]] = None) -> T:
+    """Async variant of call_with_retries; ``fn`` returns a new awaitable per attempt."""
+    retry = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(f"Circuit breaker for {breaker.name} is open")
+        try:
+            result = await fn()
+        except BaseException as e:
+            # Cancellation (a lost hedge, a client disconnect) says nothing about the service
+            if not isinstance(e, Exception):
+                if breaker is not None:
+                    breaker.release()
+                raise
+            transient = _record_error(breaker, e)
+            if not transient or retry >= policy.max_retries:
+                raise
+            if on_retry is not None:
+                on_retry(e)
+            await asyncio.sleep(policy.delay(retry, e))
+            retry += 1
+            continue
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                on_change: Optional[Callable[[str, str], None]] = None) -> CircuitBreaker:
+    """The process-wide breaker for ``name``, shared by every handler calling that service."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout, on_change)
+        return breaker
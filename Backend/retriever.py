@@ -1,14 +1,65 @@
 """
 RAG Retriever Module - Handles context retrieval from vector store
 """
+import time
+import asyncio
+import hashlib
+import contextvars
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Tuple, List, Optional
 from pathlib import Path
 
-from langchain_community.vectorstores import FAISS
+import faiss
+import numpy as np
+from langchain_core.documents import Document
 from langchain_huggingface import HuggingFaceEmbeddings
 
 from config import RetrieverConfig
+from cache import LRUCache, normalize_query
+from chunk_store import CHUNKS_FILENAME, ChunkStore
+from context_assembler import ContextAssembler
+from lexical_index import LexicalIndex, LEXICAL_FILENAME, is_identifier_query, reciprocal_rank_fusion
+from query_batcher import QueryBatcher
+from timing import timed_stage
+from vector_index import VECTORS_FILENAME, IndexParams, open_vectors, rescore, set_search_params
+
+
+# (rows, cosine similarities, identifier matches of BM25-only lookups)
+Hits = Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]
+
+
+@dataclass(frozen=True)
+class LoadedStore:
+    """
+    Every part of one on-disk store generation. A reload swaps in a new
+    instance as one reference, so a search that reads ``self.store`` once
+    never mixes row ids from one generation with chunks from another.
+    """
+    fingerprint: str
+    index: faiss.Index
+    index_params: IndexParams
+    vectors: Optional[np.ndarray]
+    lexical_index: Optional[LexicalIndex]
+    chunk_store: ChunkStore
+
+
+@dataclass
+class QueryCacheEntry:
+    """Query vector plus the raw result of the widest search run for it on ``store``."""
+    vector: np.ndarray
+    rows: np.ndarray
+    scores: np.ndarray
+    k: int
+    store: Optional[LoadedStore]
+
+    def covers(self, store: LoadedStore, k: int) -> bool:
+        return self.store is store and self.k >= k
+
+    def top(self, k: int) -> "QueryCacheEntry":
+        return QueryCacheEntry(self.vector, self.rows[:k], self.scores[:k], k, self.store)
 
 
 class RAGRetriever:
@@ -18,7 +69,32 @@ class RAGRetriever:
         self.config = config
         self.logger = logging.getLogger(__name__)
         self.embeddings = None
-        self.vectorstore = None
+        self.store: Optional[LoadedStore] = None
+        self.query_cache = LRUCache(config.query_cache_size, config.query_cache_ttl)
+        self.context_assembler = ContextAssembler(config.context_token_budget, config.context_chars_per_token)
+        self.batcher = None
+        self._last_store_check = 0.0
+        self._reload_lock = threading.Lock()
+        # Chunk store and BM25 index replaced by the last reload, closed by the next one
+        self._retired = []
+        # Embedding and FAISS search are CPU-bound; async callers run them here
+        # instead of on the event loop or the web server's request threadpool
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.retrieval_workers,
+            thread_name_prefix="retrieval"
+        )
+    
+    @property
+    def index(self) -> Optional[faiss.Index]:
+        return self.store.index if self.store is not None else None
+    
+    @property
+    def index_params(self) -> Optional[IndexParams]:
+        return self.store.index_params if self.store is not None else None
+    
+    @property
+    def fingerprint(self) -> Optional[str]:
+        return self.store.fingerprint if self.store is not None else None
         
     def validate_vector_store(self) -> bool:
         vector_path = Path(self.config.vector_db_path)
@@ -33,14 +109,16 @@ class RAGRetriever:
             return False
         
         index_file = vector_path / "index.faiss"
-        pkl_file = vector_path / "index.pkl"
+        chunks_file = vector_path / CHUNKS_FILENAME
         
         if not index_file.exists():
             self.logger.error(f"FAISS index file not found: {index_file}")
             return False
             
-        if not pkl_file.exists():
-            self.logger.error(f"FAISS pickle file not found: {pkl_file}")
+        if not chunks_file.exists():
+            self.logger.error(f"Chunk store not found: {chunks_file}")
+            if (vector_path / "index.pkl").exists():
+                self.logger.info("Found a legacy pickled store; convert it with: python ingest.py --convert-legacy")
             return False
             
         self.logger.info(f"Vector store validated: {self.config.vector_db_path}")
@@ -56,42 +134,459 @@ class RAGRetriever:
                     encode_kwargs={'normalize_embeddings': True}
                 )
                 self.logger.info("Embedding model loaded successfully")
+                
+                if self.config.batch_max_size > 1:
+                    self.batcher = QueryBatcher(
+                        self.embeddings.embed_documents,
+                        lambda vectors, k: self._search_vector(self.store, vectors, k),
+                        max_batch_size=self.config.batch_max_size,
+                        max_wait_ms=self.config.batch_max_wait_ms
+                    )
             return self.embeddings
         except Exception as e:
             self.logger.error(f"Error loading embeddings: {str(e)}")
             raise
     
-    def load_vectorstore(self) -> Optional[FAISS]:
+    def _read_index(self, index_file: Path):
+        """Memory-map the index where FAISS supports it, otherwise read it into memory."""
         try:
-            if self.vectorstore is None:
+            return faiss.read_index(str(index_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            return faiss.read_index(str(index_file))
+    
+    def load_vectorstore(self):
+        try:
+            if self.store is None:
                 self.logger.info(f"Loading vector store from: {self.config.vector_db_path}")
                 
                 if not self.validate_vector_store():
                     return None
                 
-                embeddings = self.load_embeddings()
+                self.load_embeddings()
+                self._install(self._open_store())
                 
-                self.vectorstore = FAISS.load_local(
-                    self.config.vector_db_path,
-                    embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                self.logger.info("Vector store loaded successfully")
-                
-            return self.vectorstore
+            return self.index
         except Exception as e:
             self.logger.error(f"Error loading vector store: {str(e)}")
             raise
     
-    def calculate_confidence(self, num_docs: int, k: int) -> float:
-        if num_docs == 0:
+    def set_search_params(self, ef_search: Optional[int] = None, nprobe: Optional[int] = None):
+        """
+        Tune the recall/latency trade-off at runtime: ``ef_search`` for HNSW,
+        ``nprobe`` for IVF. Knobs the loaded index does not have are ignored.
+        """
+        if self.load_vectorstore() is None:
+            return
+        if ef_search:
+            self.config.hnsw_ef_search = ef_search
+        if nprobe:
+            self.config.ivf_nprobe = nprobe
+        set_search_params(self.index, ef_search, nprobe)
+        # Cached results were produced with the previous settings
+        self.query_cache.clear()
+        self.logger.info(f"Search parameters updated (efSearch={ef_search}, nprobe={nprobe})")
+    
+    def _store_fingerprint(self) -> str:
+        """Identify the on-disk store by the size and mtime of its files."""
+        digest = hashlib.sha1()
+        vector_path = Path(self.config.vector_db_path)
+        for name in ("index.faiss", CHUNKS_FILENAME):
+            stat = (vector_path / name).stat()
+            digest.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        return digest.hexdigest()
+    
+    def _open_store(self) -> LoadedStore:
+        """Open every part of the store on disk without touching the loaded one."""
+        # Taken first, so a store replaced while it is being opened is picked up by the next check
+        fingerprint = self._store_fingerprint()
+        vector_path = Path(self.config.vector_db_path)
+        index = self._read_index(vector_path / "index.faiss")
+        chunk_store = ChunkStore(str(vector_path / CHUNKS_FILENAME))
+        
+        if index.ntotal != len(chunk_store):
+            chunk_store.close()
+            raise ValueError(
+                f"Index has {index.ntotal} vectors but chunk store has {len(chunk_store)} chunks; re-run ingestion"
+            )
+        
+        # Store defaults from index_params.json, overridden by config knobs
+        index_params = IndexParams.load(str(vector_path)) or IndexParams(dim=index.d)
+        set_search_params(
+            index,
+            ef_search=self.config.hnsw_ef_search or index_params.ef_search,
+            nprobe=self.config.ivf_nprobe or index_params.nprobe,
+        )
+        
+        # Exact vectors (approximate indexes only) for re-scoring shortlists from a
+        # compressed index and scoring hits that only BM25 found
+        vectors = None
+        vectors_file = vector_path / VECTORS_FILENAME
+        if vectors_file.exists():
+            vectors = open_vectors(str(vectors_file), index_params.dim)
+            if len(vectors) != index.ntotal:
+                self.logger.warning(f"{VECTORS_FILENAME} does not match the index; re-scoring disabled")
+                vectors = None
+        
+        # BM25 postings for hybrid ranking and identifier lookups
+        lexical_index = None
+        lexical_file = vector_path / LEXICAL_FILENAME
+        if lexical_file.exists():
+            lexical_index = LexicalIndex(str(lexical_file))
+            if len(lexical_index) != len(chunk_store):
+                self.logger.warning(f"{LEXICAL_FILENAME} does not match the chunk store; lexical search disabled")
+                lexical_index.close()
+                lexical_index = None
+        elif self.config.retrieval_mode == "hybrid" or self.config.lexical_fast_path:
+            self.logger.warning(f"{LEXICAL_FILENAME} not found, using dense retrieval only; re-run ingestion to build it")
+        
+        return LoadedStore(fingerprint, index, index_params, vectors, lexical_index, chunk_store)
+    
+    def _install(self, store: LoadedStore) -> list:
+        """Swap in an opened store; returns the parts of the previous one that need closing."""
+        previous, self.store = self.store, store
+        self._last_store_check = time.monotonic()
+        self.query_cache.clear()
+        self.logger.info(f"Vector store loaded successfully ({store.index.ntotal} chunks, "
+                         f"{store.index_params.factory_string()} index)")
+        if previous is None:
+            return []
+        return [part for part in (previous.chunk_store, previous.lexical_index) if part is not None]
+    
+    def refresh_if_changed(self) -> bool:
+        """
+        Reload the store if ingestion replaced it on disk. Checks are throttled
+        to one stat() pair every ``store_check_interval`` seconds.
+        """
+        now = time.monotonic()
+        if self.store is None or now - self._last_store_check < self.config.store_check_interval:
+            return False
+        self._last_store_check = now
+        
+        try:
+            if self._store_fingerprint() == self.fingerprint:
+                return False
+        except OSError:
+            return False
+        
+        if not self._reload_lock.acquire(blocking=False):
+            return False
+        try:
+            self.logger.info("Vector store changed on disk, reloading")
+            try:
+                store = self._open_store()
+            except Exception as e:
+                # Typically ingestion is still writing the new store; the next check retries
+                self.logger.warning(f"Could not reload the vector store, keeping the loaded one: {str(e)}")
+                return False
+            
+            # Searches that started on the previous store may still be reading it, so it is
+            # closed one reload later instead of now
+            for part in self._retired:
+                part.close()
+            self._retired = self._install(store)
+            return True
+        finally:
+            self._reload_lock.release()
+    
+    async def arefresh_if_changed(self) -> bool:
+        """Async variant of refresh_if_changed: the stat() checks and any reload run on the retrieval executor."""
+        if self.store is None or time.monotonic() - self._last_store_check < self.config.store_check_interval:
+            return False
+        return await self._in_executor(self.refresh_if_changed)
+    
+    def _lookup(self, query: str) -> Tuple[str, Optional[QueryCacheEntry]]:
+        key = normalize_query(query)
+        return key, self.query_cache.get(key)
+    
+    def _search_vector(self, store: LoadedStore, vectors: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        factor = self.config.rescore_factor or store.index_params.rescore_factor
+        if store.vectors is None or factor <= 1:
+            return store.index.search(vectors, k)
+        
+        # Compressed index: take a wider shortlist and rank it by exact distance
+        _, shortlist = store.index.search(vectors, k * factor)
+        return rescore(vectors, shortlist, store.vectors, k)
+    
+    def _compute_rows(self, store: LoadedStore, key: str, query: str, k: int,
+                      entry: Optional[QueryCacheEntry]) -> QueryCacheEntry:
+        """Search for a query the cache could not fully answer, and cache the result."""
+        if entry is not None:
+            # Vector known, only a wider k (or a search of a reloaded store) is needed
+            vector = entry.vector
+            with timed_stage("search"):
+                scores, rows = self._search_vector(store, vector[None, :], k)
+            rows, scores = rows[0], scores[0]
+        elif self.batcher is not None:
+            # The batcher adds its embed/search times to this request's timer
+            vector, rows, scores = self._from_batch(store, self.batcher.submit(query, k).result(), k)
+        else:
+            with timed_stage("embed"):
+                vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            with timed_stage("search"):
+                scores, rows = self._search_vector(store, vector[None, :], k)
+            rows, scores = rows[0], scores[0]
+        
+        entry = QueryCacheEntry(vector, rows, scores, k, store)
+        self.query_cache.put(key, entry)
+        return entry
+    
+    def _from_batch(self, store: LoadedStore, result, k: int):
+        """
+        A batcher result for a search of ``store``. The batcher searches the
+        store current when the batch ran, which is ``store`` unless a reload
+        happened after the caller took it; then only the vector is reused.
+        """
+        vector, rows, scores = result
+        if self.store is not store:
+            with timed_stage("search"):
+                scores, rows = self._search_vector(store, vector[None, :], k)
+            rows, scores = rows[0], scores[0]
+        return vector, rows, scores
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Query vector, reused from the LRU when the query was seen before."""
+        key, entry = self._lookup(query)
+        if entry is None:
+            # Search right away as well - callers retrieve next, which then hits the cache
+            entry = self._compute_rows(self.store, key, query, self.config.top_k, None)
+        return entry.vector
+    
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """
+        Query vectors for many queries with one embedding call. Their searches
+        run in the same pass and are cached, so retrieving them next is free.
+        """
+        store = self.store
+        entries = self._dense_rows_batch(store, queries, self._dense_depth(store, self.config.top_k))
+        return [entry.vector for entry in entries]
+    
+    def _use_fast_path(self, store: LoadedStore, query: str) -> bool:
+        return store.lexical_index is not None and self.config.lexical_fast_path and is_identifier_query(query)
+    
+    def is_lexical_lookup(self, query: str) -> bool:
+        """Whether ``query`` is tried on the BM25 fast path first, which needs no query vector."""
+        store = self.store
+        return store is not None and self._use_fast_path(store, query)
+    
+    def _hybrid(self, store: LoadedStore) -> bool:
+        return store.lexical_index is not None and self.config.retrieval_mode == "hybrid"
+    
+    def _dense_depth(self, store: LoadedStore, k: int) -> int:
+        return max(k, self.config.hybrid_depth) if self._hybrid(store) else k
+    
+    def _lexical_rows(self, store: LoadedStore, query: str, k: int) -> Optional[Hits]:
+        """
+        BM25 top-k for identifier lookups, keeping only chunks that contain at
+        least ``lexical_min_match`` of the identifier, or None to fall back to
+        dense search.
+        """
+        with timed_stage("search"):
+            rows, _ = store.lexical_index.search(query, max(k, self.config.hybrid_depth))
+            matches = store.lexical_index.coverage(query, rows)
+        keep = matches >= self.config.lexical_min_match - 1e-6
+        rows, matches = rows[keep][:k], matches[keep][:k]
+        if not len(rows):
+            self.logger.debug(f"Lexical fast path: no chunk contains '{query[:100]}', using dense search")
+            return None
+        self.logger.debug(f"Lexical fast path: {len(rows)} chunks for '{query[:100]}'")
+        # No query vector, so there is no similarity to report
+        return rows, np.full(len(rows), np.nan, dtype=np.float32), matches
+    
+    def _similarities(self, store: LoadedStore, vector: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        """Cosine similarity of the query to stored chunk vectors (NaN if they cannot be read)."""
+        order = np.argsort(rows)
+        try:
+            if store.vectors is not None:
+                stored = np.asarray(store.vectors[rows[order]], dtype=np.float32)
+            else:
+                stored = store.index.reconstruct_batch(rows[order])
+        except RuntimeError:
+            return np.full(len(rows), np.nan, dtype=np.float32)
+        similarities = np.empty(len(rows), dtype=np.float32)
+        similarities[order] = stored @ vector
+        return similarities
+    
+    def _rank(self, store: LoadedStore, query: str, entry: QueryCacheEntry, k: int) -> Hits:
+        """
+        Final top-k hits from a dense result: the dense order, or in hybrid
+        mode RRF over the dense and BM25 top lists.
+        """
+        found = entry.rows >= 0
+        # Squared L2 between unit vectors: d = 2 - 2 * cos
+        dense_rows, similarities = entry.rows[found], 1 - entry.scores[found] / 2
+        if not self._hybrid(store):
+            return dense_rows[:k], similarities[:k], None
+        
+        with timed_stage("search"):
+            lexical_rows, _ = store.lexical_index.search(query, len(dense_rows))
+            rows, _ = reciprocal_rank_fusion([dense_rows, lexical_rows], k, self.config.rrf_k)
+            
+            known = dict(zip(dense_rows.tolist(), similarities.tolist()))
+            missing = np.array([row for row in rows.tolist() if row not in known], dtype=np.int64)
+            if len(missing):
+                known.update(zip(missing.tolist(), self._similarities(store, entry.vector, missing).tolist()))
+        return rows, np.array([known[row] for row in rows.tolist()], dtype=np.float32), None
+    
+    def search_rows(self, store: LoadedStore, query: str, k: int) -> Hits:
+        """
+        Return the top-k ``(rows, similarities, matches)`` of ``store`` for a
+        query: BM25 only for identifier lookups, otherwise dense search, fused
+        with BM25 in hybrid mode. Similarities are cosine, NaN for BM25-only
+        lookups, which report the share of the identifier each chunk contains
+        as ``matches`` instead (None for dense results).
+        """
+        if self._use_fast_path(store, query):
+            lexical = self._lexical_rows(store, query, k)
+            if lexical is not None:
+                return lexical
+        return self._rank(store, query, self._dense_rows(store, query, self._dense_depth(store, k)), k)
+    
+    def _dense_rows(self, store: LoadedStore, query: str, k: int) -> QueryCacheEntry:
+        """
+        Dense top-k for a query, with squared L2 distances as scores.
+        Repeated queries are served from the LRU without running the embedding model.
+        """
+        key, entry = self._lookup(query)
+        if entry is not None and entry.covers(store, k):
+            return entry.top(k)
+        return self._compute_rows(store, key, query, k, entry)
+    
+    def search_rows_batch(self, store: LoadedStore, queries: List[str], k: int) -> List[Hits]:
+        """Batched ``search_rows``: identifier lookups skip the embedding call entirely."""
+        results = [None] * len(queries)
+        dense = []
+        for i, query in enumerate(queries):
+            if self._use_fast_path(store, query):
+                results[i] = self._lexical_rows(store, query, k)
+            if results[i] is None:
+                dense.append(i)
+        
+        if dense:
+            searched = self._dense_rows_batch(store, [queries[i] for i in dense], self._dense_depth(store, k))
+            for i, entry in zip(dense, searched):
+                results[i] = self._rank(store, queries[i], entry, k)
+        return results
+    
+    def _dense_rows_batch(self, store: LoadedStore, queries: List[str], k: int) -> List[QueryCacheEntry]:
+        """Vectorized search: all cache misses are embedded in one call and searched in one call."""
+        results = [None] * len(queries)
+        pending = {}
+        
+        for i, query in enumerate(queries):
+            key, entry = self._lookup(query)
+            if entry is not None and entry.covers(store, k):
+                results[i] = entry.top(k)
+            else:
+                pending.setdefault(key, (query, entry, []))[2].append(i)
+        
+        if not pending:
+            return results
+        
+        keys = list(pending)
+        to_embed = [key for key in keys if pending[key][1] is None]
+        vectors = {key: pending[key][1].vector for key in keys if pending[key][1] is not None}
+        if to_embed:
+            with timed_stage("embed"):
+                embedded = np.asarray(self.embeddings.embed_documents([pending[key][0] for key in to_embed]), dtype=np.float32)
+            vectors.update(zip(to_embed, embedded))
+        
+        matrix = np.stack([vectors[key] for key in keys])
+        with timed_stage("search"):
+            scores, rows = self._search_vector(store, matrix, k)
+        
+        for j, key in enumerate(keys):
+            entry = QueryCacheEntry(matrix[j], rows[j], scores[j], k, store)
+            self.query_cache.put(key, entry)
+            for i in pending[key][2]:
+                results[i] = entry
+        return results
+    
+    def _in_executor(self, fn, *args) -> asyncio.Future:
+        """Run ``fn`` on the retrieval executor in the caller's context, so stage timings reach its timer."""
+        context = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self.executor, context.run, fn, *args)
+    
+    async def asearch_rows(self, store: LoadedStore, query: str, k: int) -> Hits:
+        if self._use_fast_path(store, query):
+            lexical = await self._in_executor(self._lexical_rows, store, query, k)
+            if lexical is not None:
+                return lexical
+        
+        entry = await self._adense_rows(store, query, self._dense_depth(store, k))
+        if not self._hybrid(store):
+            return self._rank(store, query, entry, k)
+        return await self._in_executor(self._rank, store, query, entry, k)
+    
+    async def _adense_rows(self, store: LoadedStore, query: str, k: int) -> QueryCacheEntry:
+        key, entry = self._lookup(query)
+        if entry is not None and entry.covers(store, k):
+            return entry.top(k)
+        
+        if entry is None and self.batcher is not None:
+            # Await the batch without tying up an executor thread
+            vector, rows, scores = await asyncio.wrap_future(self.batcher.submit(query, k))
+            if self.store is store:
+                entry = QueryCacheEntry(vector, rows, scores, k, store)
+                self.query_cache.put(key, entry)
+                return entry
+            # The batch may have searched a store reloaded since; keep only the vector
+            entry = QueryCacheEntry(vector, rows, scores, k, None)
+        
+        return await self._in_executor(self._compute_rows, store, key, query, k, entry)
+    
+    def search(self, query: str, k: int) -> List[Document]:
+        """Search the index and read only the top-k chunks from the chunk store."""
+        store = self.store
+        rows, _, _ = self.search_rows(store, query, k)
+        return store.chunk_store.documents(rows)
+    
+    def cache_stats(self) -> dict:
+        return {
+            "query_cache": self.query_cache.stats(),
+            "query_batcher": self.batcher.stats() if self.batcher else None
+        }
+    
+    def select_hits(self, rows: np.ndarray, similarities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Drop hits below ``similarity_threshold``, then cut the list at the
+        largest drop in similarity if it is at least ``adaptive_k_gap``.
+        Hybrid hits whose vector could not be read are kept; the order is unchanged.
+        """
+        keep = ~(similarities < self.config.similarity_threshold)
+        rows, similarities = rows[keep], similarities[keep]
+        
+        ordered = np.sort(similarities[~np.isnan(similarities)])[::-1]
+        if self.config.adaptive_k_gap > 0 and len(ordered) > 1:
+            gaps = ordered[:-1] - ordered[1:]
+            cut = int(np.argmax(gaps))
+            if gaps[cut] >= self.config.adaptive_k_gap:
+                keep = ~(similarities < ordered[cut])
+                rows, similarities = rows[keep], similarities[keep]
+        return rows, similarities
+    
+    def calculate_confidence(self, similarities: np.ndarray, matches: Optional[np.ndarray] = None) -> float:
+        """
+        Map the mean similarity of the kept hits above the threshold onto
+        [confidence_base, confidence_max]. BM25-only hits use the mean share
+        of the identifier they contain instead; hits with neither add nothing.
+        """
+        if len(similarities) == 0:
             return 0.0
         
-        confidence = self.config.confidence_base + (num_docs / k) * self.config.confidence_multiplier
+        threshold = self.config.similarity_threshold
+        known = similarities[~np.isnan(similarities)]
+        relevance = 0.0
+        if matches is not None:
+            relevance = float(np.clip(matches.mean(), 0, 1))
+        elif len(known):
+            relevance = float(np.clip((known.mean() - threshold) / max(1 - threshold, 1e-6), 0, 1))
+        
+        confidence = self.config.confidence_base + relevance * self.config.confidence_multiplier
         confidence = min(self.config.confidence_max, confidence)
         
         return round(confidence, 2)
     
+    
     def extract_pages(self, docs) -> List[int]:
         pages = []
         
@@ -110,39 +605,111 @@ class RAGRetriever:
         try:
             self.logger.info(f"Retrieving context for query: '{query[:100]}...'")
             
-            vectorstore = self.load_vectorstore()
-            
-            if vectorstore is None:
+            if self.load_vectorstore() is None:
                 self.logger.error("Failed to load vector store")
                 return "", [], 0.0
             
-            docs = vectorstore.similarity_search(query, k=k)
-            
-            if not docs:
-                self.logger.warning("No documents retrieved for query")
-                return "", [], 0.0
-            
-            self.logger.info(f"Retrieved {len(docs)} documents")
-            
-            context_chunks = []
-            for i, doc in enumerate(docs):
-                chunk_preview = doc.page_content[:100].replace('\n', ' ')
-                self.logger.debug(f"Chunk {i+1}: {chunk_preview}...")
-                context_chunks.append(doc.page_content)
-            
-            ranked_pages = self.extract_pages(docs)
+            store = self.store
+            return self._build_context(store, *self.search_rows(store, query, k))
+        except Exception as e:
+            self.logger.error(f"Error during retrieval: {str(e)}")
+            return "", [], 0.0
+    
+    def _build_context(self, store: LoadedStore, rows: np.ndarray, similarities: np.ndarray,
+                       matches: Optional[np.ndarray] = None) -> Tuple[str, List[int], float]:
+        if not len(rows):
+            self.logger.warning("No documents retrieved for query")
+            return "", [], 0.0
+        
+        if matches is not None:
+            # BM25-only lookup: every hit already contains the identifier
+            kept_rows, kept_similarities = rows, similarities
+        else:
+            kept_rows, kept_similarities = self.select_hits(rows, similarities)
+        if not len(kept_rows):
+            # Hits without a similarity are always kept, so all of these were scored
+            self.logger.info(f"No documents above similarity threshold {self.config.similarity_threshold} "
+                             f"(best {float(similarities.max()):.3f})")
+            return "", [], 0.0
+        
+        docs = store.chunk_store.documents(kept_rows)
+        self.logger.info(f"Retrieved {len(docs)} documents ({len(rows) - len(docs)} cut by threshold or score gap)")
+        
+        for i, doc in enumerate(docs):
+            chunk_preview = doc.page_content[:100].replace('\n', ' ')
+            self.logger.debug(f"Chunk {i+1}: {chunk_preview}...")
+        
+        # Merge overlapping chunks and fit the model's context budget
+        with timed_stage("assemble"):
+            context_text, used_docs = self.context_assembler.assemble(docs)
+        raw_length = sum(len(doc.page_content) for doc in docs)
+        self.logger.info(f"Assembled context: {len(context_text)} of {raw_length} chars from {len(used_docs)} chunks")
+        
+        ranked_pages = self.extract_pages(used_docs)
+        
+        if ranked_pages:
+            self.logger.info(f"Relevant pages: {ranked_pages}")
+        else:
+            self.logger.warning("No page metadata found in retrieved documents")
+        
+        confidence = self.calculate_confidence(kept_similarities, matches)
+        self.logger.info(f"Confidence score: {confidence}")
+        
+        return context_text, ranked_pages, confidence
+    
+    def retrieve_context_batch(self, queries: List[str], k: Optional[int] = None) -> List[Tuple[str, List[int], float]]:
+        """Retrieve context for many queries with one embedding call and one index search."""
+        if k is None:
+            k = self.config.top_k
+        
+        try:
+            self.logger.info(f"Retrieving context for a batch of {len(queries)} queries")
             
-            if ranked_pages:
-                self.logger.info(f"Relevant pages: {ranked_pages}")
-            else:
-                self.logger.warning("No page metadata found in retrieved documents")
+            if self.load_vectorstore() is None:
+                self.logger.error("Failed to load vector store")
+                return [("", [], 0.0)] * len(queries)
             
-            confidence = self.calculate_confidence(len(docs), k)
-            self.logger.info(f"Confidence score: {confidence}")
+            store = self.store
+            return [self._build_context(store, *hits) for hits in self.search_rows_batch(store, queries, k)]
+        except Exception as e:
+            self.logger.error(f"Error during batch retrieval: {str(e)}")
+            return [("", [], 0.0)] * len(queries)
+    
+    async def aretrieve_context_batch(self, queries: List[str], k: Optional[int] = None) -> List[Tuple[str, List[int], float]]:
+        return await self._in_executor(self.retrieve_context_batch, queries, k)
+    
+    async def aembed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        return await self._in_executor(self.embed_queries, queries)
+    
+    async def aembed_query(self, query: str) -> np.ndarray:
+        key, entry = self._lookup(query)
+        if entry is None:
+            entry = await self._adense_rows(self.store, query, self.config.top_k)
+        return entry.vector
+    
+    async def aretrieve_context(self, query: str, k: Optional[int] = None) -> Tuple[str, List[int], float]:
+        """
+        Async variant of retrieve_context. Embedding and search go through the
+        micro-batcher (or the dedicated retrieval executor), never the event loop.
+        """
+        if k is None:
+            k = self.config.top_k
+        
+        try:
+            self.logger.info(f"Retrieving context for query: '{query[:100]}...'")
             
-            context_text = "\n\n".join(context_chunks)
+            if self.store is None:
+                if await self._in_executor(self.load_vectorstore) is None:
+                    self.logger.error("Failed to load vector store")
+                    return "", [], 0.0
             
-            return context_text, ranked_pages, confidence
+            store = self.store
+            return self._build_context(store, *await self.asearch_rows(store, query, k))
         except Exception as e:
             self.logger.error(f"Error during retrieval: {str(e)}")
-            return "", [], 0.0
\ No newline at end of file
+            return "", [], 0.0
+    
+    def close(self):
+        if self.batcher is not None:
+            self.batcher.close()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,108 @@
+import os
+import sys
+import hashlib
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DIM = 64
+
+
+class FakeEmbeddings:
+    """Bag-of-words hashing embeddings that count their calls."""
+
+    def __init__(self):
+        self.query_calls = 0
+        self.document_calls = 0
+
+    @staticmethod
+    def vector(text):
+        v = np.zeros(DIM, dtype=np.float32)
+        for word in text.lower().split():
+            v[int(hashlib.md5(word.encode()).hexdigest(), 16) % DIM] += 1.0
+        norm = np.linalg.norm(v)
+        return (v / norm if norm else v).tolist()
+
+    def embed_query(self, text):
+        self.query_calls += 1
+        return self.vector(text)
+
+    def embed_documents(self, texts):
+        self.document_calls += 1
+        return [self.vector(text) for text in texts]
+
+
+@pytest.fixture
+def write_store():
+    """Write a flat FAISS store with chunks.bin and lexical.bin for ``texts``."""
+    import faiss
+    from chunk_store import CHUNKS_FILENAME, write_chunk_store
+    from lexical_index import LEXICAL_FILENAME, write_lexical_index
+
+    def write(directory, texts):
+        os.makedirs(directory, exist_ok=True)
+        index = faiss.IndexFlatL2(DIM)
+        index.add(np.asarray([FakeEmbeddings.vector(text) for text in texts], dtype=np.float32))
+        faiss.write_index(index, os.path.join(directory, "index.faiss"))
+        write_chunk_store(os.path.join(directory, CHUNKS_FILENAME),
+                          ((f"{i:040x}", text, i, 0, "doc.pdf") for i, text in enumerate(texts)))
+        write_lexical_index(os.path.join(directory, LEXICAL_FILENAME), texts)
+        return str(directory)
+
+    return write
+
+
+@pytest.fixture
+def make_retriever(write_store, tmp_path, monkeypatch):
+    """A RAGRetriever over a store of ``texts`` with fake embeddings."""
+    import retriever as retriever_module
+    from config import RetrieverConfig
+
+    monkeypatch.setattr(retriever_module, "HuggingFaceEmbeddings", lambda **kwargs: FakeEmbeddings())
+    retrievers = []
+
+    def make(texts, **overrides):
+        settings = {"batch_max_size": 1, "store_check_interval": 0, **overrides}
+        config = RetrieverConfig(vector_db_path=write_store(tmp_path / "store", texts), **settings)
+        retriever = retriever_module.RAGRetriever(config)
+        assert retriever.load_vectorstore() is not None
+        retrievers.append(retriever)
+        return retriever
+
+    yield make
+    for retriever in retrievers:
+        retriever.close()
+
+
+@pytest.fixture
+def make_assistant(write_store, tmp_path, monkeypatch):
+    """An AgenticRAGAssistant over a store of ``texts`` whose LLM echoes the context it gets."""
+    import retriever as retriever_module
+    from agent import AgenticRAGAssistant
+    from config import AgentConfig
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(retriever_module, "HuggingFaceEmbeddings", lambda **kwargs: FakeEmbeddings())
+    assistants = []
+
+    def make(texts, **overrides):
+        settings = {"llm_provider": "local", "batch_max_size": 1, "completion_cache_enabled": False,
+                    "action_log_path": "", **overrides}
+        config = AgentConfig(vector_db_path=write_store(tmp_path / "store", texts), **settings)
+        assistant = AgenticRAGAssistant(config)
+        assert assistant.initialize()
+
+        async def answer(query, context, pages, *args):
+            return f"answer from: {context}"
+
+        assistant.llm_handler.generate_response = lambda query, context, pages: f"answer from: {context}"
+        assistant.llm_handler.agenerate_response = answer
+        assistant.llm_handler.agenerate_with_actions = answer
+        assistants.append(assistant)
+        return assistant
+
+    yield make
+    for assistant in assistants:
+        assistant.retriever.close()
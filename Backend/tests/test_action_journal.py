@@ -0,0 +1,103 @@
+import os
+import threading
+
+from action_journal import ActionJournal
+
+
+def journal(tmp_path, **kwargs):
+    return ActionJournal(str(tmp_path / "actions.jsonl"), **kwargs)
+
+
+def fill(j, n, start=0):
+    for i in range(start, start + n):
+        j.append({"n": i})
+
+
+def numbers(entries):
+    return [entry["n"] for entry in entries]
+
+
+def test_page_spans_disk_and_ring_buffer(tmp_path):
+    j = journal(tmp_path, ring_size=10)
+    fill(j, 50)
+    assert len(j) == 50
+    assert numbers(j.page(0, 5)) == [0, 1, 2, 3, 4]
+    assert numbers(j.page(35, 10)) == list(range(35, 45))
+    assert numbers(j.page(45)) == list(range(45, 50))
+    assert j.page(50) == []
+    assert numbers(j) == list(range(50))
+    j.close()
+
+
+def test_reopen_keeps_entries(tmp_path):
+    j = journal(tmp_path, ring_size=5)
+    fill(j, 20)
+    j.close()
+    j = journal(tmp_path, ring_size=5)
+    fill(j, 5, start=20)
+    assert numbers(j.page(0)) == list(range(25))
+    j.close()
+
+
+def test_reopen_drops_a_partial_line(tmp_path):
+    j = journal(tmp_path)
+    fill(j, 3)
+    j.close()
+    with open(j.path, "ab") as f:
+        f.write(b'{"n": 3')
+    j = journal(tmp_path)
+    assert len(j) == 3
+    fill(j, 1, start=3)
+    assert numbers(j.page(0)) == [0, 1, 2, 3]
+    j.close()
+
+
+def test_reopen_rebuilds_a_lagging_index(tmp_path):
+    j = journal(tmp_path)
+    fill(j, 10)
+    j.close()
+    with open(j.index_path, "r+b") as f:
+        f.truncate(3 * 8 + 5)
+    j = journal(tmp_path, ring_size=1)
+    assert len(j) == 10
+    assert numbers(j.page(4, 3)) == [4, 5, 6]
+    j.close()
+    assert os.path.getsize(j.index_path) == 10 * 8
+
+
+def test_clear(tmp_path):
+    j = journal(tmp_path)
+    fill(j, 10)
+    j.clear()
+    assert len(j) == 0 and j.page(0) == []
+    fill(j, 2)
+    assert numbers(j.page(0)) == [0, 1]
+    j.close()
+
+
+def test_failed_write_does_not_hang_waiters(tmp_path):
+    j = journal(tmp_path, ring_size=2)
+    fill(j, 3)
+    assert j.flush(timeout=5)
+
+    failing = threading.Event()
+    real_write = j._file.write
+
+    def write(data):
+        if failing.is_set():
+            raise OSError("disk full")
+        return real_write(data)
+
+    j._file.write = write
+    failing.set()
+    fill(j, 4, start=3)
+    assert j.flush(timeout=5)
+    assert len(j) == 3
+    assert numbers(j.page(0)) == [0, 1, 2]
+
+    # The writer reopened the journal file, so later entries are written again
+    fill(j, 2, start=7)
+    assert j.flush(timeout=5)
+    assert numbers(j.page(0)) == [0, 1, 2, 7, 8]
+    j.close()
+    assert numbers(journal(tmp_path).page(0)) == [0, 1, 2, 7, 8]
@@ -0,0 +1,32 @@
+from actions import ActionExecutor
+
+
+def run(executor, *action_types):
+    for action_type in action_types:
+        executor.execute_action(action_type, {})
+
+
+def test_counts_by_type_without_a_journal():
+    executor = ActionExecutor(history_size=3)
+    run(executor, "file_ticket", "apply_leave", "file_ticket")
+    assert executor.action_counts() == {"file_ticket": 2, "apply_leave": 1}
+    # Counts follow the history as old actions fall out of it
+    run(executor, "escalate_issue", "escalate_issue")
+    assert executor.action_counts() == {"file_ticket": 1, "escalate_issue": 2}
+    executor.clear_history()
+    assert executor.action_counts() == {}
+
+
+def test_counts_are_restored_from_the_journal(tmp_path):
+    path = str(tmp_path / "actions.jsonl")
+    executor = ActionExecutor(log_path=path)
+    run(executor, "file_ticket", "schedule_meeting", "file_ticket")
+    assert executor.action_counts() == {"file_ticket": 2, "schedule_meeting": 1}
+    executor.journal.close()
+
+    executor = ActionExecutor(log_path=path)
+    assert executor.action_count() == 3
+    assert executor.action_counts() == {"file_ticket": 2, "schedule_meeting": 1}
+    executor.clear_history()
+    assert executor.action_counts() == {}
+    executor.journal.close()
@@ -0,0 +1,108 @@
+import asyncio
+
+CORPUS = [
+    "FY25 EBIT margin was 18.3 percent for the group",
+    "policy POL-104 covers remote work for all employees",
+    "the leave policy allows twenty days of paid leave",
+    "travel expenses must be approved by a manager",
+]
+
+
+def test_identifier_query_skips_the_embedding_model(make_assistant):
+    assistant = make_assistant(CORPUS)
+    embeddings = assistant.retriever.embeddings
+
+    result = assistant.process_query("POL-104")
+    assert "remote work" in result["answer"]
+    result = asyncio.run(assistant.aprocess_query("FY25 EBIT"))
+    assert "18.3 percent" in result["answer"]
+    assert embeddings.query_calls == 0 and embeddings.document_calls == 0
+
+
+def test_semantic_queries_still_use_the_answer_cache(make_assistant):
+    assistant = make_assistant(CORPUS)
+    first = assistant.process_query("how many days of paid leave do employees get")
+    second = assistant.process_query("how many days of paid leave do employees get")
+    assert not first.get("cached") and second["cached"]
+
+
+def run_batch(assistant, queries):
+    async def collect():
+        return [result async for result in assistant.aprocess_batch(queries)]
+
+    return sorted(asyncio.run(collect()), key=lambda result: result["index"])
+
+
+def spy_batch_retrieval(assistant):
+    retrieved = []
+    retrieve_context_batch = assistant.retriever.retrieve_context_batch
+
+    def spy(queries, k=None):
+        retrieved.extend(queries)
+        return retrieve_context_batch(queries, k)
+
+    assistant.retriever.retrieve_context_batch = spy
+    return retrieved
+
+
+def test_batch_answers_cache_hits_without_retrieval(make_assistant):
+    assistant = make_assistant(CORPUS)
+    query = "how many days of paid leave do employees get"
+    first, = run_batch(assistant, [query])
+    assert not first.get("cached")
+
+    retrieved = spy_batch_retrieval(assistant)
+    second, other = run_batch(assistant, [query, "who approves travel expenses"])
+    assert second["cached"] and second["answer"] == first["answer"]
+    assert retrieved == ["who approves travel expenses"]
+    # One embedding call per window, reused by its retrieval
+    assert assistant.retriever.embeddings.document_calls == 2
+    assert "travel expenses" in other["answer"]
+
+
+def test_batch_defers_retrieval_until_the_action_succeeds(make_assistant):
+    assistant = make_assistant(CORPUS)
+    retrieved = spy_batch_retrieval(assistant)
+    deferred = []
+    aretrieve_context = assistant.retriever.aretrieve_context
+
+    async def spy(query, k=None):
+        deferred.append(query)
+        return await aretrieve_context(query, k)
+
+    assistant.retriever.aretrieve_context = spy
+    query = "request software license for Photoshop"
+    result, = run_batch(assistant, [query])
+    assert result["retrieval"]["policy"] == "defer"
+    assert retrieved == [] and deferred == [query]
+
+    assistant.action_executor.execute_action = lambda action_type, parameters: {"status": "error"}
+    deferred.clear()
+    result, = run_batch(assistant, [query])
+    assert deferred == [] and result["retrieval"]["context_length"] == 0
+
+
+def stream_events(assistant, query):
+    async def collect():
+        return [event async for event in assistant.astream_query(query)]
+
+    return asyncio.run(collect())
+
+
+def test_stream_reports_a_provider_failure_mid_answer(make_assistant):
+    assistant = make_assistant(CORPUS)
+
+    async def tokens():
+        yield "employees get "
+        raise ConnectionError("connection reset")
+
+    async def open_stream(prompt):
+        return 0, "Paid leave: ", tokens()
+
+    assistant.llm_handler._aopen_stream = open_stream
+    events = stream_events(assistant, "how many days of paid leave do employees get")
+    assert [event["event"] for event in events] == ["metadata", "token", "token", "error"]
+    assert events[-1]["data"]["truncated"] is True
+    assert "connection reset" in events[-1]["data"]["error"]
+    # The cut-off answer is not cached
+    assert len(assistant.answer_cache) == 0
@@ -0,0 +1,66 @@
+import hashlib
+import struct
+
+import pytest
+
+from chunk_store import CHUNKS_FILENAME, ChunkStore, open_chunk_store, write_chunk_store
+
+RECORDS = [
+    ("a" * 40, "Leave policy: 24 days per year.", 0, 0, "handbook.pdf"),
+    ("b" * 40, "Überstunden werden vergütet — 残業手当 ✓", 3, 120, "richtlinien/ärzte.pdf"),
+    ("legacy-uuid-1234", "", 7, -1, "handbook.pdf"),
+    ("c" * 40, "emoji 🎉 and\nnewlines\r\n", 2**31 - 1, 5, "日本/規程.pdf"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    write_chunk_store(str(tmp_path / CHUNKS_FILENAME), RECORDS)
+    store = open_chunk_store(str(tmp_path))
+    yield store
+    store.close()
+
+
+def test_round_trip(store):
+    assert len(store) == len(RECORDS)
+    for row, (cid, text, page, start, source) in enumerate(RECORDS):
+        assert store.text(row) == text
+        assert store.page(row) == page
+        assert store.start(row) == start
+        assert store.source(row) == source
+        if len(cid) == 40:
+            assert store.chunk_id(row) == cid
+
+
+def test_sources_are_stored_once(store):
+    assert store.sources == ["handbook.pdf", "richtlinien/ärzte.pdf", "日本/規程.pdf"]
+
+
+def test_legacy_ids_map_to_their_digest(store):
+    assert store.chunk_id(2) == hashlib.sha1(b"legacy-uuid-1234").hexdigest()
+
+
+def test_documents(store):
+    docs = store.documents([1, 2])
+    assert docs[0].page_content == RECORDS[1][1]
+    assert docs[0].metadata == {"page": 3, "start": 120, "source": "richtlinien/ärzte.pdf", "chunk_id": "b" * 40}
+    # Unknown start offsets are left out of the metadata
+    assert "start" not in docs[1].metadata
+
+
+def test_missing_store(tmp_path):
+    assert open_chunk_store(str(tmp_path)) is None
+
+
+def test_rejects_foreign_and_newer_files(tmp_path):
+    path = tmp_path / CHUNKS_FILENAME
+    path.write_bytes(b"NOPE" + b"\0" * 64)
+    with pytest.raises(ValueError, match="Not a chunk store"):
+        ChunkStore(str(path))
+
+    write_chunk_store(str(path), RECORDS)
+    data = bytearray(path.read_bytes())
+    struct.pack_into("<H", data, 4, 99)
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="Unsupported chunk store version"):
+        ChunkStore(str(path))
@@ -0,0 +1,62 @@
+import time
+
+from completion_cache import CompletionCache
+
+
+def key(prompt, provider="local", model="m", temperature=0.0, max_tokens=100):
+    return CompletionCache.key(provider, model, temperature, max_tokens, prompt)
+
+
+def test_key_covers_every_generation_setting():
+    base = key("prompt")
+    assert key("prompt") == base
+    assert key("prompt ") != base
+    assert key("prompt", provider="openai") != base
+    assert key("prompt", model="other") != base
+    assert key("prompt", temperature=0.5) != base
+    assert key("prompt", max_tokens=200) != base
+
+
+def test_get_and_put(tmp_path):
+    cache = CompletionCache(str(tmp_path / "c.sqlite3"))
+    assert cache.get(key("a")) is None
+    cache.put(key("a"), "answer")
+    assert cache.get(key("a")) == "answer"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_get_prefers_the_first_key_found(tmp_path):
+    cache = CompletionCache(str(tmp_path / "c.sqlite3"))
+    primary, fallback = key("a"), key("a", provider="openai")
+    cache.put(fallback, "from fallback")
+    assert cache.get(primary, fallback) == "from fallback"
+    cache.put(primary, "from primary")
+    assert cache.get(primary, fallback) == "from primary"
+
+
+def test_entries_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    CompletionCache(path).put(key("a"), "answer")
+    assert CompletionCache(path).get(key("a")) == "answer"
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = CompletionCache(str(tmp_path / "c.sqlite3"), ttl=0.05)
+    cache.put(key("a"), "answer")
+    time.sleep(0.1)
+    assert cache.get(key("a")) is None
+
+
+def test_trim_evicts_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(CompletionCache, "EVICT_EVERY", 1)
+    monkeypatch.setattr(CompletionCache, "TOUCH_INTERVAL", 0.0)
+    cache = CompletionCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+    cache.put(key("a"), "a")
+    cache.put(key("b"), "b")
+    time.sleep(0.01)
+    assert cache.get(key("a")) == "a"
+    cache.put(key("c"), "c")
+    assert len(cache) == 2
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a")) == "a"
+    assert cache.get(key("c")) == "c"
@@ -0,0 +1,41 @@
+from config import DEFAULT_CONTEXT_WINDOW, PROMPT_OVERHEAD_TOKENS, AgentConfig, model_context_window
+
+
+def test_model_context_window_matches_the_longest_prefix():
+    assert model_context_window("gpt-4o-2024-08-06") == 128000
+    assert model_context_window("gpt-4-0613") == 8192
+    assert model_context_window("GPT-4-turbo-preview") == 128000
+    assert model_context_window("some-local-model") == DEFAULT_CONTEXT_WINDOW
+
+
+def test_context_budget_fits_the_smallest_backend(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("CONTEXT_TOKEN_BUDGET", raising=False)
+    config = AgentConfig(model_name="mixtral-8x7b-32768", max_tokens=1000)
+    assert config.context_token_budget == 32768 - 1000 - PROMPT_OVERHEAD_TOKENS
+
+    config = AgentConfig(model_name="mixtral-8x7b-32768", max_tokens=1000, llm_fallbacks=[("openai", "gpt-4")])
+    assert config.context_token_budget == 8192 - 1000 - PROMPT_OVERHEAD_TOKENS
+
+
+def test_context_budget_override(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "1500")
+    assert AgentConfig(model_name="gpt-4o").context_token_budget == 1500
+
+
+def test_fallback_copy_does_not_reinitialize(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    config = AgentConfig(llm_provider="groq", model_name="mixtral-8x7b-32768",
+                         llm_fallbacks=[("openai", "gpt-4")], completion_cache_enabled=True)
+
+    calls = []
+    for name in ("__post_init__", "_setup_logging", "_validate_config", "_create_directories"):
+        monkeypatch.setattr(AgentConfig, name, lambda self, name=name: calls.append(name))
+    fallback = config.for_fallback("openai", "gpt-4")
+
+    assert calls == []
+    assert (fallback.llm_provider, fallback.model_name) == ("openai", "gpt-4")
+    assert fallback.llm_fallbacks == [] and not fallback.completion_cache_enabled
+    assert fallback.context_token_budget == config.context_token_budget
+    assert config.llm_provider == "groq" and config.llm_fallbacks == [("openai", "gpt-4")]
@@ -0,0 +1,71 @@
+from langchain_core.documents import Document
+
+from context_assembler import ContextAssembler, estimate_tokens
+
+
+def page_text(page=0, source="doc.pdf"):
+    return " ".join(f"{source[0]}{page}w{i:03d}" for i in range(200))
+
+
+PAGE = page_text()
+
+
+def chunk(start, end, page=0, source="doc.pdf", offsets=True, text=None):
+    metadata = {"source": source, "page": page}
+    if offsets:
+        metadata["start"] = start
+    return Document(page_content=(text or page_text(page, source))[start:end], metadata=metadata)
+
+
+def test_overlapping_and_adjacent_chunks_are_merged():
+    docs = [chunk(100, 300), chunk(0, 120), chunk(300, 400)]
+    context, used = ContextAssembler(token_budget=0).assemble(docs)
+    assert context == PAGE[0:400]
+    assert used == docs
+
+
+def test_overlap_is_found_from_text_without_offsets():
+    docs = [chunk(100, 300, offsets=False), chunk(0, 150, offsets=False)]
+    context, used = ContextAssembler(token_budget=0).assemble(docs)
+    assert context == PAGE[0:300]
+    assert used == docs
+
+
+def test_separate_pages_and_duplicates():
+    docs = [chunk(0, 80, page=1), chunk(0, 80, page=0), chunk(0, 80, page=1, source="other.pdf", text=PAGE)]
+    context, used = ContextAssembler(token_budget=0, separator="|").assemble(docs)
+    # Pages are emitted in document order and identical text is only sent once
+    assert context == docs[1].page_content + "|" + docs[0].page_content
+    assert used == docs[:2]
+
+
+def test_spans_exactly_filling_the_budget_are_kept_whole():
+    docs = [chunk(0, 200, source="a.pdf"), chunk(0, 120, source="b.pdf")]
+    full = docs[0].page_content + "\n\n" + docs[1].page_content
+    budget = sum(estimate_tokens(doc.page_content) for doc in docs) + estimate_tokens("\n\n")
+
+    context, used = ContextAssembler(token_budget=budget).assemble(docs)
+    assert context == full
+    assert used == docs
+
+    # One token short: the lower-ranked span is cut at a word boundary
+    context, used = ContextAssembler(token_budget=budget - 1).assemble(docs)
+    assert context.startswith(docs[0].page_content + "\n\n")
+    assert full.startswith(context) and full[len(context)] == " "
+    assert estimate_tokens(context) <= budget - 1
+    assert used == docs
+
+
+def test_tails_too_short_to_be_useful_are_dropped():
+    docs = [chunk(0, 200, source="a.pdf"), chunk(0, 200, source="b.pdf")]
+    budget = estimate_tokens(docs[0].page_content) + 5
+    context, used = ContextAssembler(token_budget=budget).assemble(docs)
+    assert context == docs[0].page_content
+    assert used == docs[:1]
+
+
+def test_best_ranked_span_wins_the_budget():
+    docs = [chunk(0, 200, source="b.pdf"), chunk(0, 200, source="a.pdf")]
+    context, used = ContextAssembler(token_budget=estimate_tokens(docs[0].page_content)).assemble(docs)
+    assert context == docs[0].page_content
+    assert used == docs[:1]
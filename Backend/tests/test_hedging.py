@@ -0,0 +1,117 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from hedging import ahedge, ahedge_stream, hedge
+
+
+def failed(result):
+    return result is None or result == "error"
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        yield pool
+
+
+def sleeper(seconds, result):
+    def call():
+        time.sleep(seconds)
+        return result
+    return call
+
+
+def test_fast_primary_is_not_hedged(executor):
+    launched = []
+    index, result = hedge([sleeper(0, "a"), sleeper(0, "b")], 0.5, failed, executor,
+                          on_launch=lambda i, reason: launched.append(i))
+    assert (index, result) == (0, "a")
+    assert launched == []
+
+
+def test_slow_primary_is_hedged_and_backup_wins(executor):
+    launched = []
+    started = time.perf_counter()
+    index, result = hedge([sleeper(1.0, "a"), sleeper(0, "b")], 0.05, failed, executor,
+                          on_launch=lambda i, reason: launched.append((i, reason)))
+    assert (index, result) == (1, "b")
+    assert launched == [(1, "slow")]
+    assert time.perf_counter() - started < 0.5
+
+
+def test_failed_primary_fails_over_immediately(executor):
+    launched = []
+    index, result = hedge([sleeper(0, "error"), sleeper(0, "b")], 10, failed, executor,
+                          on_launch=lambda i, reason: launched.append(reason))
+    assert (index, result) == (1, "b")
+    assert launched == ["error"]
+
+
+def test_all_failed_returns_primary_result(executor):
+    assert hedge([sleeper(0, "error"), sleeper(0, None)], None, failed, executor) == (0, "error")
+
+
+def test_only_successful_calls_report_latency(executor):
+    latencies = []
+    hedge([sleeper(0, "error"), sleeper(0, "b")], None, failed, executor,
+          on_latency=lambda i, seconds: latencies.append(i))
+    executor.shutdown(wait=True)
+    assert latencies == [1]
+
+
+def test_async_hedge_cancels_the_loser():
+    cancelled = []
+
+    def call(seconds, result):
+        async def run():
+            try:
+                await asyncio.sleep(seconds)
+            except asyncio.CancelledError:
+                cancelled.append(result)
+                raise
+            return result
+        return run
+
+    latencies = []
+    index, result = asyncio.run(ahedge([call(1.0, "a"), call(0, "b")], 0.05, failed,
+                                       on_latency=lambda i, seconds: latencies.append(i)))
+    assert (index, result) == (1, "b")
+    assert cancelled == ["a"]
+    assert latencies == [1]
+
+
+def test_async_hedge_does_not_report_failed_latency():
+    async def error():
+        return "error"
+
+    async def ok():
+        return "b"
+
+    latencies = []
+    assert asyncio.run(ahedge([error, ok], 10, failed,
+                              on_latency=lambda i, seconds: latencies.append(i))) == (1, "b")
+    assert latencies == [1]
+
+
+def test_stream_hedge_returns_winner_and_closes_loser():
+    closed = []
+
+    def stream(delay, chunks):
+        async def gen():
+            try:
+                await asyncio.sleep(delay)
+                for chunk in chunks:
+                    yield chunk
+            finally:
+                closed.append(chunks[0])
+        return gen
+
+    async def main():
+        index, first, rest = await ahedge_stream([stream(1.0, ["a1", "a2"]), stream(0, ["b1", "b2"])], 0.05, failed)
+        return index, first, [chunk async for chunk in rest]
+
+    assert asyncio.run(main()) == (1, "b1", ["b2"])
+    assert closed == ["a1", "b1"]
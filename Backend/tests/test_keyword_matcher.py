@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+from config import ACTION_KEYWORDS
+from keyword_matcher import KeywordAutomaton
+
+# Overlapping keywords, keywords inside other keywords and repeated occurrences
+TRICKY_KEYWORDS = {
+    "leave": ["leave", "apply leave", "apply for leave", "sick leave", "leave balance"],
+    "ticket": ["ticket", "raise ticket", "it ticket", "raise a ticket", "a"],
+    "empty": [],
+    "meeting": ["meet", "meeting", "meeting room", "book meeting room", "room"],
+}
+
+QUERIES = [
+    "",
+    "leave",
+    "apply leave",
+    "apply for leave tomorrow",
+    "i want to apply for sick leave",
+    "what is my leave balance",
+    "leave leave leave",
+    "raise a ticket for my laptop",
+    "it ticket",
+    "book meeting room for 3pm",
+    "meeting",
+    "room",
+    "who do i meet about a meeting room ticket?",
+    "nothing relevant here",
+    "schedule a meeting with hr",
+    "reset my password",
+    "create a ticket and apply leave",
+]
+
+
+def substring_scan(action_keywords, query_lower):
+    """The per-keyword scan IntentDetector used before the automaton."""
+    results = {}
+    for action_type, keywords in action_keywords.items():
+        score, matched = 0, []
+        for keyword in keywords:
+            keyword_lower = keyword.lower()
+            if query_lower == keyword_lower:
+                score += 20
+                matched.append(keyword)
+            elif query_lower.startswith(keyword_lower):
+                score += 10
+                matched.append(keyword)
+            elif keyword_lower in query_lower:
+                score += 2 * len(keyword.split())
+                matched.append(keyword)
+        if score > 0:
+            results[action_type] = (score, matched)
+    return results
+
+
+@pytest.mark.parametrize("keywords", [ACTION_KEYWORDS, TRICKY_KEYWORDS], ids=["configured", "tricky"])
+def test_scores_match_the_substring_scan(keywords):
+    automaton = KeywordAutomaton(keywords)
+    queries = QUERIES + [keyword.lower() for words in keywords.values() for keyword in words]
+    for query in queries:
+        assert automaton.score(query) == substring_scan(keywords, query), query
+
+
+def test_scores_match_on_random_queries():
+    keywords = {**ACTION_KEYWORDS, **TRICKY_KEYWORDS}
+    words = sorted({word.lower() for words in keywords.values() for keyword in words for word in keyword.split()})
+    automaton = KeywordAutomaton(keywords)
+    rng = random.Random(7)
+    for _ in range(500):
+        query = " ".join(rng.choice(words) for _ in range(rng.randint(1, 6)))
+        assert automaton.score(query) == substring_scan(keywords, query), query
+
+
+def test_keywords_added_later_are_matched():
+    keywords = {action: list(words) for action, words in TRICKY_KEYWORDS.items()}
+    automaton = KeywordAutomaton(keywords)
+    automaton.score("apply leave")
+
+    for action, keyword in [("leave", "Annual Leave"), ("empty", "nothing"), ("payroll", "payslip")]:
+        automaton.add(action, keyword)
+        keywords.setdefault(action, []).append(keyword)
+
+    for query in QUERIES + ["download my payslip", "annual leave request", "nothing"]:
+        assert automaton.score(query) == substring_scan(keywords, query), query
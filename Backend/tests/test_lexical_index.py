@@ -0,0 +1,87 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from lexical_index import (
+    LEXICAL_FILENAME, is_identifier_query, open_lexical_index, reciprocal_rank_fusion, tokenize, write_lexical_index,
+)
+
+CORPUS = [
+    "Annual leave is 24 days. Leave requests go through the HR portal.",
+    "Policy HR-2024-017 covers remote work and home office equipment.",
+    "FY25 EBIT grew 12% while FY24 EBIT was flat.",
+    "Sick leave needs a medical certificate after 3 days.",
+    "The cafeteria opens at 8:30 and closes at 15:00.",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    write_lexical_index(str(tmp_path / LEXICAL_FILENAME), CORPUS)
+    index = open_lexical_index(str(tmp_path))
+    yield index
+    index.close()
+
+
+def bm25(query, k1=1.2, b=0.75):
+    """Straightforward BM25 over CORPUS, as the reference for the mapped index."""
+    docs = [Counter(tokenize(text)) for text in CORPUS]
+    avg_length = sum(sum(doc.values()) for doc in docs) / len(docs)
+    scores = [0.0] * len(docs)
+    for term in set(tokenize(query)):
+        df = sum(term in doc for doc in docs)
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for row, doc in enumerate(docs):
+            tf = doc[term]
+            norm = k1 * (1 - b + b * sum(doc.values()) / avg_length)
+            scores[row] += idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_tokenize_keeps_compounds_whole_and_split():
+    assert list(tokenize("Policy HR-2024-017 of FY25")) == ["policy", "hr-2024-017", "hr", "2024", "017", "fy25"]
+    assert list(tokenize("1,234 and 3.5")) == ["1,234", "1", "234", "3.5", "3", "5"]
+
+
+def test_identifier_queries():
+    assert is_identifier_query("FY25 EBIT")
+    assert is_identifier_query("HR-2024-017?")
+    assert not is_identifier_query("how many leave days")
+    assert not is_identifier_query("")
+
+
+@pytest.mark.parametrize("query", ["leave days", "FY25 EBIT", "HR-2024-017", "remote office", "cafeteria 8:30"])
+def test_scores_match_reference_bm25(index, query):
+    expected = bm25(query)
+    rows, scores = index.search(query, k=len(CORPUS))
+    assert len(rows) == sum(score > 0 for score in expected)
+    np.testing.assert_allclose(scores, [expected[row] for row in rows], rtol=1e-5)
+    assert list(scores) == sorted(scores, reverse=True)
+
+
+def test_ranking(index):
+    rows, _ = index.search("leave days", k=2)
+    assert list(rows) == [0, 3]
+    # The exact identifier outranks a chunk that only shares its "hr" part
+    assert list(index.search("HR-2024-017", k=3)[0]) == [1, 0]
+    assert list(index.search("2024", k=3)[0]) == [1]
+    assert len(index.search("unknown words", k=3)[0]) == 0
+
+
+def test_coverage(index):
+    coverage = index.coverage("FY25 EBIT", np.array([2, 0]))
+    assert coverage[0] == pytest.approx(1.0)
+    assert coverage[1] == 0.0
+    partial = index.coverage("FY25 EBIT cafeteria", np.array([2, 4]))
+    assert 0 < partial[1] < partial[0] < 1
+
+
+def test_reciprocal_rank_fusion():
+    rows, scores = reciprocal_rank_fusion([np.array([1, 2, 3]), np.array([3, 1, -1])], k=2, constant=0)
+    assert list(rows) == [1, 3]
+    assert scores[0] == pytest.approx(1 + 1 / 2)
+    assert scores[1] == pytest.approx(1 / 3 + 1)
@@ -0,0 +1,95 @@
+import json
+import os
+
+from langchain_core.documents import Document
+
+from ingest import ChangeTracker, resolve_pdf_paths
+from manifest import IngestManifest, file_key
+
+SETTINGS = {"embedding_model": "m", "chunk_size": 20, "chunk_overlap": 0}
+
+
+def write_pdf(path, content=b"%PDF-1.4 first"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    return str(path)
+
+
+def pages(path, *texts):
+    return [Document(page_content=text, metadata={"source": path, "page": i}) for i, text in enumerate(texts)]
+
+
+def ingest(manifest, path, texts, indexed=()):
+    """Run one file through the tracker the way ingest.main does; returns (new chunks, stale ids)."""
+    unchanged, info = manifest.check_file(path)
+    if unchanged:
+        return [], set()
+    tracker = ChangeTracker(manifest, indexed)
+    new = list(tracker.chunks(pages(path, *texts), 20, 0))
+    stale = manifest.chunk_ids(path) - tracker.chunk_ids(path)
+    manifest.set_file(path, info, tracker.pages.get(path, {}))
+    return new, stale
+
+
+def test_unchanged_file_is_skipped(tmp_path):
+    path = write_pdf(tmp_path / "docs" / "a.pdf")
+    manifest = IngestManifest(SETTINGS)
+    new, _ = ingest(manifest, path, ["page one text"])
+    assert len(new) == 1
+
+    manifest.save(str(tmp_path / "store"))
+    reloaded = IngestManifest.load(str(tmp_path / "store"))
+    assert reloaded.compatible(SETTINGS)
+    assert reloaded.check_file(path)[0]
+
+
+def test_changed_page_only_replaces_its_own_chunks(tmp_path):
+    path = write_pdf(tmp_path / "a.pdf")
+    manifest = IngestManifest(SETTINGS)
+    first, _ = ingest(manifest, path, ["page one text", "page two text"])
+    indexed = {doc.metadata["chunk_id"] for doc in first}
+
+    write_pdf(tmp_path / "a.pdf", b"%PDF-1.4 second version")
+    new, stale = ingest(manifest, path, ["page one text", "page two edited"], indexed)
+
+    assert [doc.page_content for doc in new] == ["page two edited"]
+    assert stale == {doc.metadata["chunk_id"] for doc in first if doc.metadata["page"] == 1}
+
+
+def test_removed_file_returns_its_stale_vectors(tmp_path):
+    path = write_pdf(tmp_path / "a.pdf")
+    manifest = IngestManifest(SETTINGS)
+    first, _ = ingest(manifest, path, ["page one text"])
+
+    os.remove(path)
+    assert manifest.missing_files() == [file_key(path)]
+    assert manifest.remove_file(manifest.missing_files()[0]) == {first[0].metadata["chunk_id"]}
+    assert manifest.files == {}
+
+
+def test_same_file_from_another_cwd_is_not_reingested(tmp_path, monkeypatch):
+    write_pdf(tmp_path / "docs" / "a.pdf")
+    manifest = IngestManifest(SETTINGS)
+
+    monkeypatch.chdir(tmp_path)
+    (path,) = resolve_pdf_paths(["docs/a.pdf"])
+    ingest(manifest, path, ["page one text"])
+
+    monkeypatch.chdir(tmp_path / "docs")
+    assert resolve_pdf_paths(["a.pdf"]) == [path]
+    assert manifest.check_file("a.pdf")[0]
+    assert manifest.missing_files() == []
+
+
+def test_version_1_relative_keys_are_migrated(tmp_path, monkeypatch):
+    write_pdf(tmp_path / "docs" / "a.pdf")
+    store = tmp_path / "store"
+    store.mkdir()
+    entry = {"size": 1, "mtime_ns": 1, "sha256": "x", "pages": {"0": {"hash": "h", "chunks": ["c"]}}}
+    (store / IngestManifest.FILENAME).write_text(json.dumps(
+        {"version": 1, "settings": SETTINGS, "files": {os.path.join("docs", "a.pdf"): entry}}))
+
+    monkeypatch.chdir(tmp_path)
+    manifest = IngestManifest.load(str(store))
+    assert manifest.chunk_ids(str(tmp_path / "docs" / "a.pdf")) == {"c"}
+    assert manifest.missing_files() == []
@@ -0,0 +1,110 @@
+import asyncio
+import time
+
+import pytest
+
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, acall_with_retries, call_with_retries
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+class Unavailable(Exception):
+    status_code = 503
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def fail(error):
+    def call():
+        raise error
+    return call
+
+
+def open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=reset_timeout)
+    for _ in range(2):
+        with pytest.raises(Unavailable):
+            call_with_retries(fail(Unavailable()), NO_RETRY, breaker)
+    return breaker
+
+
+def test_breaker_opens_after_threshold_and_fails_fast():
+    breaker = open_breaker(reset_timeout=60)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        call_with_retries(lambda: "ok", NO_RETRY, breaker)
+
+
+def test_half_open_trial_closes_or_reopens():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert call_with_retries(lambda: "ok", NO_RETRY, breaker) == "ok"
+    assert breaker.state == "closed"
+
+    breaker = open_breaker()
+    time.sleep(0.06)
+    with pytest.raises(Unavailable):
+        call_with_retries(fail(Unavailable()), NO_RETRY, breaker)
+    assert breaker.state == "open"
+
+
+def test_half_open_allows_one_trial_at_a_time():
+    breaker = open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_client_errors_are_not_retried_or_counted():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    calls = []
+
+    def bad():
+        calls.append(1)
+        raise BadRequest()
+
+    with pytest.raises(BadRequest):
+        call_with_retries(bad, RetryPolicy(max_retries=3, base_delay=0), breaker)
+    assert len(calls) == 1
+    assert breaker.state == "closed"
+
+
+def test_transient_errors_are_retried():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise Unavailable()
+        return "ok"
+
+    assert call_with_retries(flaky, RetryPolicy(max_retries=3, base_delay=0)) == "ok"
+    assert len(attempts) == 3
+
+
+def test_cancelled_half_open_trial_releases_the_breaker():
+    breaker = open_breaker()
+    time.sleep(0.06)
+
+    async def main():
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(acall_with_retries(slow, NO_RETRY, breaker))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        async def ok():
+            return "ok"
+
+        return await acall_with_retries(ok, NO_RETRY, breaker)
+
+    assert asyncio.run(main()) == "ok"
+    assert breaker.state == "closed"
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import time
+
+CORPUS = [
+    "quarterly revenue grew in the services business",
+    "the leave policy allows twenty days of paid leave",
+    "engineering headcount and hiring plans for next year",
+    "travel expenses must be approved by a manager",
+]
+
+
+def test_retrieve_context_returns_the_matching_chunk(make_retriever):
+    retriever = make_retriever(CORPUS)
+    context, pages, confidence = retriever.retrieve_context("paid leave policy days")
+    assert "leave policy" in context
+    assert pages[0] == 2
+    assert confidence > 0
+
+
+def test_search_keeps_its_store_across_a_reload(make_retriever, write_store):
+    retriever = make_retriever(CORPUS, retrieval_mode="dense")
+    directory = retriever.config.vector_db_path
+    embed_query = retriever.embeddings.embed_query
+
+    def embed_and_reload(text):
+        # Ingestion replaces the store while this search is running
+        write_store(directory, [text.upper() + " replaced" for text in CORPUS])
+        future = time.time() + 10
+        for name in os.listdir(directory):
+            os.utime(os.path.join(directory, name), (future, future))
+        assert retriever.refresh_if_changed()
+        return embed_query(text)
+
+    retriever.embeddings.embed_query = embed_and_reload
+    context, _, _ = retriever.retrieve_context("paid leave policy days")
+    # Rows found in the old index are read from the old chunk store
+    assert "the leave policy allows" in context
+
+    retriever.embeddings.embed_query = embed_query
+    context, _, _ = retriever.retrieve_context("travel expenses approved manager")
+    assert "TRAVEL EXPENSES" in context
+
+
+def test_async_retrieval_through_the_batcher(make_retriever):
+    retriever = make_retriever(CORPUS, batch_max_size=8)
+    assert retriever.batcher is not None
+
+    async def run():
+        return await asyncio.gather(*(retriever.aretrieve_context(query) for query in
+                                      ["paid leave policy days", "travel expenses approved manager"]))
+
+    (leave, _, _), (travel, _, _) = asyncio.run(run())
+    assert "leave policy" in leave
+    assert "travel expenses" in travel
+    assert retriever.embeddings.document_calls == 1
+
+
+IDENTIFIERS = [
+    "FY25 EBIT margin was 18.3 percent for the group",
+    "policy POL-104 covers remote work for all employees",
+    "FY25 headcount grew across every region",
+]
+
+
+def test_identifier_lookup_uses_bm25_only(make_retriever):
+    retriever = make_retriever(IDENTIFIERS)
+    context, pages, confidence = retriever.retrieve_context("POL-104")
+    assert "remote work" in context and pages == [2]
+    assert confidence == retriever.config.confidence_max
+    assert retriever.embeddings.query_calls == 0
+
+
+def test_partial_identifier_match_falls_back_to_dense_search(make_retriever):
+    retriever = make_retriever(IDENTIFIERS)
+    # No chunk contains "FY26", so the lookup is scored by embedding similarity
+    _, _, confidence = retriever.retrieve_context("FY26 EBIT")
+    assert retriever.embeddings.query_calls == 1
+    assert confidence < retriever.config.confidence_max
+
+
+def test_lexical_min_match_admits_partial_matches(make_retriever):
+    retriever = make_retriever(IDENTIFIERS, lexical_min_match=0.3)
+    context, _, confidence = retriever.retrieve_context("FY26 EBIT")
+    assert context == IDENTIFIERS[0]
+    assert retriever.embeddings.query_calls == 0
+    assert retriever.config.confidence_base < confidence < retriever.config.confidence_max
@@ -0,0 +1,124 @@
+"""
+Timing Module - Latency measurement helpers
+"""
+import math
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence
+
+from metrics import observe_stages
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 for an empty sequence)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize_latencies(latencies_ms: List[float]) -> Dict[str, float]:
+    """Aggregate latency figures in milliseconds."""
+    if not latencies_ms:
+        return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+
+    return {
+        "count": len(latencies_ms),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 2),
+        "p50_ms": round(percentile(latencies_ms, 50), 2),
+        "p95_ms": round(percentile(latencies_ms, 95), 2),
+        "p99_ms": round(percentile(latencies_ms, 99), 2),
+        "max_ms": round(max(latencies_ms), 2),
+    }
+
+
+class LatencyWindow:
+    """The most recent ``size`` latencies, for percentiles that follow current conditions."""
+
+    def __init__(self, size: int = 200):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, value: float):
+        with self._lock:
+            self._values.append(value)
+
+    def percentile(self, pct: float) -> float:
+        with self._lock:
+            values = list(self._values)
+        return percentile(values, pct)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class StageTimer:
+    """Accumulates wall-clock milliseconds per named stage of one request."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def add(self, name: str, elapsed_ms: float):
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._started) * 1000
+
+    def as_dict(self) -> Dict[str, float]:
+        timings = {f"{name}_ms": round(ms, 2) for name, ms in self.stages.items()}
+        timings["total_ms"] = round(self.elapsed_ms(), 2)
+        return timings
+
+
+_current_timer: ContextVar[Optional[StageTimer]] = ContextVar("stage_timer", default=None)
+
+
+def current_timer() -> Optional[StageTimer]:
+    """The StageTimer of the request being processed, for code that reports from another thread."""
+    return _current_timer.get()
+
+
+@contextmanager
+def stage_timer():
+    """
+    Make a new StageTimer current for the enclosed request. Its stages feed
+    the stage latency histogram once the request finishes.
+    """
+    timer = StageTimer()
+    token = _current_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _current_timer.reset(token)
+        observe_stages(timer.stages, timer.elapsed_ms())
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Time the enclosed block into the current StageTimer, if any."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(name):
+        yield
+
+
+def record_stage(name: str, elapsed_ms: float):
+    """Add a duration measured elsewhere (e.g. on a worker thread)."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.add(name, elapsed_ms)
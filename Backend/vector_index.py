@@ -0,0 +1,226 @@
+"""
+Vector Index Module - Builds, persists and tunes the FAISS index behind the store.
+
+Ingest keeps an exact flat index as its working copy and converts it into the
+configured serving index on save. For approximate index types the exact
+vectors are also written to vectors.f32, so later incremental runs can
+rebuild the working copy without re-embedding, and so shortlists from a
+compressed index (fp16/SQ8/PQ/OPQ codes, PCA-reduced vectors) can be
+re-scored with exact distances.
+"""
+import os
+import json
+import math
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict, Optional
+
+import faiss
+import numpy as np
+
+PARAMS_FILENAME = "index_params.json"
+VECTORS_FILENAME = "vectors.f32"
+INDEX_TYPES = ("flat", "hnsw", "ivf")
+ENCODINGS = ("float", "fp16", "sq8", "pq", "opq")
+DEFAULT_RESCORE = 4
+
+
+@dataclass
+class IndexParams:
+    """Build and default search parameters, persisted as index_params.json."""
+
+    index_type: str = "flat"
+    dim: int = 0
+    # HNSW
+    hnsw_m: int = 32
+    ef_construction: int = 200
+    ef_search: int = 64
+    # IVF
+    nlist: int = 0             # 0: chosen from the vector count at build time
+    nprobe: int = 8
+    train_size: int = 0        # 0: chosen from nlist and the vector count
+    seed: int = 1234
+    # Compression
+    encoding: str = "float"    # how vectors are stored in the index
+    pq_m: int = 96             # PQ/OPQ sub-quantizers (must divide the stored dimension)
+    pq_nbits: int = 8
+    pca_dim: int = 0           # 0: no dimensionality reduction
+    rescore: int = 0           # shortlist = k * rescore, re-scored exactly; 0: automatic
+
+    @property
+    def lossy(self) -> bool:
+        """Whether index distances are approximate (compressed or reduced vectors)."""
+        return self.encoding != "float" or self.pca_dim > 0
+
+    @property
+    def exact(self) -> bool:
+        return self.index_type == "flat" and not self.lossy
+
+    @property
+    def rescore_factor(self) -> int:
+        if self.rescore:
+            return self.rescore
+        return DEFAULT_RESCORE if self.lossy else 1
+
+    def _encoding_string(self) -> str:
+        if self.encoding == "float":
+            return "Flat"
+        if self.encoding == "fp16":
+            return "SQfp16"
+        if self.encoding == "sq8":
+            return "SQ8"
+        if self.encoding in ("pq", "opq"):
+            return f"PQ{self.pq_m}x{self.pq_nbits}"
+        raise ValueError(f"Unknown encoding: {self.encoding}. Supported: {', '.join(ENCODINGS)}")
+
+    def factory_string(self) -> str:
+        if self.encoding == "opq":
+            transform = f"OPQ{self.pq_m}_{self.pca_dim}," if self.pca_dim else f"OPQ{self.pq_m},"
+        else:
+            transform = f"PCA{self.pca_dim}," if self.pca_dim else ""
+
+        encoding = self._encoding_string()
+        if self.index_type == "flat":
+            return transform + encoding
+        if self.index_type == "hnsw":
+            return transform + f"HNSW{self.hnsw_m}" + ("" if encoding == "Flat" else f"_{encoding}")
+        if self.index_type == "ivf":
+            return transform + f"IVF{self.nlist},{encoding}"
+        raise ValueError(f"Unknown index type: {self.index_type}. Supported: {', '.join(INDEX_TYPES)}")
+
+    def bytes_per_vector(self) -> float:
+        """Approximate index memory per vector, excluding graph/list overhead."""
+        dim = self.pca_dim or self.dim
+        return {
+            "float": 4 * dim,
+            "fp16": 2 * dim,
+            "sq8": dim,
+        }.get(self.encoding, self.pq_m * self.pq_nbits / 8)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "factory": self.factory_string()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IndexParams":
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["IndexParams"]:
+        path = os.path.join(directory, PARAMS_FILENAME)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def save(self, directory: str):
+        path = os.path.join(directory, PARAMS_FILENAME)
+        with open(path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(path + ".tmp", path)
+
+
+def default_nlist(count: int) -> int:
+    """~4*sqrt(n) inverted lists, keeping at least 39 training points per list."""
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+
+def build_index(vectors: np.ndarray, params: IndexParams) -> faiss.Index:
+    """
+    Build the serving index for ``vectors`` (row i becomes id i). Parameters
+    resolved at build time (dim, nlist, train_size) are written back into
+    ``params`` so they are persisted with the index.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, params.dim = vectors.shape
+
+    if params.index_type == "ivf":
+        params.nlist = params.nlist or default_nlist(count)
+        if params.nlist > count:
+            raise ValueError(f"nlist={params.nlist} needs at least as many vectors ({count} available)")
+
+    index = faiss.index_factory(params.dim, params.factory_string(), faiss.METRIC_L2)
+
+    if not index.is_trained:
+        train_size = min(count, params.train_size or max(256 * params.nlist, 65536))
+        params.train_size = train_size
+        sample = vectors
+        if train_size < count:
+            rng = np.random.default_rng(params.seed)
+            sample = vectors[np.sort(rng.choice(count, train_size, replace=False))]
+        index.train(sample)
+
+    if params.index_type == "hnsw":
+        _base_index(index).hnsw.efConstruction = params.ef_construction
+
+    index.add(vectors)
+    set_search_params(index, params.ef_search, params.nprobe)
+    return index
+
+
+def _base_index(index: faiss.Index) -> faiss.Index:
+    """The index under any PCA/OPQ pre-transform."""
+    index = faiss.downcast_index(index)
+    if isinstance(index, faiss.IndexPreTransform):
+        index = faiss.downcast_index(index.index)
+    return index
+
+
+def set_search_params(index: faiss.Index, ef_search: Optional[int] = None, nprobe: Optional[int] = None):
+    """Apply runtime search knobs; parameters the index does not have are ignored."""
+    space = faiss.ParameterSpace()
+    for name, value in (("efSearch", ef_search), ("nprobe", nprobe)):
+        if not value:
+            continue
+        try:
+            space.set_index_parameter(index, name, value)
+        except RuntimeError:
+            pass
+
+
+def write_vectors(path: str, vectors: np.ndarray):
+    """Write row-major little-endian float32 vectors atomically."""
+    np.ascontiguousarray(vectors, dtype="<f4").tofile(path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def open_vectors(path: str, dim: int) -> np.ndarray:
+    """Memory-map vectors written by ``write_vectors`` as a read-only (n, dim) array."""
+    if os.path.getsize(path) == 0:
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.memmap(path, dtype="<f4", mode="r").reshape(-1, dim)
+
+
+def rescore(queries: np.ndarray, rows: np.ndarray, vectors: np.ndarray, k: int):
+    """
+    Re-rank a shortlist by exact squared L2 distance against the original
+    vectors. Returns ``(distances, rows)`` of shape (n, k), FAISS-style,
+    padded with inf / -1 where the shortlist was shorter than ``k``.
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    n = len(queries)
+    out_rows = np.full((n, k), -1, dtype=np.int64)
+    out_distances = np.full((n, k), np.inf, dtype=np.float32)
+
+    for i in range(n):
+        candidates = rows[i][rows[i] >= 0]
+        if not len(candidates):
+            continue
+        # Sorted access keeps reads from the memory map sequential
+        order = np.argsort(candidates)
+        candidates = candidates[order]
+        diff = np.asarray(vectors[candidates], dtype=np.float32) - queries[i]
+        distances = np.einsum("ij,ij->i", diff, diff)
+        best = np.argsort(distances, kind="stable")[:k]
+        out_rows[i, :len(best)] = candidates[best]
+        out_distances[i, :len(best)] = distances[best]
+
+    return out_distances, out_rows
+
+
+def recall_at_k(rows: np.ndarray, baseline_rows: np.ndarray, k: int) -> float:
+    """Mean fraction of the baseline top-k found in ``rows``' top-k."""
+    hits = [
+        len(set(found[:k][found[:k] >= 0]) & set(expected[:k][expected[:k] >= 0])) / k
+        for found, expected in zip(rows, baseline_rows)
+    ]
+    return float(np.mean(hits)) if hits else 0.0